@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from collections import deque
+
+from saper_engine import MODES, Board
+from zmeika_engine import ATE, FreeCells, SnakeEngine
+from kalkulyator import evaluate_expression
+
+
+# -----------------------------
+# Benchmark suite for all the games, headless (no Tk window is created)
+#   Minesweeper: mine placement, flood fill (per opened cell), reveal of the whole board
+#   Snake: engine step (the logic_step of the games) and spawn_food at high fill
+#   Calculator: evaluate_expression on short, long and deeply nested input
+# Results go to JSON; a saved baseline is compared case by case and
+# anything slower than the threshold is reported as a regression (exit code 1).
+# Run: python bench.py [--save-baseline] [--threshold 0.15] [--only saper]
+# -----------------------------
+
+RESULTS_PATH = "bench_results.json"
+BASELINE_PATH = "bench_baseline.json"
+THRESHOLD = 0.15 # 15% slower than the baseline is a regression
+
+BUDGET = 0.5 # seconds per case, at least MIN_ROUNDS rounds
+MIN_ROUNDS = 3
+MAX_ROUNDS = 1000
+
+# 5% mines: the first click floods most of the big board
+SAPER_BOARDS = [(f"{h}x{w}", (h, w, m)) for h, w, m in MODES.values()] + [("1000x1000", (1000, 1000, 50_000))]
+
+SNAKE_SIZE = (20, 16)
+SNAKE_FILLS = (0.5, 0.9, 0.99)
+SNAKE_STEPS = 1000
+
+CALC_CORPUS = {
+    "short": "1+2*3-4/5",
+    "functions": "2^3^2 + sqrt(16) - ln(10) * log10(1000) + max(1, 2, 3) * hypot(3, 4)",
+    "long": "+".join(f"{i}*{i + 1}/{i + 2}" for i in range(1, 300)),
+    "nested": "(" * 200 + "1+2" + ")" * 200,
+    "nested_funcs": "sqrt(" * 60 + "2" + ")" * 60,
+}
+
+
+def measure(setup, run):
+    """
+    Best time of run(state) over fresh setup() states; setup is not timed.
+    """
+    best = float("inf")
+    spent = 0.0
+    rounds = 0
+    while rounds < MIN_ROUNDS or (spent < BUDGET and rounds < MAX_ROUNDS):
+        state = setup()
+        t0 = time.perf_counter()
+        run(state)
+        dt = time.perf_counter() - t0
+        best = min(best, dt)
+        spent += dt
+        rounds += 1
+    return best
+
+
+# ---- Minesweeper ----
+def saper_cases():
+    for label, (h, w, m) in SAPER_BOARDS:
+        center = (h // 2, w // 2)
+
+        def fresh(h=h, w=w, m=m):
+            return Board(h, w, m, seed=1)
+
+        def placed(h=h, w=w, m=m, center=center):
+            board = Board(h, w, m, seed=1)
+            board.place_mines_and_numbers(*center)
+            return board
+
+        # per opened cell: another mine layout opens another region, so this is
+        # not comparable with the per-call saper.flood of older baselines
+        opened = len(placed().open_cell_or_flood(*center)) # same seed, same region every round
+
+        yield f"saper.place[{label}]", fresh, lambda b, center=center: b.place_mines_and_numbers(*center), 1
+        yield (f"saper.flood_per_cell[{label}]", placed,
+               lambda b, center=center: b.open_cell_or_flood(*center), opened)
+        yield f"saper.reveal_all[{label}]", placed, reveal_all, 1
+
+
+def reveal_all(board):
+    deque(board.reveal_all(), maxlen=0)
+
+
+# ---- Snake ----
+def snake_cycle(w, h):
+    """
+    A Hamiltonian cycle (h must be even): row 0 left to right, the other rows
+    snake through columns 1..w-1, column 0 leads back up.
+    """
+    cycle = [(x, 0) for x in range(w)]
+    for y in range(1, h):
+        xs = range(w - 1, 0, -1) if y % 2 else range(1, w)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in range(h - 1, 0, -1))
+    return cycle
+
+
+def filled_engine(fill):
+    """
+    An engine whose snake covers `fill` of the board, laid along the cycle,
+    plus the direction to take from every cell to keep following it.
+    """
+    w, h = SNAKE_SIZE
+    cycle = snake_cycle(w, h)
+    length = max(3, int(fill * w * h))
+    engine = SnakeEngine(w, h, walls=True, seed=1)
+    engine.snake = deque(reversed(cycle[:length])) # head is the last cell
+    engine.occ = bytearray(w * h)
+    engine.free = FreeCells(w * h)
+    for x, y in engine.snake:
+        engine.occ[y * w + x] = 1
+        engine.free.take(y * w + x)
+    nxt = {}
+    for i, (x, y) in enumerate(cycle):
+        nx, ny = cycle[(i + 1) % len(cycle)]
+        nxt[(x, y)] = (nx - x, ny - y)
+    engine.dir = nxt[cycle[length - 2]]
+    engine.spawn_food()
+    return engine, nxt
+
+
+def snake_steps(state):
+    engine, nxt = state
+    snake, step, occ, free, w = engine.snake, engine.step, engine.occ, engine.free, engine.width
+    for _ in range(SNAKE_STEPS):
+        if step(nxt[snake[0]]) == ATE:
+            # the fill stays fixed: without this the board is full within a few steps
+            x, y = snake.pop()
+            occ[y * w + x] = 0
+            free.give(y * w + x)
+
+
+def snake_spawns(state):
+    spawn = state[0].spawn_food
+    for _ in range(SNAKE_STEPS):
+        spawn()
+
+
+def snake_cases():
+    for fill in SNAKE_FILLS:
+        label = f"fill={fill * 100:g}%"
+        yield f"snake.step[{label}]", lambda fill=fill: filled_engine(fill), snake_steps, SNAKE_STEPS
+        yield f"snake.spawn_food[{label}]", lambda fill=fill: filled_engine(fill), snake_spawns, SNAKE_STEPS
+
+
+# ---- Calculator ----
+def calc_cases():
+    for label, expr in CALC_CORPUS.items():
+        evaluate_expression(expr) # must be valid
+        yield f"calc.evaluate[{label}]", lambda expr=expr: expr, evaluate_expression
+
+
+def all_cases():
+    """
+    (name, setup, run, calls per run) for every case.
+    """
+    yield from saper_cases()
+    yield from snake_cases()
+    for name, setup, run in calc_cases():
+        yield name, setup, run, 1
+
+
+# ---- JSON and comparison ----
+def run_suite(only=None):
+    results = {}
+    for name, setup, run, calls in all_cases():
+        if only and only not in name:
+            continue
+        results[name] = measure(setup, run) / calls
+        print(f"{name:<34} {format_time(results[name]):>12}", flush=True)
+    return results
+
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+
+def save(path, results):
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results, # seconds per call
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, ensure_ascii=False)
+
+
+def load(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)["results"]
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the ratio to the baseline for every common case.
+    Returns the names of the cases slower than 1 + threshold.
+    """
+    regressions = []
+    print(f"\n{'case':<34} {'baseline':>12} {'now':>12} {'ratio':>7}")
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<34} {'-':>12} {format_time(now):>12}   (new)")
+            continue
+        ratio = now / base
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            mark = "  faster"
+        print(f"{name:<34} {format_time(base):>12} {format_time(now):>12} {ratio:>6.2f}x{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the games")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--out", default=RESULTS_PATH)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--only", help="run only the cases whose name contains this text")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.only)
+    save(args.out, results)
+    if args.save_baseline:
+        save(args.baseline, results)
+        print(f"\nbaseline saved: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline yet ({args.baseline}), save one with --save-baseline")
+        return 0
+
+    regressions = compare(results, load(args.baseline), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold * 100:g}%: {', '.join(regressions)}")
+        return 1
+    print(f"\nno regressions over {args.threshold * 100:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import math
+import time
+
+from kalkulyator import CalcError, tokenize, to_rpn, compile_rpn, run_program
+
+
+# -----------------------------
+# Benchmark: registry dispatch table vs the old if/elif chain
+# Run: python bench_kalkulyator.py
+# -----------------------------
+
+CORPUS = [
+    "1+2*3-4/5",
+    "2^3^2 + sqrt(16) - ln(10) * log10(1000)",
+    "-(1+2)*(3-4)/(5+6)^2 + sqrt(7*8) - ln(9)",
+    "((((1+2)*3-4)/5+6)*7-8)/9 + ((((9-8)*7+6)/5-4)*3+2)",
+    "1+" * 200 + "1",
+]
+
+
+def eval_rpn_chain(rpn):
+    """
+    The evaluator before the function registry: string comparisons per token.
+    Kept here only as the reference for the benchmark.
+    """
+    st = []
+
+    for ttype, tval in rpn:
+        if ttype == "NUM":
+            st.append(float(tval))
+            continue
+
+        if ttype == "OP":
+            b = st.pop()
+            a = st.pop()
+            if tval == "+":
+                st.append(a + b)
+            elif tval == "-":
+                st.append(a - b)
+            elif tval == "*":
+                st.append(a * b)
+            elif tval == "/":
+                if b == 0:
+                    raise CalcError("Деление на ноль")
+                st.append(a / b)
+            elif tval == "^":
+                st.append(a ** b)
+            continue
+
+        if ttype == "FUNC":
+            name = tval[0]
+            x = st.pop()
+            if name == "sqrt":
+                if x < 0:
+                    raise CalcError("sqrt: отрицательный аргумент")
+                st.append(math.sqrt(x))
+            elif name == "ln":
+                if x <= 0:
+                    raise CalcError("ln: аргумент должен быть > 0")
+                st.append(math.log(x))
+            elif name == "log10":
+                if x <= 0:
+                    raise CalcError("log10: аргумент должен быть > 0")
+                st.append(math.log10(x))
+            elif name == "neg":
+                st.append(-x)
+            continue
+
+    return st[0]
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return best / repeat * 1e6 # microseconds per call
+
+
+def main(repeat=2000):
+    print(f"{'expression':<42} {'chain, us':>10} {'table, us':>10} {'speedup':>8}")
+    for expr in CORPUS:
+        rpn = to_rpn(tokenize(expr))
+        program = compile_rpn(rpn)
+        assert abs(eval_rpn_chain(rpn) - run_program(program)) < 1e-9
+
+        t_chain = timeit(lambda: eval_rpn_chain(rpn), repeat)
+        t_table = timeit(lambda: run_program(program), repeat)
+        label = expr if len(expr) <= 40 else expr[:37] + "..."
+        print(f"{label:<42} {t_chain:>10.2f} {t_table:>10.2f} {t_chain / t_table:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
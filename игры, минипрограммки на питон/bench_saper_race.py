@@ -0,0 +1,87 @@
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import time
+
+from saper_race import RaceBot, RaceServer, HOST, PLAYERS
+
+
+# -----------------------------
+# Load test: hundreds of race bots on localhost
+# The server runs in its own process, so its CPU time is not mixed with the bots'.
+# Run: python bench_saper_race.py [bots] [seconds] [players per game]
+# -----------------------------
+
+BOTS = 200
+SECONDS = 15
+
+
+def serve(port_queue, result_queue, seconds, players):
+    async def run():
+        server = RaceServer(port=0, players=players, seed=0)
+        await server.start()
+        port_queue.put(server.port)
+        cpu0 = time.process_time()
+        t0 = time.perf_counter()
+        await asyncio.sleep(seconds)
+        cpu = time.process_time() - cpu0
+        wall = time.perf_counter() - t0
+        await server.stop()
+        result_queue.put({
+            "cpu": cpu, "wall": wall, "games": server.games_done, "clicks": server.clicks,
+            "messages": server.messages_out, "bytes": server.bytes_out,
+        })
+
+    asyncio.run(run())
+
+
+async def run_bots(port, bots, seconds):
+    finished = [] # RaceView of every finished race
+
+    async def bot_loop(i):
+        n = 0
+        while True:
+            view = await RaceBot(seed=i * 100000 + n).play(HOST, port)
+            if view.over:
+                finished.append(view)
+            n += 1
+
+    tasks = [asyncio.create_task(bot_loop(i)) for i in range(bots)]
+    await asyncio.sleep(seconds)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return finished
+
+
+def main(bots=BOTS, seconds=SECONDS, players=PLAYERS):
+    port_queue, result_queue = multiprocessing.Queue(), multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port_queue, result_queue, seconds + 1, players))
+    server.start()
+    port = port_queue.get()
+
+    finished = asyncio.run(run_bots(port, bots, seconds))
+    stats = result_queue.get()
+    server.join()
+
+    games = max(stats["games"], 1)
+    wall = stats["wall"]
+    won = [v for v in finished if v.winner is not None]
+    print(f"{bots} bots, {players} per game, {seconds} s")
+    print(f"games finished      {stats['games']:8d}  ({stats['games'] / wall:.1f} /s, "
+          f"{len(won) / max(len(finished), 1) * 100:.0f}% with a winner)")
+    print(f"clicks              {stats['clicks']:8d}  ({stats['clicks'] / wall:.0f} /s)")
+    print(f"server CPU          {stats['cpu'] / wall * 100:7.1f} %")
+    print(f"server CPU per game {stats['cpu'] / games * 1000:8.2f} ms")
+    print(f"server out          {stats['bytes'] / games:8.0f} B/game, "
+          f"{stats['bytes'] / max(stats['messages'], 1):.1f} B/message, "
+          f"{stats['messages'] / max(stats['clicks'], 1):.2f} messages/click")
+    if finished:
+        print(f"cells per race      {statistics.mean(v.opened for v in finished):8.1f} opened by a bot")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else BOTS,
+         float(sys.argv[2]) if len(sys.argv) > 2 else SECONDS,
+         int(sys.argv[3]) if len(sys.argv) > 3 else PLAYERS)
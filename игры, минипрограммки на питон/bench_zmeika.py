@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from zmeika_engine import SnakeEngine
+from zmeika_ai import STRATEGIES, make_strategy
+
+
+# -----------------------------
+# Benchmark: autopilot strategies on seeded headless games
+# Run: python bench_zmeika.py [games per strategy]
+# -----------------------------
+
+GAMES = 2000
+WIDTH = 12
+HEIGHT = 12
+WALLS = True
+CHUNK = 25 # seeds per task sent to a worker
+
+
+def play(name, seed, width=WIDTH, height=HEIGHT, walls=WALLS):
+    """
+    One game until death, a full board or a stall (no food for 2 * cells steps).
+    Returns (length, steps, foods, seconds).
+    """
+    engine = SnakeEngine(width, height, walls=walls, seed=seed)
+    pilot = make_strategy(name, engine)
+    stall_limit = 2 * width * height
+
+    t0 = time.perf_counter()
+    idle = 0
+    while engine.alive and engine.food and idle < stall_limit:
+        score = engine.score
+        engine.step(pilot.choose())
+        idle = 0 if engine.score != score else idle + 1
+    return len(engine.snake), engine.ticks, engine.score, time.perf_counter() - t0
+
+
+def play_chunk(name, seeds):
+    return [play(name, seed) for seed in seeds]
+
+
+def run_strategy(pool, name, games):
+    seeds = range(games)
+    chunks = [seeds[i:i + CHUNK] for i in range(0, games, CHUNK)]
+    results = []
+    for part in pool.map(play_chunk, [name] * len(chunks), chunks):
+        results.extend(part)
+    return results
+
+
+def main(games=GAMES):
+    workers = os.cpu_count() or 1
+    cells = WIDTH * HEIGHT
+    print(f"{games} games per strategy, board {WIDTH}x{HEIGHT}, {workers} workers")
+    print(f"{'strategy':<10} {'avg len':>8} {'max len':>8} {'full':>6} {'steps/food':>11} {'steps/s':>10} {'wall, s':>8}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name in STRATEGIES:
+            t0 = time.perf_counter()
+            results = run_strategy(pool, name, games)
+            wall = time.perf_counter() - t0
+
+            lengths = [r[0] for r in results]
+            steps = sum(r[1] for r in results)
+            foods = sum(r[2] for r in results)
+            cpu = sum(r[3] for r in results)
+            full = sum(1 for n in lengths if n == cells)
+            print(f"{name:<10} {sum(lengths) / len(lengths):>8.1f} {max(lengths):>8} {full:>6} "
+                  f"{steps / max(foods, 1):>11.1f} {steps / cpu:>10.0f} {wall:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else GAMES)
@@ -0,0 +1,70 @@
+import asyncio
+import statistics
+import sys
+import time
+
+from zmeika_server import SnakeServer, BotClient
+
+
+# -----------------------------
+# Load test: arena servers full of bots on localhost
+# Run: python bench_zmeika_net.py [games] [seconds]
+# -----------------------------
+
+PLAYERS = 8
+SECONDS = 10
+TICK_MS = 50
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+async def run(games, seconds):
+    servers, bots, tasks = [], [], []
+    for g in range(games):
+        server = SnakeServer(port=0, tick_ms=TICK_MS, seed=g)
+        await server.start()
+        servers.append(server)
+        for i in range(PLAYERS):
+            bot = BotClient(seed=g * PLAYERS + i)
+            await bot.connect(server.host, server.port)
+            bots.append(bot)
+            tasks.append(asyncio.create_task(bot.run()))
+
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    await asyncio.sleep(seconds)
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+
+    for server in servers:
+        await server.stop()
+    for task in tasks:
+        task.cancel()
+    return servers, bots, wall, cpu
+
+
+def main(games=1, seconds=SECONDS):
+    servers, bots, wall, cpu = asyncio.run(run(games, seconds))
+
+    late = [x for s in servers for x in s.lateness]
+    cost = [x for s in servers for x in s.tick_cost]
+    ticks = sum(s.arena.tick for s in servers)
+    sent = [c.bytes_in for c in bots]
+    frames = sum(c.frames for c in bots)
+
+    print(f"{games} game(s) x {PLAYERS} bots, tick {TICK_MS} ms, {wall:.1f} s "
+          f"(bots run in the same process, CPU {cpu / wall * 100:.0f}%)")
+    print(f"ticks per game        {ticks / games / wall:8.1f} /s")
+    print(f"tick lateness         p50 {percentile(late, 0.5):6.2f}  p99 {percentile(late, 0.99):6.2f}  "
+          f"max {max(late, default=0):6.2f} ms")
+    print(f"tick cost (step+send) p50 {percentile(cost, 0.5):6.3f}  p99 {percentile(cost, 0.99):6.3f} ms")
+    print(f"bandwidth per client  {statistics.mean(sent) / wall:8.0f} B/s, "
+          f"{sum(sent) / max(frames, 1):.1f} B/frame")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1,
+         float(sys.argv[2]) if len(sys.argv) > 2 else SECONDS)
@@ -0,0 +1,326 @@
+import tkinter as tk
+import math
+from collections import OrderedDict
+from functools import reduce
+
+import numpy as np
+
+from kalkulyator import CalcError, tokenize, to_rpn
+
+
+# -----------------------------
+# Plot mode on top of the calculator engine
+# f(x) is compiled once from RPN into a list of array operations,
+# sampled per x-tile in one vectorized pass and refined adaptively.
+# -----------------------------
+
+CANVAS_W = 800
+CANVAS_H = 500
+
+TILES_PER_VIEW = 4 # view width / tile width is kept in [4, 8)
+SAMPLES_PER_TILE = 256
+REFINE_DEPTH = 6
+MAX_CACHED_TILES = 512
+FRAME_MS = 16
+
+
+def _checked(fn):
+    # domain errors become NaN, so a single pass never raises
+    def run(*args):
+        with np.errstate(all="ignore"):
+            return fn(*args)
+    return run
+
+
+ARRAY_OPS = {
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": _checked(lambda a, b: np.where(b == 0, np.nan, a / b)),
+    "^": _checked(np.power),
+}
+
+ARRAY_FUNCS = {
+    "sqrt": _checked(lambda x: np.where(x < 0, np.nan, np.sqrt(x))),
+    "ln": _checked(lambda x: np.where(x <= 0, np.nan, np.log(x))),
+    "log10": _checked(lambda x: np.where(x <= 0, np.nan, np.log10(x))),
+    "neg": np.negative,
+    "max": lambda *a: reduce(np.fmax, a),
+    "min": lambda *a: reduce(np.fmin, a),
+    "pow": _checked(lambda a, b: np.where((a == 0) & (b < 0), np.nan, np.power(a, b))),
+    "hypot": lambda *a: reduce(np.hypot, a),
+}
+
+
+def compile_array(expr: str, var="x"):
+    """
+    Compile expr once into f(xs) -> ys over a NumPy array.
+    Points outside the domain come back as NaN.
+    """
+    rpn = to_rpn(tokenize(expr, variables=(var,)))
+
+    program = []
+    depth = 0
+    for ttype, tval in rpn:
+        if ttype == "NUM":
+            try:
+                program.append((0, float(tval)))
+            except ValueError:
+                raise CalcError("Некорректное число")
+            depth += 1
+        elif ttype == "VAR":
+            program.append((0, None))
+            depth += 1
+        elif ttype == "OP":
+            program.append((2, ARRAY_OPS[tval]))
+            depth -= 1
+        elif ttype == "FUNC":
+            name, argc = tval
+            if name not in ARRAY_FUNCS:
+                raise CalcError(f"{name}: нет векторной версии")
+            program.append((argc, ARRAY_FUNCS[name]))
+            depth -= argc - 1
+        else:
+            raise CalcError("Ошибка вычисления")
+        if depth < 1:
+            raise CalcError("Недостаточно аргументов")
+    if depth != 1:
+        raise CalcError("Некорректное выражение")
+
+    def f(xs):
+        st = []
+        for arity, op in program:
+            if arity == 0:
+                st.append(xs if op is None else np.full(xs.shape, op))
+            else:
+                args = st[-arity:]
+                del st[-arity:]
+                st.append(op(*args))
+        ys = np.asarray(st[0], dtype=float)
+        ys[~np.isfinite(ys)] = np.nan
+        return ys
+
+    return f
+
+
+def refine(f, xs, ys, ytol, depth=REFINE_DEPTH):
+    """
+    Insert midpoints only where the curve bends by more than ytol
+    or where a domain boundary (finite <-> NaN) lies between samples.
+    Each level evaluates all new midpoints in one vectorized call.
+    """
+    for _ in range(depth):
+        if len(xs) < 3:
+            break
+        finite = np.isfinite(ys)
+        bend = np.zeros(len(xs) - 1, dtype=bool)
+
+        curv = np.abs(ys[:-2] - 2 * ys[1:-1] + ys[2:])
+        with np.errstate(invalid="ignore"):
+            high = curv > ytol
+        bend[:-1] |= high
+        bend[1:] |= high
+        bend |= finite[:-1] != finite[1:]
+
+        idx = np.flatnonzero(bend)
+        if idx.size == 0:
+            break
+        mids = (xs[idx] + xs[idx + 1]) * 0.5
+        xs = np.insert(xs, idx + 1, mids)
+        ys = np.insert(ys, idx + 1, f(mids))
+    return xs, ys
+
+
+class TileCache:
+    """
+    Sampled points per (level, ytol bucket, tile index); a tile at level k
+    spans 2**k in x. The bucket b refines to 2**b <= ytol, so a vertical zoom
+    gets tiles refined finely enough instead of the coarser ones.
+    Pan and zoom within the same level only fetch tiles they have not seen.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.tiles = OrderedDict()
+
+    def get(self, x0, x1, ytol):
+        level = math.floor(math.log2((x1 - x0) / TILES_PER_VIEW))
+        tw = 2.0 ** level
+        first = math.floor(x0 / tw)
+        last = math.floor(x1 / tw)
+        bucket = math.floor(math.log2(ytol))
+
+        keys = [(level, bucket, i) for i in range(first, last + 1)]
+        missing = [k for k in keys if k not in self.tiles]
+        if missing:
+            self._sample(missing, tw, 2.0 ** bucket)
+
+        parts_x, parts_y = [], []
+        for k in keys:
+            self.tiles.move_to_end(k)
+            tx, ty = self.tiles[k]
+            parts_x.append(tx)
+            parts_y.append(ty)
+        while len(self.tiles) > MAX_CACHED_TILES:
+            self.tiles.popitem(last=False)
+        return np.concatenate(parts_x), np.concatenate(parts_y)
+
+    def _sample(self, keys, tw, ytol):
+        # one vectorized pass over every missing tile at once
+        base = np.arange(SAMPLES_PER_TILE + 1) / SAMPLES_PER_TILE
+        starts = np.array([i for _, _, i in keys], dtype=float) * tw
+        grid = (starts[:, None] + base[None, :] * tw)
+        vals = self.f(grid.ravel()).reshape(grid.shape)
+
+        for row, k in enumerate(keys):
+            tx, ty = refine(self.f, grid[row], vals[row], ytol)
+            # drop the shared right edge, the next tile starts there
+            self.tiles[k] = (tx[:-1], ty[:-1])
+
+
+class PlotWindow:
+    def __init__(self, master=None, expr="sqrt(x)*ln(x+1)"):
+        self.root = tk.Tk() if master is None else tk.Toplevel(master)
+        self.root.title("График f(x)")
+
+        top = tk.Frame(self.root, padx=8, pady=6)
+        top.pack(fill="x")
+        tk.Label(top, text="f(x) =", font=("Arial", 14)).pack(side="left")
+        self.expr_var = tk.StringVar(value=expr)
+        entry = tk.Entry(top, textvariable=self.expr_var, font=("Arial", 14))
+        entry.pack(side="left", fill="x", expand=True, padx=6)
+        entry.bind("<Return>", lambda e: self.set_function())
+        tk.Button(top, text="Построить", command=self.set_function).pack(side="left")
+
+        self.canvas = tk.Canvas(self.root, width=CANVAS_W, height=CANVAS_H, bg="white", highlightthickness=0)
+        self.canvas.pack()
+
+        self.status = tk.Label(self.root, text="", anchor="w", fg="gray")
+        self.status.pack(fill="x", padx=8)
+
+        # view in world coordinates
+        self.x0, self.x1 = -2.0, 10.0
+        half_h = (self.x1 - self.x0) * CANVAS_H / CANVAS_W / 2
+        self.y0, self.y1 = -half_h, half_h
+
+        # persistent items, moved with coords()
+        self.axis_x = self.canvas.create_line(0, 0, 0, 0, fill="#9ca3af")
+        self.axis_y = self.canvas.create_line(0, 0, 0, 0, fill="#9ca3af")
+        self.curve_items = []
+
+        self.cache = None
+        self.redraw_pending = False
+        self.drag_from = None
+
+        self.canvas.bind("<ButtonPress-1>", self.on_drag_start)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.zoom_at(e.x, e.y, 1 / 1.2))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom_at(e.x, e.y, 1.2))
+
+        self.set_function()
+
+    # ---- view ----
+    def set_function(self):
+        try:
+            f = compile_array(self.expr_var.get())
+        except CalcError as e:
+            self.status.config(text=f"Ошибка: {e}", fg="#b91c1c")
+            return
+        self.cache = TileCache(f)
+        self.status.config(text="Тяни мышью — сдвиг, колесо — масштаб", fg="gray")
+        self.request_redraw()
+
+    def on_drag_start(self, e):
+        self.drag_from = (e.x, e.y)
+
+    def on_drag(self, e):
+        if self.drag_from is None:
+            return
+        dx_px = e.x - self.drag_from[0]
+        dy_px = e.y - self.drag_from[1]
+        self.drag_from = (e.x, e.y)
+        sx = (self.x1 - self.x0) / CANVAS_W
+        sy = (self.y1 - self.y0) / CANVAS_H
+        self.x0 -= dx_px * sx
+        self.x1 -= dx_px * sx
+        self.y0 += dy_px * sy
+        self.y1 += dy_px * sy
+        self.request_redraw()
+
+    def on_wheel(self, e):
+        self.zoom_at(e.x, e.y, 1 / 1.2 if e.delta > 0 else 1.2)
+
+    def zoom_at(self, px, py, factor):
+        wx = self.x0 + px / CANVAS_W * (self.x1 - self.x0)
+        wy = self.y1 - py / CANVAS_H * (self.y1 - self.y0)
+        self.x0 = wx + (self.x0 - wx) * factor
+        self.x1 = wx + (self.x1 - wx) * factor
+        self.y0 = wy + (self.y0 - wy) * factor
+        self.y1 = wy + (self.y1 - wy) * factor
+        self.request_redraw()
+
+    def request_redraw(self):
+        # coalesce motion/wheel events into at most one redraw per frame
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.root.after(FRAME_MS, self.redraw)
+
+    # ---- drawing ----
+    def redraw(self):
+        self.redraw_pending = False
+        sx = CANVAS_W / (self.x1 - self.x0)
+        sy = CANVAS_H / (self.y1 - self.y0)
+
+        ax_y = (self.y1 - 0.0) * sy
+        ax_x = (0.0 - self.x0) * sx
+        self.canvas.coords(self.axis_x, 0, ax_y, CANVAS_W, ax_y)
+        self.canvas.coords(self.axis_y, ax_x, 0, ax_x, CANVAS_H)
+
+        segments = []
+        if self.cache is not None:
+            xs, ys = self.cache.get(self.x0, self.x1, ytol=1.0 / sy)
+            segments = self.split_segments(xs, ys, sx, sy)
+
+        while len(self.curve_items) < len(segments):
+            self.curve_items.append(self.canvas.create_line(0, 0, 0, 0, fill="#2563eb", width=2))
+        for item, flat in zip(self.curve_items, segments):
+            self.canvas.coords(item, flat)
+            self.canvas.itemconfig(item, state="normal")
+        for item in self.curve_items[len(segments):]:
+            self.canvas.itemconfig(item, state="hidden")
+
+    def split_segments(self, xs, ys, sx, sy):
+        """
+        Pixel polylines, broken at NaN and at jumps taller than the view
+        (vertical asymptotes), flattened for canvas.coords in one shot.
+        """
+        px = (xs - self.x0) * sx
+        py = np.clip((self.y1 - ys) * sy, -CANVAS_H, 2 * CANVAS_H)
+
+        finite = np.isfinite(ys)
+        jump = np.zeros(len(ys), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            jump[1:] = np.abs(np.diff(ys)) * sy > CANVAS_H
+        breaks = ~finite | jump
+
+        segments = []
+        prev_finite = np.concatenate(([False], finite[:-1]))
+        starts = np.flatnonzero(finite & (jump | ~prev_finite))
+        bounds = np.flatnonzero(breaks)
+        for s in starts:
+            nxt = bounds[np.searchsorted(bounds, s, side="right"):]
+            e = nxt[0] if nxt.size else len(ys)
+            if e - s >= 2:
+                flat = np.empty(2 * (e - s))
+                flat[0::2] = px[s:e]
+                flat[1::2] = py[s:e]
+                segments.append(flat.tolist())
+        return segments
+
+    def run(self):
+        self.root.mainloop()
+
+
+if __name__ == "__main__":
+    PlotWindow().run()
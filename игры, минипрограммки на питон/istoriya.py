@@ -0,0 +1,154 @@
+import heapq
+import io
+import os
+import time
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+
+# -----------------------------
+# Calculation history
+# Append-only TSV log: timestamp <TAB> expression <TAB> result
+# The search index is built lazily (background thread or first search),
+# so a big history never slows down the calculator start.
+# -----------------------------
+
+HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".kalkulyator_history.tsv")
+SEARCH_LIMIT = 100
+
+
+class History:
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self.lock = threading.Lock() # index and file appends
+        self.load_lock = threading.Lock() # one parse at a time, append doesn't wait for it
+        self.loaded = False
+        self.loading = False
+        self.arrived = [] # appended while the file was being parsed
+
+        self.entries = [] # (timestamp, expr, result), oldest first
+        self.sorted_keys = [] # (expr.lower(), idx) for prefix search
+
+        # substring search runs str.find over one joined blob;
+        # offsets[i] is where entry i starts in the blob
+        self.blob = ""
+        self.offsets = []
+        self.pending = [] # lowered exprs appended since the blob was built
+
+    # ---- loading ----
+    def load_async(self):
+        threading.Thread(target=self.ensure_loaded, daemon=True).start()
+
+    def ensure_loaded(self):
+        with self.load_lock:
+            if self.loaded:
+                return
+            # the parse runs without self.lock: only the bytes written so far
+            # are read, later appends wait in self.arrived
+            with self.lock:
+                self.loading = True
+                try:
+                    size = os.path.getsize(self.path)
+                except FileNotFoundError:
+                    size = 0
+
+            data = b""
+            try:
+                with open(self.path, "rb") as fh:
+                    data = fh.read(size)
+            except FileNotFoundError:
+                pass
+            entries = []
+            for line in io.StringIO(data.decode("utf-8"), newline=None):
+                parts = line.rstrip("\n").split("\t", 2)
+                if len(parts) != 3:
+                    continue
+                try:
+                    ts = float(parts[0])
+                except ValueError:
+                    continue
+                entries.append((ts, parts[1], parts[2]))
+            sorted_keys = sorted((e[1].lower(), i) for i, e in enumerate(entries))
+            pending = [e[1].lower() for e in entries]
+
+            with self.lock:
+                self.entries = entries
+                self.sorted_keys = sorted_keys
+                self.pending = pending
+                self.blob = ""
+                self.offsets = []
+                for entry in self.arrived:
+                    self._add(*entry)
+                self.arrived = []
+                self.loading = False
+                self.loaded = True
+
+    # ---- writing ----
+    def append(self, expr, result):
+        expr = expr.replace("\t", " ").replace("\n", " ")
+        result = str(result).replace("\t", " ").replace("\n", " ")
+        ts = time.time()
+
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(f"{ts:.3f}\t{expr}\t{result}\n")
+
+            # before the index is loaded the file is the only copy
+            if self.loaded:
+                self._add(ts, expr, result)
+            elif self.loading:
+                self.arrived.append((ts, expr, result))
+
+    def _add(self, ts, expr, result):
+        idx = len(self.entries)
+        self.entries.append((ts, expr, result))
+        insort(self.sorted_keys, (expr.lower(), idx))
+        self.pending.append(expr.lower())
+
+    # ---- search ----
+    def _flush_blob(self):
+        if not self.pending:
+            return
+        parts = [self.blob]
+        pos = len(self.blob)
+        for key in self.pending:
+            self.offsets.append(pos)
+            parts.append(key)
+            parts.append("\n")
+            pos += len(key) + 1
+        self.blob = "".join(parts)
+        self.pending = []
+
+    def search(self, query, prefix=False, limit=SEARCH_LIMIT):
+        """
+        Return up to limit matching entries, newest first.
+        """
+        self.ensure_loaded()
+        query = query.lower()
+
+        with self.lock:
+            if not query:
+                return self.entries[-limit:][::-1]
+
+            if prefix:
+                lo = bisect_left(self.sorted_keys, (query,))
+                hi = bisect_right(self.sorted_keys, (query + "\uffff",))
+                keys = self.sorted_keys
+                idxs = heapq.nlargest(limit, (keys[j][1] for j in range(lo, hi)))
+                return [self.entries[i] for i in idxs]
+
+            if "\n" in query:
+                return []
+            self._flush_blob()
+
+            # scan from the end of the blob so the newest matches come first
+            found = []
+            end = len(self.blob)
+            while len(found) < limit:
+                pos = self.blob.rfind(query, 0, end)
+                if pos < 0:
+                    break
+                i = bisect_right(self.offsets, pos) - 1
+                found.append(self.entries[i])
+                end = self.offsets[i] # one hit per entry
+            return found
@@ -1,11 +1,17 @@
 import tkinter as tk
 import math
+import operator
+from collections import namedtuple
+
+from istoriya import History
 
 
 # -----------------------------
 # Expression engine (no eval)
 # Tokenize -> Shunting-yard -> RPN evaluation
-# Supports: + - * / ^, unary -, parentheses, sqrt(x), ln(x), log10(x)
+# Supports: + - * / ^, unary -, parentheses, functions from the registry
+# (sqrt, ln, log10, max, min, pow, hypot), optional named variables
+# (e.g. x for plotting)
 # -----------------------------
 
 OPERATORS = {
@@ -16,103 +22,258 @@ OPERATORS = {
     "^": (3, "R"), # power is right-associative
 }
 
-FUNCTIONS = {"sqrt", "ln", "log10"}
+FunctionSpec = namedtuple("FunctionSpec", "name arity impl domain")
+
+# name -> FunctionSpec; arity None means "one or more arguments"
+FUNCTIONS = {}
+
+
+def register_function(name, arity, impl, domain=None):
+    """
+    Add a function to the calculator.
+    domain(*args) returns an error message for invalid arguments, or None.
+    """
+    FUNCTIONS[name] = FunctionSpec(name, arity, impl, domain)
+
+
+register_function("sqrt", 1, math.sqrt,
+                  lambda x: "sqrt: отрицательный аргумент" if x < 0 else None)
+register_function("ln", 1, math.log,
+                  lambda x: "ln: аргумент должен быть > 0" if x <= 0 else None)
+register_function("log10", 1, math.log10,
+                  lambda x: "log10: аргумент должен быть > 0" if x <= 0 else None)
+# *a: max(3) is one number, not an iterable
+register_function("max", None, lambda *a: max(a))
+register_function("min", None, lambda *a: min(a))
+
+
+def _pow_domain(a, b):
+    if a == 0 and b < 0:
+        return "pow: ноль в отрицательной степени"
+    if a < 0 and not float(b).is_integer():
+        return "pow: отрицательное число в дробной степени"
+    return None
+
+
+register_function("pow", 2, math.pow, _pow_domain)
+register_function("hypot", None, math.hypot)
+
+# precomputed dispatch: operator -> (impl, domain check)
+BINARY_OPS = {
+    "+": (operator.add, None),
+    "-": (operator.sub, None),
+    "*": (operator.mul, None),
+    "/": (operator.truediv, lambda a, b: "Деление на ноль" if b == 0 else None),
+    "^": (operator.pow, None),
+}
+
+# unary minus lives outside the registry so it cannot be typed by name
+NEG = FunctionSpec("neg", 1, operator.neg, None)
+
+PREVIEW_DELAY_MS = 150 # debounce for the live preview
 
 
 class CalcError(Exception):
-    pass
+    def __init__(self, msg, pos=None):
+        super().__init__(msg)
+        self.pos = pos # position in the space-stripped expression, if known
 
 
-def tokenize(expr: str):
-    expr = expr.replace(" ", "")
-    if not expr:
-        raise CalcError("Пустое выражение")
+def _is_num_char(ch):
+    return ch.isdigit() or ch == "."
 
-    tokens = []
-    i = 0
-    n = len(expr)
 
-    def is_num_char(ch):
-        return ch.isdigit() or ch == "."
+def _scan_name(expr, i):
+    """
+    End of the identifier starting at i: letters, plus trailing digits only
+    when they complete a registered name (log10), so "ln2" still means ln(2).
+    """
+    n = len(expr)
+    start = i
+    while i < n and expr[i].isalpha():
+        i += 1
+    j = i
+    while j < n and expr[j].isdigit():
+        j += 1
+        if expr[start:j] in FUNCTIONS:
+            return j
+    return i
+
+
+def _lex(expr: str, i: int = 0, variables=()):
+    """
+    Yield (ttype, tval, start, end) for the space-stripped expr, starting at i.
+    Identifiers listed in variables become VAR tokens.
+    """
+    n = len(expr)
 
     while i < n:
         ch = expr[i]
 
         # Number (int/float)
-        if is_num_char(ch):
+        if _is_num_char(ch):
             start = i
             dot_count = 0
-            while i < n and is_num_char(expr[i]):
+            while i < n and _is_num_char(expr[i]):
                 if expr[i] == ".":
                     dot_count += 1
                     if dot_count > 1:
-                        raise CalcError("Некорректное число (слишком много точек)")
+                        raise CalcError("Некорректное число (слишком много точек)", i)
                 i += 1
-            tokens.append(("NUM", expr[start:i]))
+            yield "NUM", expr[start:i], start, i
             continue
 
-        # Identifiers (functions)
+        # Identifiers (functions, variables)
         if ch.isalpha():
             start = i
-            while i < n and expr[i].isalpha():
-                i += 1
+            i = _scan_name(expr, i)
             name = expr[start:i]
-            if name not in FUNCTIONS:
-                raise CalcError(f"Неизвестная функция: {name}")
-            tokens.append(("FUNC", name))
+            if name in FUNCTIONS:
+                yield "FUNC", name, start, i
+            elif name in variables:
+                yield "VAR", name, start, i
+            else:
+                raise CalcError(f"Неизвестная функция: {name}", start)
             continue
 
-        # Parentheses / comma (comma not used here but kept for extensibility)
-        if ch in "()":
-            tokens.append((ch, ch))
+        # Parentheses / comma (argument separator)
+        if ch in "(),":
+            yield ch, ch, i, i + 1
             i += 1
             continue
 
         # Operators
         if ch in OPERATORS:
-            tokens.append(("OP", ch))
+            yield "OP", ch, i, i + 1
             i += 1
             continue
 
-        raise CalcError(f"Недопустимый символ: {ch}")
+        raise CalcError(f"Недопустимый символ: {ch}", i)
+
+
+def tokenize(expr: str, variables=()):
+    expr = expr.replace(" ", "")
+    if not expr:
+        raise CalcError("Пустое выражение")
+
+    return [(ttype, tval) for ttype, tval, _, _ in _lex(expr, 0, variables)]
+
+
+class IncrementalTokenizer:
+    """
+    Keeps the tokens of the previous input and re-lexes only the edited suffix.
+    Tokens that end strictly before the first changed character are reused;
+    a token touching the edit point is re-lexed because it may grow ("12" -> "123").
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.spans = [] # (ttype, tval, start, end)
+
+    def update(self, expr: str):
+        expr = expr.replace(" ", "")
+
+        # common prefix with the previous text
+        p = 0
+        limit = min(len(expr), len(self.text))
+        while p < limit and expr[p] == self.text[p]:
+            p += 1
+
+        keep = len(self.spans)
+        while keep and self.spans[keep - 1][3] >= p:
+            keep -= 1
+        del self.spans[keep:]
+        self.text = expr
+
+        resume = self.spans[-1][3] if self.spans else 0
+        for span in _lex(expr, resume):
+            self.spans.append(span)
 
-    return tokens
+        if not expr:
+            raise CalcError("Пустое выражение")
+        return [(ttype, tval) for ttype, tval, _, _ in self.spans]
+
+
+def _in_call(stack):
+    # top of the stack is "(" opened right after a registered function name
+    return len(stack) >= 2 and stack[-1][0] == "(" and stack[-2][0] == "FUNC" and stack[-2][1][0] != "neg"
+
+
+def _pop_to_output(stack, output):
+    """
+    Move the top of the stack to the output. A function that gets here and
+    not through its own ")" was written without parentheses (sin 2): it has
+    exactly one argument.
+    """
+    entry = stack.pop()
+    if entry[0] == "FUNC" and entry[1][0] != "neg":
+        name = entry[1][0]
+        arity = FUNCTIONS[name].arity
+        if arity is not None and arity != 1:
+            raise CalcError(f"{name}: нужно аргументов: {arity}")
+    output.append(entry)
 
 
 def to_rpn(tokens):
+    """
+    Shunting-yard. FUNC entries in the output carry their argument count:
+    ("FUNC", (name, argc)).
+    """
     output = []
     stack = []
+    argc = [] # argument counters, one per open parenthesis
 
-    # Handle unary minus by converting it to a special operator "u-"
-    # We'll treat "u-" as a function-like operator with high precedence.
-    prev_type = None # None, "NUM", ")", "FUNC", "OP", "("
+    # Handle unary minus by converting it to a special operator "neg"
+    # We'll treat "neg" as a function-like operator with high precedence.
+    prev_type = None # None, "NUM", ")", "FUNC", "OP", "(", ","
 
     for ttype, tval in tokens:
-        if ttype == "NUM":
-            output.append(("NUM", tval))
+        if ttype in ("NUM", "VAR"):
+            output.append((ttype, tval))
             prev_type = "NUM"
             continue
 
         if ttype == "FUNC":
-            stack.append(("FUNC", tval))
+            stack.append(("FUNC", (tval, 1)))
             prev_type = "FUNC"
             continue
 
         if ttype == "(":
             stack.append(("(", "("))
+            argc.append(1)
             prev_type = "("
             continue
 
+        if ttype == ",":
+            while stack and stack[-1][0] != "(":
+                _pop_to_output(stack, output)
+            # a comma is only valid directly inside f(...)
+            if not _in_call(stack) or prev_type in {"(", ",", "OP"}:
+                raise CalcError("Неожиданная запятая")
+            argc[-1] += 1
+            prev_type = ","
+            continue
+
         if ttype == ")":
+            if prev_type == ",":
+                raise CalcError("Неожиданная запятая")
+            if prev_type == "(" and _in_call(stack):
+                raise CalcError(f"{stack[-2][1][0]}: нет аргументов")
             while stack and stack[-1][0] != "(":
-                output.append(stack.pop())
+                _pop_to_output(stack, output)
             if not stack:
                 raise CalcError("Скобки не сбалансированы")
             stack.pop() # pop "("
+            count = argc.pop()
 
             # If top is function, pop it too
             if stack and stack[-1][0] == "FUNC":
-                output.append(stack.pop())
+                name = stack.pop()[1][0]
+                if name != "neg":
+                    arity = FUNCTIONS[name].arity
+                    if arity is not None and arity != count:
+                        raise CalcError(f"{name}: нужно аргументов: {arity}")
+                output.append(("FUNC", (name, count)))
 
             prev_type = ")"
             continue
@@ -121,10 +282,10 @@ def to_rpn(tokens):
             op = tval
 
             # Unary minus detection:
-            # If '-' comes at start or after operator or after '(' -> unary
-            if op == "-" and (prev_type is None or prev_type in {"OP", "("}):
+            # If '-' comes at start or after operator, '(' or ',' -> unary
+            if op == "-" and (prev_type is None or prev_type in {"OP", "(", ","}):
                 # push unary minus as function-like token
-                stack.append(("FUNC", "neg"))
+                stack.append(("FUNC", ("neg", 1)))
                 prev_type = "OP"
                 continue
 
@@ -132,7 +293,7 @@ def to_rpn(tokens):
                 top_type, top_val = stack[-1]
 
                 if top_type == "FUNC":
-                    output.append(stack.pop())
+                    _pop_to_output(stack, output)
                     continue
 
                 if top_type == "OP":
@@ -140,7 +301,7 @@ def to_rpn(tokens):
                     p2, _ = OPERATORS[top_val]
 
                     if (assoc1 == "L" and p1 <= p2) or (assoc1 == "R" and p1 < p2):
-                        output.append(stack.pop())
+                        _pop_to_output(stack, output)
                         continue
 
                 break
@@ -154,73 +315,89 @@ def to_rpn(tokens):
     while stack:
         if stack[-1][0] in {"(", ")"}:
             raise CalcError("Скобки не сбалансированы")
-        output.append(stack.pop())
+        _pop_to_output(stack, output)
 
     return output
 
 
-def eval_rpn(rpn):
-    st = []
-
-    def pop_num():
-        if not st:
-            raise CalcError("Недостаточно аргументов")
-        return st.pop()
-
+def compile_rpn(rpn):
+    """
+    Resolve every RPN entry once into (argc, impl, domain):
+    argc 0 pushes the constant impl, argc -1 reads variable impl from env.
+    """
+    program = []
     for ttype, tval in rpn:
         if ttype == "NUM":
             try:
-                st.append(float(tval))
+                program.append((0, float(tval), None))
             except ValueError:
                 raise CalcError("Некорректное число")
-            continue
-
-        if ttype == "OP":
-            b = pop_num()
-            a = pop_num()
-            if tval == "+":
-                st.append(a + b)
-            elif tval == "-":
-                st.append(a - b)
-            elif tval == "*":
-                st.append(a * b)
-            elif tval == "/":
-                if b == 0:
-                    raise CalcError("Деление на ноль")
-                st.append(a / b)
-            elif tval == "^":
-                st.append(a ** b)
-            else:
-                raise CalcError(f"Неизвестный оператор: {tval}")
-            continue
-
-        if ttype == "FUNC":
-            x = pop_num()
-            if tval == "sqrt":
-                if x < 0:
-                    raise CalcError("sqrt: отрицательный аргумент")
-                st.append(math.sqrt(x))
-            elif tval == "ln":
-                if x <= 0:
-                    raise CalcError("ln: аргумент должен быть > 0")
-                st.append(math.log(x))
-            elif tval == "log10":
-                if x <= 0:
-                    raise CalcError("log10: аргумент должен быть > 0")
-                st.append(math.log10(x))
-            elif tval == "neg":
-                st.append(-x)
+        elif ttype == "VAR":
+            program.append((-1, tval, None))
+        elif ttype == "OP":
+            impl, domain = BINARY_OPS[tval]
+            program.append((2, impl, domain))
+        elif ttype == "FUNC":
+            name, count = tval
+            spec = NEG if name == "neg" else FUNCTIONS[name]
+            program.append((count, spec.impl, spec.domain))
+        else:
+            raise CalcError("Ошибка вычисления")
+    return program
+
+
+def run_program(program, env=None):
+    st = []
+    push = st.append
+    pop = st.pop
+
+    try:
+        for argc, impl, domain in program:
+            if argc == 2:
+                b = pop()
+                a = pop()
+                if domain is not None:
+                    msg = domain(a, b)
+                    if msg:
+                        raise CalcError(msg)
+                push(impl(a, b))
+            elif argc == 0:
+                push(impl)
+            elif argc == 1:
+                x = pop()
+                if domain is not None:
+                    msg = domain(x)
+                    if msg:
+                        raise CalcError(msg)
+                push(impl(x))
+            elif argc < 0:
+                if env is None or impl not in env:
+                    raise CalcError(f"Не задана переменная: {impl}")
+                push(float(env[impl]))
             else:
-                raise CalcError(f"Неизвестная функция: {tval}")
-            continue
-
-        raise CalcError("Ошибка вычисления")
+                if len(st) < argc:
+                    raise CalcError("Недостаточно аргументов")
+                args = st[-argc:]
+                del st[-argc:]
+                if domain is not None:
+                    msg = domain(*args)
+                    if msg:
+                        raise CalcError(msg)
+                push(impl(*args))
+    except IndexError:
+        raise CalcError("Недостаточно аргументов")
+    except OverflowError:
+        raise CalcError("Слишком большое число")
 
     if len(st) != 1:
         raise CalcError("Некорректное выражение")
     return st[0]
 
 
+def eval_rpn(rpn, env=None):
+    return run_program(compile_rpn(rpn), env)
+
+
 def evaluate_expression(expr: str) -> float:
     tokens = tokenize(expr)
     rpn = to_rpn(tokens)
@@ -232,22 +409,30 @@ def evaluate_expression(expr: str) -> float:
 # -----------------------------
 
 class CalculatorGUI:
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, master=None):
+        # standalone: own Tk root; from the launcher: a window of its root
+        self.root = tk.Tk() if master is None else tk.Toplevel(master)
         self.root.title("Калькулятор (без eval)")
+        self.root.minsize(720, 420)
 
-        self.display = tk.Entry(self.root, font=("Arial", 16), justify="right")
+        self.expr_var = tk.StringVar()
+        self.display = tk.Entry(self.root, textvariable=self.expr_var, font=("Arial", 16), justify="right")
         self.display.grid(row=0, column=0, columnspan=5, sticky="nsew", padx=8, pady=8)
 
-        self.info = tk.Label(self.root, text="Функции: sqrt(x), ln(x), log10(x). Степень: ^", anchor="w")
-        self.info.grid(row=1, column=0, columnspan=5, sticky="nsew", padx=8)
+        # live preview: result (or error) of what is typed so far
+        self.preview = tk.Label(self.root, text="", anchor="e", fg="gray", font=("Arial", 12))
+        self.preview.grid(row=1, column=0, columnspan=5, sticky="nsew", padx=8)
+
+        self.info = tk.Label(self.root, text="Функции: sqrt, ln, log10, max(a,b,..), min, pow(a,b), hypot. Степень: ^",
+                             anchor="w")
+        self.info.grid(row=2, column=0, columnspan=5, sticky="nsew", padx=8)
 
         buttons = [
-            ("(7)", 2, 0), ("а это восемь)", 2, 1), ("9", 2, 2), ("/", 2, 3), ("(", 2, 4),
-            ("4", 3, 0), ("5", 3, 1), ("6", 3, 2), ("*", 3, 3), (")", 3, 4),
-            ("1", 4, 0), ("2", 4, 1), ("3", 4, 2), ("-", 4, 3), ("^", 4, 4),
-            ("0", 5, 0), (".", 5, 1), ("+++", 5, 2), ("CE", 5, 3), ("=", 5, 4),
-            ("sqrt(", 6, 0), ("ln(", 6, 1), ("log10(", 6, 2), ("<-", 6, 3), ("C", 6, 4),
+            ("(7)", 3, 0), ("а это восемь)", 3, 1), ("9", 3, 2), ("/", 3, 3), ("(", 3, 4),
+            ("4", 4, 0), ("5", 4, 1), ("6", 4, 2), ("*", 4, 3), (")", 4, 4),
+            ("1", 5, 0), ("2", 5, 1), ("3", 5, 2), ("-", 5, 3), ("^", 5, 4),
+            ("0", 6, 0), (".", 6, 1), ("+++", 6, 2), ("CE", 6, 3), ("=", 6, 4),
+            ("sqrt(", 7, 0), ("ln(", 7, 1), ("log10(", 7, 2), ("<-", 7, 3), ("C", 7, 4),
         ]
 
         for text, r, c in buttons:
@@ -259,30 +444,138 @@ class CalculatorGUI:
 )
             b.grid(row=r, column=c, sticky="nsew", padx=4, pady=4)
 
-        for i in range(7):
+        plot_btn = tk.Button(self.root, text="График f(x)", font=("Arial", 12),
+                             command=self.open_plot)
+        plot_btn.grid(row=8, column=0, columnspan=5, sticky="nsew", padx=4, pady=4)
+
+        # history panel
+        self.history = History()
+        self.search_var = tk.StringVar()
+        self.prefix_var = tk.BooleanVar(value=False)
+        search = tk.Entry(self.root, textvariable=self.search_var, font=("Arial", 12))
+        search.grid(row=0, column=5, sticky="nsew", padx=8, pady=8)
+        tk.Checkbutton(self.root, text="по началу", variable=self.prefix_var,
+                       command=self.refresh_history).grid(row=1, column=5, sticky="w", padx=8)
+        self.history_list = tk.Listbox(self.root, width=32, font=("Consolas", 11))
+        self.history_list.grid(row=2, column=5, rowspan=7, sticky="nsew", padx=8, pady=4)
+        self.history_list.bind("<Double-Button-1>", lambda e: self.recall_history())
+        self.history_items = []
+        self.history_poll_id = None
+        self.search_var.trace_add("write", lambda *_: self.refresh_history())
+
+        for i in range(9):
             self.root.rowconfigure(i, weight=1)
-        for j in range(5):
+        for j in range(6):
             self.root.columnconfigure(j, weight=1)
 
         self.root.bind("<Return>", lambda e: self.on_press("="))
         self.root.bind("<BackSpace>", lambda e: self.on_press("<-"))
 
+        # every edit (keyboard or buttons) restarts the debounce timer
+        self.lexer = IncrementalTokenizer()
+        self.preview_after_id = None
+        self.expr_var.trace_add("write", lambda *_: self._schedule_preview())
+
+        # the index is read in the background, the window shows up immediately
+        self.root.after_idle(self.history.load_async)
+        self.refresh_history()
+
+    @staticmethod
+    def format_value(val):
+        # pretty formatting
+        if abs(val - int(val)) < 1e-12:
+            val = int(val)
+        return str(val)
+
+    def _schedule_preview(self):
+        if self.preview_after_id is not None:
+            self.root.after_cancel(self.preview_after_id)
+        self.preview_after_id = self.root.after(PREVIEW_DELAY_MS, self._update_preview)
+
+    def _update_preview(self):
+        self.preview_after_id = None
+        expr = self.expr_var.get()
+        if not expr.strip():
+            self.preview.config(text="")
+            return
+        try:
+            val = eval_rpn(to_rpn(self.lexer.update(expr)))
+            self.preview.config(text="= " + self.format_value(val), fg="gray")
+        except CalcError as e:
+            where = ""
+            if e.pos is not None:
+                # e.pos counts non-space characters; map it back onto the typed text
+                seen = -1
+                for idx, ch in enumerate(expr):
+                    if ch != " ":
+                        seen += 1
+                        if seen == e.pos:
+                            where = f" (поз. {idx + 1})"
+                            break
+            self.preview.config(text=f"{e}{where}", fg="#b45309")
+        except Exception:
+            self.preview.config(text="", fg="gray")
+
+    def refresh_history(self):
+        if not self.history.loaded:
+            # do not block the UI on the index; poll until the loader is done
+            if self.history_poll_id is None:
+                self.history_poll_id = self.root.after(100, self._poll_history)
+            return
+        self.history_items = self.history.search(self.search_var.get(), prefix=self.prefix_var.get())
+        self.history_list.delete(0, tk.END)
+        for _, expr, result in self.history_items:
+            self.history_list.insert(tk.END, f"{expr} = {result}")
+
+    def _poll_history(self):
+        self.history_poll_id = None
+        self.refresh_history()
+
+    def recall_history(self):
+        sel = self.history_list.curselection()
+        if not sel:
+            return
+        self.display.delete(0, tk.END)
+        self.display.insert(tk.END, self.history_items[sel[0]][1])
+
+    def open_plot(self):
+        # imported on demand: the plot window needs numpy
+        from grafik import PlotWindow
+        expr = self.display.get()
+        try:
+            # a VAR token, not the letter: max(1,2) has an "x" too
+            has_x = any(ttype == "VAR" for ttype, _ in tokenize(expr, variables=("x",)))
+        except CalcError:
+            has_x = False
+        if has_x:
+            PlotWindow(self.root, expr)
+        else:
+            PlotWindow(self.root)
+
     def on_press(self, t: str):
         if t == "=":
             expr = self.display.get()
             try:
                 val = evaluate_expression(expr)
-                # pretty formatting
-                if abs(val - int(val)) < 1e-12:
-                    val = int(val)
-                self.display.delete(0, tk.END)
-                self.display.insert(tk.END, str(val))
+                result = self.format_value(val)
             except CalcError as e:
                 self.display.delete(0, tk.END)
                 self.display.insert(tk.END, f"Ошибка: {e}")
+                return
             except Exception:
                 self.display.delete(0, tk.END)
                 self.display.insert(tk.END, "Ошибка: неизвестная")
+                return
+            self.display.delete(0, tk.END)
+            self.display.insert(tk.END, result)
+
+            # the result is already shown; a disk error only loses the history entry
+            try:
+                self.history.append(expr, result)
+            except OSError:
+                return
+            if self.history.loaded:
+                self.refresh_history()
             return
 
         if t == "C":
@@ -311,7 +604,6 @@ class CalculatorGUI:
         self.display.insert(tk.END, t)
 
     def run(self):
-        self.root.minsize(420, 420)
         self.root.mainloop()
 
 
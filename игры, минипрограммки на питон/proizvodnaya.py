@@ -0,0 +1,346 @@
+import math
+from decimal import Decimal
+
+import numpy as np
+
+from kalkulyator import CalcError, FUNCTIONS, tokenize, to_rpn
+from grafik import ARRAY_OPS, ARRAY_FUNCS
+
+
+# -----------------------------
+# Symbolic derivatives for calculator expressions
+# RPN -> interned expression DAG -> d/dvar (simplified) -> one compiled
+# program that evaluates f and its gradient over NumPy arrays,
+# computing every shared subexpression only once.
+# -----------------------------
+
+def format_number(v):
+    """
+    A constant as calculator input: fixed notation, since tokenize has no
+    exponents (1e-05 -> 0.00001). Infinity and NaN have no such text.
+    """
+    if not math.isfinite(v):
+        raise CalcError("Слишком большое число" if math.isinf(v) else "Результат не определён")
+    if v == int(v) and abs(v) < 1e15:
+        return str(int(v))
+    # repr has the shortest exact digits; Decimal only moves the point
+    return format(Decimal(repr(v)), "f")
+
+
+class ExprGraph:
+    """
+    Hash-consed DAG. A node is (kind, payload, children):
+      ("num", value, ()), ("var", name, ()),
+      ("op", "+-*/^", (a, b)), ("call", name, (args...))
+    Node ids are handed out children-first, so id order is a topological order.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.index = {}
+        self.diff_cache = {}
+
+    def _intern(self, kind, payload, children=()):
+        key = (kind, payload, children)
+        nid = self.index.get(key)
+        if nid is None:
+            nid = len(self.nodes)
+            self.nodes.append(key)
+            self.index[key] = nid
+        return nid
+
+    def value(self, nid):
+        kind, payload, _ = self.nodes[nid]
+        return payload if kind == "num" else None
+
+    # ---- leaves ----
+    def num(self, v):
+        return self._intern("num", float(v))
+
+    def var(self, name):
+        return self._intern("var", name)
+
+    # ---- smart constructors (simplify while building) ----
+    def add(self, a, b):
+        va, vb = self.value(a), self.value(b)
+        if va is not None and vb is not None:
+            return self.num(va + vb)
+        if va == 0:
+            return b
+        if vb == 0:
+            return a
+        if a == b:
+            return self.mul(self.num(2), a)
+        return self._intern("op", "+", (a, b))
+
+    def sub(self, a, b):
+        va, vb = self.value(a), self.value(b)
+        if va is not None and vb is not None:
+            return self.num(va - vb)
+        if vb == 0:
+            return a
+        if va == 0:
+            return self.neg(b)
+        if a == b:
+            return self.num(0)
+        return self._intern("op", "-", (a, b))
+
+    def mul(self, a, b):
+        va, vb = self.value(a), self.value(b)
+        if va is not None and vb is not None:
+            return self.num(va * vb)
+        if va == 0 or vb == 0:
+            return self.num(0)
+        if va == 1:
+            return b
+        if vb == 1:
+            return a
+        if va == -1:
+            return self.neg(b)
+        if vb == -1:
+            return self.neg(a)
+        return self._intern("op", "*", (a, b))
+
+    def div(self, a, b):
+        va, vb = self.value(a), self.value(b)
+        if vb == 0:
+            # never folded: 0/0 and x/0 stay undefined (NaN when evaluated)
+            return self._intern("op", "/", (a, b))
+        if va is not None and vb is not None:
+            return self.num(va / vb)
+        if va == 0:
+            return self.num(0)
+        if vb == 1:
+            return a
+        if a == b:
+            return self.num(1)
+        return self._intern("op", "/", (a, b))
+
+    def power(self, a, b):
+        va, vb = self.value(a), self.value(b)
+        if vb == 0:
+            return self.num(1)
+        if vb == 1:
+            return a
+        if va is not None and vb is not None:
+            try:
+                r = va ** vb
+            except (OverflowError, ZeroDivisionError):
+                r = None
+            if isinstance(r, float):
+                return self.num(r)
+        return self._intern("op", "^", (a, b))
+
+    def neg(self, a):
+        kind, payload, children = self.nodes[a]
+        if kind == "num":
+            return self.num(-payload)
+        if kind == "call" and payload == "neg":
+            return children[0]
+        return self._intern("call", "neg", (a,))
+
+    def call(self, name, args):
+        if name == "neg":
+            return self.neg(args[0])
+        vals = [self.value(a) for a in args]
+        if None not in vals:
+            spec = FUNCTIONS[name]
+            if spec.domain is None or not spec.domain(*vals):
+                try:
+                    return self.num(spec.impl(*vals))
+                except (ValueError, OverflowError):
+                    pass # left unfolded: NaN when evaluated, like the graph
+        return self._intern("call", name, tuple(args))
+
+    # ---- building from RPN ----
+    def from_rpn(self, rpn):
+        build = {"+": self.add, "-": self.sub, "*": self.mul, "/": self.div, "^": self.power}
+        st = []
+        for ttype, tval in rpn:
+            if ttype == "NUM":
+                try:
+                    st.append(self.num(float(tval)))
+                except ValueError:
+                    raise CalcError("Некорректное число")
+            elif ttype == "VAR":
+                st.append(self.var(tval))
+            elif ttype == "OP":
+                if len(st) < 2:
+                    raise CalcError("Недостаточно аргументов")
+                b = st.pop()
+                a = st.pop()
+                st.append(build[tval](a, b))
+            elif ttype == "FUNC":
+                name, argc = tval
+                if len(st) < argc:
+                    raise CalcError("Недостаточно аргументов")
+                args = st[-argc:]
+                del st[-argc:]
+                st.append(self.call(name, args))
+            else:
+                raise CalcError("Ошибка вычисления")
+        if len(st) != 1:
+            raise CalcError("Некорректное выражение")
+        return st[0]
+
+    # ---- differentiation ----
+    def diff(self, nid, var):
+        key = (nid, var)
+        if key in self.diff_cache:
+            return self.diff_cache[key]
+
+        kind, payload, ch = self.nodes[nid]
+        if kind == "num":
+            d = self.num(0)
+        elif kind == "var":
+            d = self.num(1 if payload == var else 0)
+        elif kind == "op":
+            a, b = ch
+            da, db = self.diff(a, var), self.diff(b, var)
+            if payload == "+":
+                d = self.add(da, db)
+            elif payload == "-":
+                d = self.sub(da, db)
+            elif payload == "*":
+                d = self.add(self.mul(da, b), self.mul(a, db))
+            elif payload == "/":
+                d = self.div(self.sub(self.mul(da, b), self.mul(a, db)), self.power(b, self.num(2)))
+            else:
+                d = self._diff_power(nid, a, b, da, db)
+        else:
+            d = self._diff_call(nid, payload, ch, var)
+
+        self.diff_cache[key] = d
+        return d
+
+    def _diff_power(self, nid, a, b, da, db):
+        vb = self.value(b)
+        if vb is not None:
+            # d(a^n) = n * a^(n-1) * da
+            return self.mul(self.mul(b, self.power(a, self.num(vb - 1))), da)
+        # d(a^b) = a^b * (db * ln(a) + b * da / a)
+        return self.mul(nid, self.add(self.mul(db, self.call("ln", [a])),
+                                      self.div(self.mul(b, da), a)))
+
+    def _diff_call(self, nid, name, args, var):
+        if name == "neg":
+            return self.neg(self.diff(args[0], var))
+        if name == "pow":
+            a, b = args
+            return self._diff_power(nid, a, b, self.diff(a, var), self.diff(b, var))
+        if name == "hypot":
+            # d|v| = sum(ai * dai) / |v|
+            acc = self.num(0)
+            for a in args:
+                acc = self.add(acc, self.mul(a, self.diff(a, var)))
+            return self.div(acc, nid)
+
+        a = args[0]
+        da = self.diff(a, var)
+        if name == "sqrt":
+            return self.div(da, self.mul(self.num(2), nid))
+        if name == "ln":
+            return self.div(da, a)
+        if name == "log10":
+            return self.div(da, self.mul(a, self.num(math.log(10))))
+        raise CalcError(f"{name}: производная не поддерживается")
+
+    # ---- printing ----
+    def to_text(self, nid, parent_prec=0, right=False):
+        kind, payload, ch = self.nodes[nid]
+        if kind == "num":
+            v = payload
+            text = format_number(v)
+            return f"({text})" if v < 0 and parent_prec else text
+        if kind == "var":
+            return payload
+        if kind == "call":
+            if payload == "neg":
+                text = "-" + self.to_text(ch[0], 4)
+                return f"({text})" if parent_prec else text
+            return f"{payload}({', '.join(self.to_text(c) for c in ch)})"
+
+        prec, assoc = {"+": (1, "L"), "-": (1, "L"), "*": (2, "L"), "/": (2, "L"), "^": (3, "R")}[payload]
+        a, b = ch
+        text = (f"{self.to_text(a, prec, right=(assoc == 'R'))}{payload}"
+                f"{self.to_text(b, prec, right=(assoc == 'L'))}")
+        if prec < parent_prec or (prec == parent_prec and right):
+            return f"({text})"
+        return text
+
+
+class CompiledGradient:
+    """
+    f and df/dvar for each variable, compiled into one straight-line
+    program over the shared DAG. Call with one array (or float) per variable:
+        value, grad = g(xs, ys)
+    """
+
+    def __init__(self, expr: str, variables=("x",)):
+        self.variables = tuple(variables)
+        self.graph = g = ExprGraph()
+        self.root = g.from_rpn(to_rpn(tokenize(expr, variables=self.variables)))
+        self.grad_roots = [g.diff(self.root, v) for v in self.variables]
+        self.program, self.outputs = self._compile([self.root] + self.grad_roots)
+
+    def _compile(self, roots):
+        # reachable nodes, in id order = topological order
+        seen = set()
+        todo = list(roots)
+        while todo:
+            nid = todo.pop()
+            if nid in seen:
+                continue
+            seen.add(nid)
+            todo.extend(self.graph.nodes[nid][2])
+
+        order = sorted(seen)
+        slot = {nid: i for i, nid in enumerate(order)}
+        program = []
+        for nid in order:
+            kind, payload, ch = self.graph.nodes[nid]
+            if kind == "num":
+                # NumPy scalar: an unfolded 0/0 gives NaN, not ZeroDivisionError
+                program.append((0, np.float64(payload), ()))
+            elif kind == "var":
+                program.append((-1, self.variables.index(payload), ()))
+            elif kind == "op":
+                program.append((1, ARRAY_OPS[payload], tuple(slot[c] for c in ch)))
+            else:
+                if payload not in ARRAY_FUNCS:
+                    raise CalcError(f"{payload}: нет векторной версии")
+                program.append((1, ARRAY_FUNCS[payload], tuple(slot[c] for c in ch)))
+        return program, [slot[r] for r in roots]
+
+    def __call__(self, *arrays):
+        if len(arrays) != len(self.variables):
+            raise CalcError(f"Нужно переменных: {len(self.variables)}")
+        arrays = [np.asarray(a, dtype=float) for a in arrays]
+        shape = np.broadcast_shapes(*(a.shape for a in arrays))
+
+        vals = []
+        for kind, fn, args in self.program:
+            if kind == 0:
+                vals.append(fn)
+            elif kind < 0:
+                vals.append(arrays[fn])
+            else:
+                vals.append(fn(*[vals[i] for i in args]))
+
+        out = [np.broadcast_to(np.asarray(vals[i], dtype=float), shape) for i in self.outputs]
+        return out[0], out[1:]
+
+    def value_text(self):
+        return self.graph.to_text(self.root)
+
+    def gradient_text(self):
+        return [self.graph.to_text(r) for r in self.grad_roots]
+
+
+def derivative(expr: str, var="x", variables=None):
+    """
+    Simplified derivative of expr by var, as calculator-syntax text.
+    """
+    g = ExprGraph()
+    root = g.from_rpn(to_rpn(tokenize(expr, variables=variables or (var,))))
+    return g.to_text(g.diff(root, var))
@@ -1,16 +1,9 @@
 import tkinter as tk
 from tkinter import messagebox
-import random
 import time
-from collections import deque
 
-MINE = -1
-
-MODES = {
-    "Лёгкий (9x9, 10 мин)": (9, 9, 10),
-    "Средний (16x16, 40 мин)": (16, 16, 40),
-    "Сложный (16x30, 99 мин)": (16, 30, 99),
-}
+from saper_engine import MINE, MODES, FLAG, QUESTION, Board
+from saper_prob import ProbabilityWorker, heat_color
 
 NUMBER_COLORS = {
     1: "#1e4ed8", # blue
@@ -23,21 +16,22 @@ NUMBER_COLORS = {
     8: "#374151", # gray
 }
 
-def in_bounds(r, c, h, w):
-    return 0 <= r < h and 0 <= c < w
+# look of an unopened cell; pooled buttons are reset to it on a new game
+BUTTON_LOOK = {
+    "text": "",
+    "fg": "#111827",
+    "relief": "raised",
+    "bd": 2,
+    "bg": "#d1d5db",
+    "activebackground": "#cbd5e1",
+}
 
-def neighbors(r, c, h, w):
-    for dr in (-1, 0, 1):
-        for dc in (-1, 0, 1):
-            if dr == 0 and dc == 0:
-                continue
-            nr, nc = r + dr, c + dc
-            if in_bounds(nr, nc, h, w):
-                yield nr, nc
+HEAT_POLL_MS = 50 # how often the window looks for finished probabilities
 
 class MinesweeperApp:
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, master=None):
+        # standalone: own Tk root; from the launcher: a window of its root
+        self.root = tk.Tk() if master is None else tk.Toplevel(master)
         self.root.title("Minesweeper (tkinter)")
         self.root.resizable(False, False)
 
@@ -47,19 +41,27 @@ class MinesweeperApp:
         self.mines = 10
         self.first_click = True
         self.game_over = False
-        self.flags_count = 0
-        self.opened_count = 0
 
-        self.field = []
-        self.visible = []
-        self.flags = []
+        # Rules and per-cell state (one byte per cell) live in the board
+        self.board = Board(self.h, self.w, self.mines)
         self.buttons = []
 
+        # Button pool: (r, c) -> Button, kept across games and mode switches
+        self.pool = {}
+        self.shown_h = 0
+        self.shown_w = 0
+        self.dirty = set() # cells whose look differs from BUTTON_LOOK
+
         # Timer
         self.start_time = None
         self.timer_running = False
         self.timer_after_id = None
 
+        # Mine probability overlay, computed in a worker thread
+        self.prob = ProbabilityWorker()
+        self.heat_after_id = None
+        self.tinted = set() # closed cells colored by the overlay
+
         self._build_ui()
         self.new_game(*MODES["Лёгкий (9x9, 10 мин)"])
 
@@ -79,6 +81,10 @@ class MinesweeperApp:
             )
 
         game_menu.add_separator()
+        self.heatmap_var = tk.BooleanVar(value=False)
+        game_menu.add_checkbutton(label="Вероятности мин (H)", variable=self.heatmap_var,
+                                  command=self._heatmap_toggled)
+        self.root.bind("<KeyPress-h>", self._heatmap_key)
         game_menu.add_command(label="Новая игра", command=lambda: self.new_game(self.h, self.w, self.mines))
         game_menu.add_command(label="Выход", command=self.root.destroy)
         self.root.config(menu=menubar)
@@ -119,20 +125,13 @@ class MinesweeperApp:
         # Help footer
         footer = tk.Label(
             self.root,
-            text="ЛКМ — открыть | ПКМ — флаг | Первый клик безопасный (и 3×3 вокруг).",
+            text="ЛКМ — открыть | ПКМ — флаг / вопрос | H — вероятности | Первый клик безопасный (и 3×3 вокруг).",
             fg="#374151", pady=6
         )
         footer.pack(fill="x")
 
     def _reset_arrays(self):
-        self.field = [[0 for _ in range(self.w)] for _ in range(self.h)]
-        self.visible = [[False for _ in range(self.w)] for _ in range(self.h)]
-        self.flags = [[False for _ in range(self.w)] for _ in range(self.h)]
-        self.buttons = [[None for _ in range(self.w)] for _ in range(self.h)]
-
-    def _destroy_board(self):
-        for child in self.board_frame.winfo_children():
-            child.destroy()
+        self.board.reset(self.h, self.w, self.mines)
 
     def new_game(self, h, w, mines):
         # Stop timer
@@ -141,49 +140,74 @@ class MinesweeperApp:
         self.h, self.w, self.mines = h, w, mines
         self.first_click = True
         self.game_over = False
-        self.flags_count = 0
-        self.opened_count = 0
         self.start_time = None
 
+        self._reset_arrays()
         self.reset_btn.config(text="🙂")
         self.time_var.set("000")
         self._update_mines_counter()
 
-        self._reset_arrays()
-        self._destroy_board()
-        self._build_board_buttons()
+        self._resize_board()
+        self._reset_board_look()
+        self.tinted.clear()
+        self._update_heatmap()
+
+    def _resize_board(self):
+        """
+        Show exactly h x w pooled buttons. Same mode: nothing to do.
+        Mode switch: only the difference is hidden (grid_remove) or shown,
+        buttons are created only the first time a cell is ever needed.
+        """
+        old_h, old_w = self.shown_h, self.shown_w
+
+        for r in range(old_h):
+            for c in range(old_w):
+                if r >= self.h or c >= self.w:
+                    self.pool[(r, c)].grid_remove()
 
-    def _build_board_buttons(self):
-        # Slight “3D” look: raised buttons, nice padding
         for r in range(self.h):
             for c in range(self.w):
-                btn = tk.Button(
-                    self.board_frame,
-                    text="",
-                    width=2,
-                    height=1,
-                    font=("Segoe UI", 12, "bold"),
-                    relief="raised",
-                    bd=2,
-                    bg="#d1d5db",
-                    activebackground="#cbd5e1"
-                )
-                btn.grid(row=r, column=c, padx=1, pady=1, sticky="nsew")
-
-                # Bind clicks
-                btn.bind("<Control-Button-1>", lambda e, rr=r, cc=c: self.on_right_click(rr, cc))
-                btn.bind("<Command-Button-1>", lambda e, rr=r, cc=c: self.on_right_click(rr, cc))
-
-                self.buttons[r][c] = btn
-
-        # Make grid uniform
-        for r in range(self.h):
-            self.board_frame.grid_rowconfigure(r, weight=1)
-        for c in range(self.w):
-            self.board_frame.grid_columnconfigure(c, weight=1)
+                if r < old_h and c < old_w:
+                    continue
+                btn = self.pool.get((r, c))
+                if btn is None:
+                    self.pool[(r, c)] = self._make_button(r, c)
+                else:
+                    btn.grid() # grid_remove kept its options
+
+        # Make grid uniform; rows/columns that went away collapse
+        for r in range(min(old_h, self.h), max(old_h, self.h)):
+            self.board_frame.grid_rowconfigure(r, weight=1 if r < self.h else 0)
+        for c in range(min(old_w, self.w), max(old_w, self.w)):
+            self.board_frame.grid_columnconfigure(c, weight=1 if c < self.w else 0)
+
+        self.shown_h, self.shown_w = self.h, self.w
+        self.buttons = [[self.pool[(r, c)] for c in range(self.w)] for r in range(self.h)]
+
+    def _reset_board_look(self):
+        # one pass over the cells the last game touched, not the whole board
+        for key in self.dirty:
+            self.pool[key].config(**BUTTON_LOOK)
+        self.dirty.clear()
+
+    def _make_button(self, r, c):
+        # Slight “3D” look: raised buttons, nice padding
+        btn = tk.Button(
+            self.board_frame,
+            width=2,
+            height=1,
+            font=("Segoe UI", 12, "bold"),
+            **BUTTON_LOOK
+        )
+        btn.grid(row=r, column=c, padx=1, pady=1, sticky="nsew")
+
+        # Bind clicks
+        btn.bind("<Control-Button-1>", lambda e, rr=r, cc=c: self.on_right_click(rr, cc))
+        btn.bind("<Command-Button-1>", lambda e, rr=r, cc=c: self.on_right_click(rr, cc))
+        return btn
 
     def _update_mines_counter(self):
-        remaining = max(0, self.mines - self.flags_count)
+        remaining = max(0, self.mines - self.board.flags_count)
         self.mines_var.set(f"{remaining:03d}")
 
     def _start_timer(self):
@@ -210,46 +234,20 @@ class MinesweeperApp:
         self.time_var.set(f"{elapsed:03d}")
         self.timer_after_id = self.root.after(250, self._tick_timer)
 
-    def _place_mines_and_numbers(self, safe_r, safe_c):
-        """
-        Place mines, avoiding a 3x3 safe zone around (safe_r, safe_c).
-        """
-        forbidden = set()
-        forbidden.add((safe_r, safe_c))
-        for nr, nc in neighbors(safe_r, safe_c, self.h, self.w):
-            forbidden.add((nr, nc))
-
-        cells = [(r, c) for r in range(self.h) for c in range(self.w) if (r, c) not in forbidden]
-        random.shuffle(cells)
-        mine_cells = set(cells[:self.mines])
-
-        for r, c in mine_cells:
-            self.field[r][c] = MINE
-
-        for r in range(self.h):
-            for c in range(self.w):
-                if self.field[r][c] == MINE:
-                    continue
-                cnt = 0
-                for nr, nc in neighbors(r, c, self.h, self.w):
-                    if self.field[nr][nc] == MINE:
-                        cnt += 1
-                self.field[r][c] = cnt
-
     def on_left_click(self, r, c):
         if self.game_over:
             return
-        if self.flags[r][c]:
+        if self.board.is_flagged(r, c):
             return
-        if self.visible[r][c]:
+        if self.board.is_visible(r, c):
             return
 
         if self.first_click:
-            self._place_mines_and_numbers(r, c)
+            self.board.place_mines_and_numbers(r, c)
             self.first_click = False
             self._start_timer()
 
-        if self.field[r][c] == MINE:
+        if self.board.is_mine(r, c):
             self._lose(r, c)
             return
 
@@ -257,19 +255,22 @@ class MinesweeperApp:
 
         if self._check_win():
             self._win()
+        else:
+            self._update_heatmap()
 
     def on_right_click(self, r, c):
         if self.game_over:
             return
-        if self.visible[r][c]:
-            return
 
-        self.flags[r][c] = not self.flags[r][c]
-        if self.flags[r][c]:
-            self.flags_count += 1
+        mark = self.board.cycle_mark(r, c)
+        if mark is None:
+            return
+        self.dirty.add((r, c))
+        if mark == FLAG:
             self.buttons[r][c].config(text="🚩", fg="#111827")
+        elif mark == QUESTION:
+            self.buttons[r][c].config(text="?", fg="#4c1d95")
         else:
-            self.flags_count -= 1
             self.buttons[r][c].config(text="", fg="#111827")
 
         self._update_mines_counter()
@@ -280,52 +281,100 @@ class MinesweeperApp:
     def _open_cell_or_flood(self, r, c):
         """
         Open this cell; if it is 0, flood fill open all connected zeros and their borders.
+        The board does the fill, here only the opened buttons are restyled.
         """
-        q = deque()
-        q.append((r, c))
-
-        while q:
-            cr, cc = q.popleft()
-            if self.visible[cr][cc] or self.flags[cr][cc]:
-                continue
-
-            self.visible[cr][cc] = True
-            self.opened_count += 1
+        board = self.board
+        for i in board.open_cell_or_flood(r, c):
+            cr, cc = divmod(i, self.w)
+            self.dirty.add((cr, cc))
 
             btn = self.buttons[cr][cc]
             btn.config(relief="sunken", bd=1, bg="#f3f4f6", activebackground="#f3f4f6")
 
-            val = self.field[cr][cc]
+            val = board.value(cr, cc)
             if val == 0:
                 btn.config(text="")
-                for nr, nc in neighbors(cr, cc, self.h, self.w):
-                    if not self.visible[nr][nc] and not self.flags[nr][nc]:
-                        q.append((nr, nc))
             else:
                 btn.config(text=str(val), fg=NUMBER_COLORS.get(val, "#111827"))
 
+    # ---- probability overlay ----
+    def _heatmap_key(self, e):
+        self.heatmap_var.set(not self.heatmap_var.get())
+        self._heatmap_toggled()
+
+    def _heatmap_toggled(self):
+        if self.heatmap_var.get():
+            self._update_heatmap()
+        else:
+            self.prob.cancel()
+            self._clear_heatmap()
+
+    def _update_heatmap(self):
+        """
+        The board changed: hand a snapshot to the worker (a computation still
+        running for the old board is dropped) and wait for the result.
+        """
+        if not self.heatmap_var.get():
+            return
+        if self.game_over:
+            self.prob.cancel()
+            return
+        self.prob.submit(self.board)
+        if self.heat_after_id is None:
+            self.heat_after_id = self.root.after(HEAT_POLL_MS, self._poll_heatmap)
+
+    def _poll_heatmap(self):
+        self.heat_after_id = None
+        if self.game_over:
+            return # the board is revealed, a late result must not tint it
+        probs = self.prob.poll()
+        if probs is None:
+            if self.prob.pending:
+                self.heat_after_id = self.root.after(HEAT_POLL_MS, self._poll_heatmap)
+            return
+        for i, p in enumerate(probs):
+            if p is None:
+                continue # opened
+            key = divmod(i, self.w)
+            color = heat_color(p)
+            self.pool[key].config(bg=color, activebackground=color)
+            self.dirty.add(key)
+            self.tinted.add(key)
+
+    def _stop_heatmap(self):
+        # game over: drop the computation still running for the last click
+        self.prob.cancel()
+        if self.heat_after_id is not None:
+            self.root.after_cancel(self.heat_after_id)
+            self.heat_after_id = None
+
+    def _clear_heatmap(self):
+        for r, c in self.tinted:
+            if not self.board.is_visible(r, c):
+                self.buttons[r][c].config(bg=BUTTON_LOOK["bg"], activebackground=BUTTON_LOOK["activebackground"])
+        self.tinted.clear()
+
     def _reveal_all(self, exploded_at=None):
-        for r in range(self.h):
-            for c in range(self.w):
-                btn = self.buttons[r][c]
-                val = self.field[r][c]
-                if val == MINE:
-                    if exploded_at == (r, c):
-                        btn.config(text="💥", bg="#fecaca", relief="sunken", bd=1)
-                    else:
-                        btn.config(text="💣", bg="#e5e7eb", relief="sunken", bd=1)
+        for r, c, val, opened_now in self.board.reveal_all():
+            btn = self.buttons[r][c]
+            self.dirty.add((r, c))
+            if val == MINE:
+                if exploded_at == (r, c):
+                    btn.config(text="💥", bg="#fecaca", relief="sunken", bd=1)
+                else:
+                    btn.config(text="💣", bg="#e5e7eb", relief="sunken", bd=1)
+            else:
+                if opened_now:
+                    btn.config(relief="sunken", bd=1, bg="#f3f4f6", activebackground="#f3f4f6")
+                if val == 0:
+                    btn.config(text="")
                 else:
-                    if not self.visible[r][c]:
-                        self.visible[r][c] = True
-                        btn.config(relief="sunken", bd=1, bg="#f3f4f6", activebackground="#f3f4f6")
-                    if val == 0:
-                        btn.config(text="")
-                    else:
-                        btn.config(text=str(val), fg=NUMBER_COLORS.get(val, "#111827"))
+                    btn.config(text=str(val), fg=NUMBER_COLORS.get(val, "#111827"))
 
     def _lose(self, r, c):
         self.game_over = True
         self._stop_timer()
+        self._stop_heatmap()
         self.reset_btn.config(text="😵")
         self._reveal_all(exploded_at=(r, c))
         messagebox.showinfo("Поражение", "Бум 💥 Ты попал на мину!")
@@ -333,15 +382,13 @@ class MinesweeperApp:
     def _win(self):
         self.game_over = True
         self._stop_timer()
+        self._stop_heatmap()
         self.reset_btn.config(text="😎")
 
         # Auto-flag all mines for nice finish
-        for r in range(self.h):
-            for c in range(self.w):
-                if self.field[r][c] == MINE and not self.flags[r][c]:
-                    self.flags[r][c] = True
-                    self.flags_count += 1
-                    self.buttons[r][c].config(text="🚩")
+        for r, c in self.board.flag_all_mines():
+            self.dirty.add((r, c))
+            self.buttons[r][c].config(text="🚩", fg="#111827")
         self._update_mines_counter()
 
         messagebox.showinfo("Победа", "Красавчик 😎 Все мины обезврежены!")
@@ -350,11 +397,7 @@ class MinesweeperApp:
         """
         Win if all non-mine cells are opened.
         """
-        if self.first_click:
-            return False
-        total_cells = self.h * self.w
-        non_mines = total_cells - self.mines
-        return self.opened_count == non_mines
+        return self.board.check_win()
 
     def run(self):
         self.root.mainloop()
@@ -0,0 +1,286 @@
+import random
+from array import array
+from collections import deque
+
+# -----------------------------
+# Minesweeper rules without tkinter
+# Used by saper2.0.py / saper3.0.py and by the race server (saper_race.py)
+# -----------------------------
+
+MINE = -1
+
+MODES = {
+    "Лёгкий (9x9, 10 мин)": (9, 9, 10),
+    "Средний (16x16, 40 мин)": (16, 16, 40),
+    "Сложный (16x30, 99 мин)": (16, 30, 99),
+}
+
+# One byte per cell (index r * w + c):
+#   bits 0-3  number of mines around (0..8)
+#   bit  4    mine
+#   bit  5    opened
+#   bits 6-7  player's mark: none / flag / question
+COUNT_MASK = 0x0F
+MINE_BIT = 0x10
+VISIBLE_BIT = 0x20
+MARK_SHIFT = 6
+MARK_MASK = 0xC0
+
+NO_MARK = 0
+FLAG = 1
+QUESTION = 2
+
+# right click: nothing -> flag -> question -> nothing
+NEXT_MARK = {NO_MARK: FLAG, FLAG: QUESTION, QUESTION: NO_MARK}
+
+# bytes.translate tables
+_ADD_MINE = bytes(b | MINE_BIT for b in range(256))
+_OPEN_SAFE = bytes(b if b & MINE_BIT else b | VISIBLE_BIT for b in range(256))
+
+def cell_value(b):
+    """
+    MINE or the number of mines around, from a cell byte.
+    """
+    return MINE if b & MINE_BIT else b & COUNT_MASK
+
+def cell_mark(b):
+    return (b & MARK_MASK) >> MARK_SHIFT
+
+# per byte value lookups for the loops over the whole board
+_VALUE = [cell_value(b) for b in range(256)]
+_OPENED_NOW = [not b & (MINE_BIT | VISIBLE_BIT) for b in range(256)]
+
+def in_bounds(r, c, h, w):
+    return 0 <= r < h and 0 <= c < w
+
+def neighbors(r, c, h, w):
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            if dr == 0 and dc == 0:
+                continue
+            nr, nc = r + dr, c + dc
+            if in_bounds(nr, nc, h, w):
+                yield nr, nc
+
+def neighbor_indices(i, h, w):
+    """
+    Flat indices of the cells around cell i.
+    """
+    r, c = divmod(i, w)
+    up, down = r > 0, r < h - 1
+    out = []
+    if c > 0:
+        out.append(i - 1)
+        if up:
+            out.append(i - w - 1)
+        if down:
+            out.append(i + w - 1)
+    if c < w - 1:
+        out.append(i + 1)
+        if up:
+            out.append(i - w + 1)
+        if down:
+            out.append(i + w + 1)
+    if up:
+        out.append(i - w)
+    if down:
+        out.append(i + w)
+    return out
+
+class Board:
+    """
+    One Minesweeper board, all per-cell state packed into self.cells
+    (see the bit layout above): a 4000x4000 board is 16 MB.
+    Mines are placed on the first open, avoiding a 3x3 safe zone.
+    With the same seed and the same first cell two boards are identical.
+    """
+
+    def __init__(self, h, w, mines, seed=None):
+        self.rng = random.Random(seed)
+        self.reset(h, w, mines)
+
+    def reset(self, h, w, mines, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+        self.h, self.w, self.mines = h, w, mines
+        self.placed = False
+        self.exploded = None
+        self.opened_count = 0
+        self.flags_count = 0
+        self.cells = bytearray(h * w)
+
+    # ---- cell accessors ----
+    def value(self, r, c):
+        return cell_value(self.cells[r * self.w + c])
+
+    def is_mine(self, r, c):
+        return bool(self.cells[r * self.w + c] & MINE_BIT)
+
+    def is_visible(self, r, c):
+        return bool(self.cells[r * self.w + c] & VISIBLE_BIT)
+
+    def mark(self, r, c):
+        return cell_mark(self.cells[r * self.w + c])
+
+    def is_flagged(self, r, c):
+        return self.mark(r, c) == FLAG
+
+    def _set_mark(self, i, mark):
+        b = self.cells[i]
+        if cell_mark(b) == FLAG:
+            self.flags_count -= 1
+        if mark == FLAG:
+            self.flags_count += 1
+        self.cells[i] = (b & ~MARK_MASK) | (mark << MARK_SHIFT)
+
+    # ---- game ----
+    def place_mines_and_numbers(self, safe_r, safe_c):
+        """
+        Place mines, avoiding a 3x3 safe zone around (safe_r, safe_c).
+        Mines are drawn straight into the byte grid (no list of free cells),
+        then every mine adds one to its neighbours: 8 * mines steps, not 8 * cells.
+        """
+        h, w, cells = self.h, self.w, self.cells
+        total = h * w
+        safe = safe_r * w + safe_c
+        zone = [safe] + neighbor_indices(safe, h, w)
+        allowed = total - len(zone)
+        k = min(self.mines, allowed)
+        rand = self.rng.randrange
+
+        for i in zone:
+            cells[i] |= MINE_BIT # taken for the draw, cleared below
+        if 2 * k <= allowed:
+            mines = array("i")
+            while len(mines) < k:
+                i = rand(total)
+                if not cells[i] & MINE_BIT:
+                    cells[i] |= MINE_BIT
+                    mines.append(i)
+        else:
+            # more mines than free cells: mine everything, then draw the free cells
+            cells[:] = cells.translate(_ADD_MINE)
+            zone_set = set(zone)
+            free = 0
+            while free < allowed - k:
+                i = rand(total)
+                if cells[i] & MINE_BIT and i not in zone_set:
+                    cells[i] &= ~MINE_BIT
+                    free += 1
+            mines = array("i", (i for i, b in enumerate(cells) if b & MINE_BIT and i not in zone_set))
+        for i in zone:
+            cells[i] &= ~MINE_BIT
+
+        last_r, last_c = h - 1, w - 1
+        for i in mines:
+            r, c = divmod(i, w)
+            if 0 < r < last_r and 0 < c < last_c:
+                # inner cell: all 8 neighbours exist; a count never reaches the mine bit
+                cells[i - w - 1] += 1
+                cells[i - w] += 1
+                cells[i - w + 1] += 1
+                cells[i - 1] += 1
+                cells[i + 1] += 1
+                cells[i + w - 1] += 1
+                cells[i + w] += 1
+                cells[i + w + 1] += 1
+            else:
+                for n in neighbor_indices(i, h, w):
+                    cells[n] += 1
+        self.placed = True
+
+    def open_cell_or_flood(self, r, c):
+        """
+        Open this cell; if it is 0, flood fill open all connected zeros and their borders.
+        Flagged cells stay closed, question marks are opened.
+        Returns the flat indices of the newly opened cells in opening order.
+        """
+        h, w, cells = self.h, self.w, self.cells
+        opened = []
+        q = deque()
+        q.append(r * w + c)
+
+        while q:
+            i = q.popleft()
+            b = cells[i]
+            if b & VISIBLE_BIT or cell_mark(b) == FLAG:
+                continue
+
+            cells[i] = (b | VISIBLE_BIT) & ~MARK_MASK
+            self.opened_count += 1
+            opened.append(i)
+
+            if not b & (COUNT_MASK | MINE_BIT):
+                for n in neighbor_indices(i, h, w):
+                    nb = cells[n]
+                    if not nb & VISIBLE_BIT and cell_mark(nb) != FLAG:
+                        q.append(n)
+        return opened
+
+    def click(self, r, c):
+        """
+        A full left click with all the checks: out of the board, game over,
+        flagged or already open cells are ignored. The first click places mines.
+        Returns the opened cells (flat indices); a mine ends the game (self.exploded).
+        """
+        if not in_bounds(r, c, self.h, self.w) or self.finished:
+            return []
+        if self.is_flagged(r, c) or self.is_visible(r, c):
+            return []
+        if not self.placed:
+            self.place_mines_and_numbers(r, c)
+        if self.is_mine(r, c):
+            self.exploded = (r, c)
+            return []
+        return self.open_cell_or_flood(r, c)
+
+    def reveal_all(self):
+        """
+        End of the game: every safe cell becomes visible.
+        The board changes right away; the returned iterator gives
+        (r, c, value, opened_now) for every cell of the board.
+        """
+        before = bytes(self.cells)
+        self.cells[:] = before.translate(_OPEN_SAFE) # the whole grid at C speed
+        return self._revealed(before)
+
+    def _revealed(self, before):
+        w, value, opened_now = self.w, _VALUE, _OPENED_NOW
+        for r in range(self.h):
+            for c, b in enumerate(before[r * w:(r + 1) * w]):
+                yield r, c, value[b], opened_now[b]
+
+    def cycle_mark(self, r, c):
+        """
+        Right click: no mark -> flag -> question -> no mark.
+        Returns the new mark, or None if the cell can't be marked.
+        """
+        if self.finished or self.is_visible(r, c):
+            return None
+        i = r * self.w + c
+        mark = NEXT_MARK[cell_mark(self.cells[i])]
+        self._set_mark(i, mark)
+        return mark
+
+    def flag_all_mines(self):
+        """
+        Nice finish after a win. Returns (r, c) of the mines flagged now.
+        """
+        flagged = []
+        for i, b in enumerate(self.cells):
+            if b & MINE_BIT and cell_mark(b) != FLAG:
+                self._set_mark(i, FLAG)
+                flagged.append(divmod(i, self.w))
+        return flagged
+
+    def check_win(self):
+        """
+        Win if all non-mine cells are opened.
+        """
+        if not self.placed:
+            return False
+        return self.opened_count == self.h * self.w - self.mines
+
+    @property
+    def finished(self):
+        return self.exploded is not None or self.check_win()
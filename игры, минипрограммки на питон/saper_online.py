@@ -0,0 +1,248 @@
+import tkinter as tk
+import asyncio
+import queue
+import sys
+import threading
+
+from saper_race import (
+    RaceClient, RaceView, HOST, PORT, MINE_CODE, PLAYING, CLEARED, BOOM,
+    MSG_START, MSG_OPENED, MSG_PROGRESS, MSG_END,
+)
+
+# -----------------------------
+# Race Minesweeper: the player's window
+# The network runs in its own thread (asyncio); the window takes messages
+# from a queue every POLL_MS. Own board is one canvas, each opponent is
+# a small map that fills up as the server pushes their progress.
+# Run: python saper_race.py 2 1 (server + one bot), then python saper_online.py [host] [port]
+# -----------------------------
+
+CELL = 24
+MAP_CELL = 5
+POLL_MS = 30
+
+NUMBER_COLORS = {
+    1: "#1e4ed8", # blue
+    2: "#15803d", # green
+    3: "#dc2626", # red
+    4: "#4c1d95", # purple
+    5: "#7f1d1d", # dark red
+    6: "#0e7490", # teal
+    7: "#111827", # almost black
+    8: "#374151", # gray
+}
+
+CLOSED_BG = "#d1d5db"
+OPEN_BG = "#f3f4f6"
+STATUS_TEXT = {PLAYING: "", CLEARED: " 😎", BOOM: " 💥"}
+
+
+class QueueClient(RaceClient):
+    # messages are not parsed in the network thread, only handed to the window
+    def __init__(self, inbox):
+        super().__init__()
+        self.inbox = inbox
+
+    def receive(self, msg):
+        self.inbox.put(msg)
+
+
+class RaceWindow:
+    def __init__(self, root, host=HOST, port=PORT):
+        self.root = root
+        self.root.title("Сапёр: гонка")
+        self.root.resizable(False, False)
+
+        top = tk.Frame(root, padx=10, pady=8)
+        top.pack(fill="x")
+        self.mines_var = tk.StringVar(value="000")
+        tk.Label(top, textvariable=self.mines_var, width=5, font=("Consolas", 16, "bold"),
+                 bg="#111827", fg="#f9fafb", padx=8, pady=4).pack(side="left")
+        self.status_var = tk.StringVar(value="Подключение…")
+        tk.Label(top, textvariable=self.status_var, font=("Segoe UI", 12), padx=10).pack(side="left")
+
+        body = tk.Frame(root, padx=10, pady=10, bg="#e5e7eb")
+        body.pack()
+        self.board = tk.Canvas(body, width=0, height=0, bg="#e5e7eb", highlightthickness=0)
+        self.board.pack(side="left")
+        self.maps_frame = tk.Frame(body, bg="#e5e7eb", padx=10)
+        self.maps_frame.pack(side="left", anchor="n")
+
+        self.inbox = queue.Queue()
+        self.client = QueueClient(self.inbox)
+        self.view = self.client.view
+        self.loop = None
+        self.host, self.port = host, port
+
+        self.rects = [] # own board: one rectangle + one text per cell
+        self.texts = []
+        self.flags = set()
+        self.waiting = set() # clicked, the answer hasn't come yet
+        self.maps = {} # pid -> (canvas, rectangles)
+        self.map_labels = {}
+
+        self.board.bind("<Button-1>", self.on_left_click)
+        self.board.bind("<Button-3>", self.on_right_click)
+        self.board.bind("<Control-Button-1>", self.on_right_click)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        threading.Thread(target=self.net_main, daemon=True).start()
+        self.poll()
+
+    # ---- network (own thread) ----
+    def net_main(self):
+        asyncio.run(self.net_session())
+
+    async def net_session(self):
+        self.loop = asyncio.get_running_loop()
+        try:
+            await self.client.connect(self.host, self.port)
+        except OSError as e:
+            self.inbox.put(f"Нет соединения с {self.host}:{self.port} ({e.strerror or e})")
+            return
+        self.inbox.put("Ждём соперников…")
+        await self.client.run()
+
+    def close(self):
+        # once the session is over (race finished, no connection) asyncio.run
+        # has closed the loop; the window must close anyway
+        if self.loop is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.client.close)
+            except RuntimeError:
+                pass # closed in between
+        self.root.destroy()
+
+    # ---- input ----
+    def cell_at(self, e):
+        r, c = e.y // CELL, e.x // CELL
+        v = self.view
+        if not (0 <= r < v.h and 0 <= c < v.w):
+            return None
+        return r * v.w + c
+
+    def playing(self):
+        v = self.view
+        return self.loop is not None and v.my_pid is not None and not v.over and v.status[v.my_pid] == PLAYING
+
+    def on_left_click(self, e):
+        cell = self.cell_at(e)
+        if cell is None or not self.playing():
+            return
+        if cell in self.flags or cell in self.waiting or self.view.cells[cell] != RaceView.UNKNOWN:
+            return
+        self.waiting.add(cell)
+        self.loop.call_soon_threadsafe(self.client.send_open, cell)
+
+    def on_right_click(self, e):
+        # flags are the player's notes, the server doesn't need them
+        cell = self.cell_at(e)
+        if cell is None or not self.playing() or self.view.cells[cell] != RaceView.UNKNOWN:
+            return
+        if cell in self.flags:
+            self.flags.discard(cell)
+            self.board.itemconfig(self.texts[cell], text="")
+        else:
+            self.flags.add(cell)
+            self.board.itemconfig(self.texts[cell], text="🚩", fill="#111827")
+        self.update_mines_counter()
+
+    def update_mines_counter(self):
+        self.mines_var.set(f"{max(0, self.view.mines - len(self.flags)):03d}")
+
+    # ---- messages ----
+    def poll(self):
+        changed = False
+        while True:
+            try:
+                msg = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(msg, str):
+                self.status_var.set(msg)
+                continue
+            self.view.apply(msg)
+            kind = msg[0]
+            if kind == MSG_START:
+                self.build()
+            elif kind == MSG_OPENED:
+                self.waiting.clear()
+                for cell in self.view.last_opened:
+                    self.draw_cell(cell)
+            elif kind == MSG_PROGRESS:
+                for pid, cell in self.view.last_seen:
+                    self.draw_map_cell(pid, cell)
+            changed = True
+            if kind == MSG_END:
+                self.waiting.clear()
+
+        if changed:
+            self.update_status()
+        self.root.after(POLL_MS, self.poll)
+
+    # ---- drawing ----
+    def build(self):
+        v = self.view
+        self.board.config(width=v.w * CELL, height=v.h * CELL)
+        for r in range(v.h):
+            for c in range(v.w):
+                x, y = c * CELL, r * CELL
+                self.rects.append(self.board.create_rectangle(x + 1, y + 1, x + CELL - 1, y + CELL - 1,
+                                                              fill=CLOSED_BG, outline="#9ca3af"))
+                self.texts.append(self.board.create_text(x + CELL / 2, y + CELL / 2, text="",
+                                                         font=("Segoe UI", 11, "bold")))
+        for pid in sorted(v.seen):
+            label = tk.Label(self.maps_frame, text="", bg="#e5e7eb", anchor="w")
+            label.pack(fill="x")
+            canvas = tk.Canvas(self.maps_frame, width=v.w * MAP_CELL, height=v.h * MAP_CELL,
+                               bg=CLOSED_BG, highlightthickness=0)
+            canvas.pack(pady=(0, 8))
+            self.map_labels[pid] = label
+            self.maps[pid] = canvas
+        self.update_mines_counter()
+
+    def draw_cell(self, cell):
+        value = self.view.cells[cell]
+        self.flags.discard(cell) # a flood fill may open a wrongly flagged cell
+        if value == MINE_CODE:
+            self.board.itemconfig(self.rects[cell], fill="#fecaca")
+            self.board.itemconfig(self.texts[cell], text="💥")
+            return
+        self.board.itemconfig(self.rects[cell], fill=OPEN_BG, outline=OPEN_BG)
+        self.board.itemconfig(self.texts[cell], text=str(value) if value else "",
+                              fill=NUMBER_COLORS.get(value, "#111827"))
+
+    def draw_map_cell(self, pid, cell):
+        # one small square per opened cell, created when the cell is opened
+        r, c = divmod(cell, self.view.w)
+        color = "#ef4444" if self.view.seen[pid][cell] == MINE_CODE else OPEN_BG
+        self.maps[pid].create_rectangle(c * MAP_CELL, r * MAP_CELL, (c + 1) * MAP_CELL, (r + 1) * MAP_CELL,
+                                        fill=color, outline="")
+
+    def update_status(self):
+        v = self.view
+        if v.my_pid is None:
+            return
+        total = v.safe_cells
+        for pid, label in self.map_labels.items():
+            label.config(text=f"Игрок {pid + 1}: {v.progress[pid] * 100 // total}%{STATUS_TEXT[v.status[pid]]}")
+        if v.over:
+            if v.winner == v.my_pid:
+                text = "Победа 😎 Ты первым очистил поле!"
+            elif v.winner is None:
+                text = "Все подорвались 💥"
+            else:
+                text = f"Первым был игрок {v.winner + 1}"
+        elif v.status[v.my_pid] == BOOM:
+            text = "Бум 💥 Смотрим, как доигрывают другие"
+        else:
+            text = f"Ты: {v.opened * 100 // total}%"
+        self.status_var.set(text)
+
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = RaceWindow(root,
+                     sys.argv[1] if len(sys.argv) > 1 else HOST,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else PORT)
+    root.mainloop()
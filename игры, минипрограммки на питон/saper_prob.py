@@ -0,0 +1,291 @@
+import math
+import threading
+from collections import OrderedDict
+
+from saper_engine import COUNT_MASK, VISIBLE_BIT, neighbor_indices
+
+# -----------------------------
+# Exact mine probabilities for the heatmap overlay of saper2.0.py / saper3.0.py
+# Only what the player sees is used: opened cells and their numbers
+# (flags are the player's guesses and are not trusted).
+# Closed cells next to numbers form independent components; every component's
+# mine layouts are enumerated once and cached, the rest of the closed cells
+# are weighted by how many ways the remaining mines fit into them.
+# -----------------------------
+
+CACHE_SIZE = 512 # solved components kept between clicks
+CHECK_EVERY = 2048 # search steps between two looks at the cancel flag
+
+HEAT_STEPS = 20
+SAFE_RGB = (134, 239, 172) # green
+MINE_RGB = (248, 113, 113) # red
+HEAT_COLORS = [
+    "#%02x%02x%02x" % tuple(round(s + (m - s) * k / HEAT_STEPS) for s, m in zip(SAFE_RGB, MINE_RGB))
+    for k in range(HEAT_STEPS + 1)
+]
+
+def heat_color(p):
+    """
+    Background color of a closed cell with mine probability p.
+    """
+    return HEAT_COLORS[round(p * HEAT_STEPS)]
+
+
+class Cancelled(Exception):
+    pass
+
+
+def frontier(cells, h, w):
+    """
+    Constraints of the opened numbers: (closed cells around, mines among them),
+    one per opened cell that touches a closed one.
+    Returns (constraints, indices of all closed cells).
+    """
+    closed = [i for i, b in enumerate(cells) if not b & VISIBLE_BIT]
+    constraints = []
+    for i, b in enumerate(cells):
+        if not b & VISIBLE_BIT:
+            continue
+        around = tuple(n for n in sorted(neighbor_indices(i, h, w)) if not cells[n] & VISIBLE_BIT)
+        if around:
+            constraints.append((around, b & COUNT_MASK))
+    return constraints, closed
+
+
+def components(constraints):
+    """
+    Splits the constraints into groups that share no closed cell.
+    Every group is a sorted tuple, so the same group always makes the same cache key.
+    """
+    parent = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for around, _need in constraints:
+        for i in around:
+            parent.setdefault(i, i)
+        root = find(around[0])
+        for i in around[1:]:
+            parent[find(i)] = root
+
+    groups = {}
+    for con in set(constraints): # two numbers may see the very same cells
+        groups.setdefault(find(con[0][0]), []).append(con)
+    return [tuple(sorted(group)) for group in groups.values()]
+
+
+def solve_component(constraints, cancelled=None):
+    """
+    Enumerates every mine layout of one component.
+    Returns (cells, counts, per_cell): counts[k] is the number of layouts with
+    k mines, per_cell[j][k] the number of those where cells[j] is a mine.
+    """
+    by_cell = {}
+    for ci, (around, _need) in enumerate(constraints):
+        for i in around:
+            by_cell.setdefault(i, []).append(ci)
+
+    # breadth first through the constraints: a number is checked as soon as
+    # its last cell is decided, so dead branches are cut early
+    order = []
+    seen = set()
+    for start in sorted(by_cell):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = [start]
+        for i in queue:
+            order.append(i)
+            for ci in by_cell[i]:
+                for n in constraints[ci][0]:
+                    if n not in seen:
+                        seen.add(n)
+                        queue.append(n)
+
+    n = len(order)
+    cons_of = [by_cell[i] for i in order]
+    need = [need for _around, need in constraints]
+    left = [len(around) for around, _need in constraints]
+    counts = [0] * (n + 1)
+    per_cell = [[0] * (n + 1) for _ in range(n)]
+    mines_on = []
+    steps = [0]
+
+    def place(k, mines):
+        if k == n:
+            counts[mines] += 1
+            for j in mines_on:
+                per_cell[j][mines] += 1
+            return
+        steps[0] += 1
+        if cancelled is not None and steps[0] % CHECK_EVERY == 0 and cancelled():
+            raise Cancelled
+        cs = cons_of[k]
+
+        # safe: every number still needs no more mines than cells it has left
+        for ci in cs:
+            left[ci] -= 1
+        if all(need[ci] <= left[ci] for ci in cs):
+            place(k + 1, mines)
+
+        # mine
+        for ci in cs:
+            need[ci] -= 1
+        if all(need[ci] >= 0 for ci in cs):
+            mines_on.append(k)
+            place(k + 1, mines + 1)
+            mines_on.pop()
+
+        for ci in cs:
+            need[ci] += 1
+            left[ci] += 1
+
+    place(0, 0)
+    return tuple(order), counts, per_cell
+
+
+def convolve(a, b):
+    out = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                out[i + j] += x * y
+    return out
+
+
+class ComponentCache:
+    """
+    LRU of solved components, keyed by their constraints.
+    A click changes only the components around it; the others are found here.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.solved = OrderedDict()
+
+    def solve(self, constraints, cancelled=None):
+        result = self.solved.get(constraints)
+        if result is None:
+            result = solve_component(constraints, cancelled)
+            self.solved[constraints] = result
+            if len(self.solved) > self.size:
+                self.solved.popitem(last=False)
+        else:
+            self.solved.move_to_end(constraints)
+        return result
+
+
+def mine_probabilities(cells, h, w, mines, cache=None, cancelled=None):
+    """
+    Mine probability of every cell from a snapshot of Board.cells:
+    a float for every closed cell, None for opened ones.
+
+    All layouts are equally likely, so a layout where the components hold
+    k mines in total counts comb(other closed cells, mines - k) times.
+    Returns None if no layout fits (the numbers can't all be true).
+    """
+    if cache is None:
+        cache = ComponentCache()
+    constraints, closed = frontier(cells, h, w)
+    solved = [cache.solve(group, cancelled) for group in components(constraints)]
+
+    in_frontier = set()
+    for order, _counts, _per_cell in solved:
+        in_frontier.update(order)
+    rest = len(closed) - len(in_frontier)
+
+    def ways(k):
+        # layouts of the other closed cells when the components hold k mines
+        left = mines - k
+        return math.comb(rest, left) if 0 <= left <= rest else 0
+
+    everything = [1]
+    for _order, counts, _per_cell in solved:
+        everything = convolve(everything, counts)
+    total = sum(n * ways(k) for k, n in enumerate(everything))
+    if total == 0:
+        return None
+
+    probs = [None] * (h * w)
+    for j, (order, _counts, per_cell) in enumerate(solved):
+        others = [1]
+        for m, (_o, counts, _p) in enumerate(solved):
+            if m != j:
+                others = convolve(others, counts)
+        # weight of "this component holds a mines" with the rest of the board
+        weight = [sum(n * ways(a + b) for b, n in enumerate(others)) for a in range(len(order) + 1)]
+        for i, by_k in zip(order, per_cell):
+            probs[i] = sum(n * weight[a] for a, n in enumerate(by_k)) / total
+
+    if rest:
+        # every other closed cell: mean share of the mines left for them
+        inner = sum(n * ways(k) * (mines - k) for k, n in enumerate(everything)) / (total * rest)
+        for i in closed:
+            if i not in in_frontier:
+                probs[i] = inner
+    return probs
+
+
+class ProbabilityWorker:
+    """
+    Runs mine_probabilities off the Tk thread.
+    submit() hands over a snapshot of the board and cancels the computation
+    still running for an older one; poll() returns the result for the last
+    submit once it is ready. The component cache lives in the worker thread.
+    """
+
+    def __init__(self):
+        self.cache = ComponentCache()
+        self.cond = threading.Condition()
+        self.generation = 0
+        self.request = None
+        self.result = None # (generation, probabilities)
+        self.pending = False # a submit whose result hasn't been taken yet
+        self.thread = None
+
+    def submit(self, board):
+        with self.cond:
+            self.generation += 1
+            self.request = (self.generation, bytes(board.cells), board.h, board.w, board.mines)
+            self.pending = True
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def cancel(self):
+        with self.cond:
+            self.generation += 1
+            self.request = None
+            self.pending = False
+
+    def poll(self):
+        with self.cond:
+            if self.result is None or self.result[0] != self.generation:
+                return None
+            probs = self.result[1]
+            self.result = None
+            self.pending = False
+            return probs
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.request is None:
+                    self.cond.wait()
+                generation, cells, h, w, mines = self.request
+                self.request = None
+            try:
+                probs = mine_probabilities(cells, h, w, mines, self.cache,
+                                           lambda: self.generation != generation)
+            except Cancelled:
+                continue
+            if probs is None:
+                probs = [None] * (h * w) # nothing to tint
+            with self.cond:
+                if generation == self.generation:
+                    self.result = (generation, probs)
@@ -0,0 +1,499 @@
+import asyncio
+import random
+import struct
+import sys
+
+from saper_engine import Board, cell_value, neighbors
+
+# -----------------------------
+# Race Minesweeper: server, protocol and bots (no tkinter)
+# Every player of a room gets the same board (same seed, same safe start cell).
+# The server keeps the boards and checks every click itself; a player learns
+# the result of own clicks at once, opponents' progress comes in batches
+# at most once per PUSH_MS per room.
+# Run: python saper_race.py [players per game] [bots]
+# Window client: saper_online.py, load test: bench_saper_race.py
+# -----------------------------
+
+HOST = "127.0.0.1"
+PORT = 8766
+PLAYERS = 2
+PUSH_MS = 100
+MAX_BUFFER = 64 * 1024 # a client that doesn't read that much is dropped
+RACE_MODE = (16, 30, 99)
+
+# player status
+PLAYING = 0
+CLEARED = 1
+BOOM = 2 # hit a mine or left
+
+NOBODY = 255
+MINE_CODE = 9 # cell value of the exploded mine
+
+# ---- messages (each one is prefixed by its <H length) ----
+MSG_START = 1 # server: <BHHHBBH h, w, mines, your id, players, start cell
+MSG_OPENED = 2 # server: <BBH your status, n + n cells; the answer to every own click
+MSG_PROGRESS = 3 # server: <BB n blocks; block <BBHH pid, status, opened total, n + n cells
+MSG_END = 4 # server: <BB winner
+MSG_OPEN = 5 # client: <BH cell
+
+START = struct.Struct("<BHHHBBH")
+OPENED = struct.Struct("<BBH")
+PROGRESS = struct.Struct("<BB")
+BLOCK = struct.Struct("<BBHH")
+END = struct.Struct("<BB")
+OPEN = struct.Struct("<BH")
+CELL = struct.Struct("<HB") # r * w + c, value
+LENGTH = struct.Struct("<H")
+
+
+def with_length(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+
+async def read_message(reader):
+    head = await reader.readexactly(LENGTH.size)
+    (n,) = LENGTH.unpack(head)
+    return await reader.readexactly(n)
+
+
+class RaceRoom:
+    """
+    One race: a board per player, all from the same seed. No sockets here,
+    the server only moves bytes. Cells opened by a player are packed once
+    and kept in pending until the next progress push.
+    """
+
+    def __init__(self, gid, players=PLAYERS, h=RACE_MODE[0], w=RACE_MODE[1], mines=RACE_MODE[2], seed=None):
+        self.gid = gid
+        self.players = players
+        self.h, self.w, self.mines = h, w, mines
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.start_cell = (h // 2, w // 2)
+        self.boards = {}
+        self.status = {}
+        self.pending = {} # pid -> packed cells not yet pushed to opponents
+        self.changed = set() # pids whose block goes into the next push
+        self.started = False
+        self.winner = None
+        self.over = False
+
+    @property
+    def full(self):
+        return len(self.boards) >= self.players
+
+    def add_player(self):
+        pid = len(self.boards)
+        self.boards[pid] = Board(self.h, self.w, self.mines, seed=self.seed)
+        self.status[pid] = PLAYING
+        self.pending[pid] = bytearray()
+        return pid
+
+    def start(self):
+        """
+        Opens the common start area on every board.
+        Returns pid -> MSG_OPENED for that player.
+        """
+        self.started = True
+        r, c = self.start_cell
+        return {pid: self.click(pid, r * self.w + c) for pid in self.boards}
+
+    def start_message(self, pid):
+        r, c = self.start_cell
+        return START.pack(MSG_START, self.h, self.w, self.mines, pid, self.players, r * self.w + c)
+
+    def click(self, pid, cell):
+        """
+        Validated left click of a player. Returns MSG_OPENED with the newly
+        opened cells (an empty one if the click changed nothing).
+        """
+        board = self.boards[pid]
+        packed = b""
+        if not self.over and self.status[pid] == PLAYING and 0 <= cell < self.h * self.w:
+            r, c = divmod(cell, self.w)
+            opened = board.click(r, c)
+            if board.exploded is not None:
+                packed = CELL.pack(cell, MINE_CODE)
+                n = 1
+                self._set_status(pid, BOOM)
+            else:
+                cells = board.cells
+                packed = b"".join(CELL.pack(i, cell_value(cells[i])) for i in opened)
+                n = len(opened)
+                if board.check_win():
+                    self._set_status(pid, CLEARED)
+            if packed:
+                self.pending[pid] += packed
+                self.changed.add(pid)
+        else:
+            n = 0
+        return OPENED.pack(MSG_OPENED, self.status[pid], n) + packed
+
+    def leave(self, pid):
+        if self.status.get(pid) == PLAYING:
+            self._set_status(pid, BOOM)
+
+    def _set_status(self, pid, status):
+        self.status[pid] = status
+        self.changed.add(pid)
+        if status == CLEARED and self.winner is None:
+            self.winner = pid
+            self.over = True
+        elif all(s != PLAYING for s in self.status.values()):
+            self.over = True
+
+    def take_progress(self):
+        """
+        Blocks of every changed player since the last call, or None.
+        Returns pid -> MSG_PROGRESS without the player's own block.
+        """
+        if not self.changed:
+            return None
+        blocks = {}
+        for pid in self.changed:
+            cells = self.pending[pid]
+            blocks[pid] = BLOCK.pack(pid, self.status[pid], self.boards[pid].opened_count,
+                                     len(cells) // CELL.size) + bytes(cells)
+            cells.clear()
+        self.changed.clear()
+        out = {}
+        for pid in self.boards:
+            others = [b for p, b in blocks.items() if p != pid]
+            if others:
+                out[pid] = PROGRESS.pack(MSG_PROGRESS, len(others)) + b"".join(others)
+        return out
+
+    def end_message(self):
+        return END.pack(MSG_END, NOBODY if self.winner is None else self.winner)
+
+
+class Connection:
+    __slots__ = ("room", "pid", "writer")
+
+    def __init__(self, room, pid, writer):
+        self.room = room
+        self.pid = pid
+        self.writer = writer
+
+
+class RaceServer:
+    def __init__(self, host=HOST, port=PORT, players=PLAYERS, mode=RACE_MODE, push_ms=PUSH_MS, seed=None):
+        self.host = host
+        self.port = port
+        self.players = players
+        self.mode = mode
+        self.push_ms = push_ms
+        self.rng = random.Random(seed)
+        self.server = None
+        self.lobby = None # room that is still filling up
+        self.conns = {} # gid -> {pid: Connection}
+        self.pushes = {} # gid -> scheduled push (loop.call_later handle)
+        self.last_push = {} # gid -> loop time of the last push
+        self.handlers = set()
+        self.next_gid = 0
+
+        # statistics for the load test
+        self.games_done = 0
+        self.clicks = 0
+        self.messages_out = 0
+        self.bytes_out = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1] # if port=0
+
+    async def stop(self):
+        self.server.close()
+        for handle in self.pushes.values():
+            handle.cancel()
+        for conns in list(self.conns.values()):
+            for conn in conns.values():
+                conn.writer.close()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    # ---- clients ----
+    async def handle_client(self, reader, writer):
+        conn = self.join(writer)
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        try:
+            while True:
+                msg = await read_message(reader)
+                if not msg:
+                    continue
+                if msg[0] == MSG_OPEN and conn.room.started:
+                    _, cell = OPEN.unpack(msg)
+                    self.clicks += 1
+                    self.send(conn, conn.room.click(conn.pid, cell))
+                    self.after_click(conn.room)
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass
+        finally:
+            self.leave(conn)
+            self.handlers.discard(task)
+
+    def join(self, writer):
+        if self.lobby is None or self.lobby.full:
+            h, w, mines = self.mode
+            self.lobby = RaceRoom(self.next_gid, self.players, h, w, mines, seed=self.rng.randrange(2 ** 32))
+            self.conns[self.next_gid] = {}
+            self.next_gid += 1
+        room = self.lobby
+        conn = Connection(room, room.add_player(), writer)
+        self.conns[room.gid][conn.pid] = conn
+        if room.full:
+            self.lobby = None
+            conns = self.conns[room.gid]
+            for pid, opened in room.start().items():
+                if pid in conns:
+                    self.send(conns[pid], room.start_message(pid))
+                    self.send(conns[pid], opened)
+            self.after_click(room)
+        return conn
+
+    def leave(self, conn):
+        room = conn.room
+        conns = self.conns.get(room.gid)
+        if conns is None or conns.pop(conn.pid, None) is None:
+            return
+        conn.writer.close()
+        room.leave(conn.pid)
+        if not room.started:
+            # the seat stays taken, the race starts without this player
+            if room.over and self.lobby is room:
+                self.lobby = None # everybody left before the start
+                self.conns.pop(room.gid, None)
+            return
+        self.after_click(room)
+
+    def send(self, conn, payload):
+        if conn.writer.is_closing():
+            return
+        if conn.writer.transport.get_write_buffer_size() > MAX_BUFFER:
+            conn.writer.close()
+            return
+        data = with_length(payload)
+        conn.writer.write(data)
+        self.messages_out += 1
+        self.bytes_out += len(data)
+
+    # ---- progress pushes ----
+    def after_click(self, room):
+        if room.over:
+            self.finish(room)
+        else:
+            self.schedule_push(room)
+
+    def schedule_push(self, room):
+        # at most one push per PUSH_MS, whatever the click rate
+        if room.gid in self.pushes or not room.changed:
+            return
+        loop = asyncio.get_running_loop()
+        due = self.last_push.get(room.gid, 0.0) + self.push_ms / 1000
+        self.pushes[room.gid] = loop.call_later(max(0.0, due - loop.time()), self.push, room)
+
+    def push(self, room):
+        self.pushes.pop(room.gid, None)
+        self.last_push[room.gid] = asyncio.get_running_loop().time()
+        progress = room.take_progress()
+        if not progress:
+            return
+        conns = self.conns.get(room.gid, {})
+        for pid, payload in progress.items():
+            if pid in conns:
+                self.send(conns[pid], payload)
+
+    def finish(self, room):
+        handle = self.pushes.pop(room.gid, None)
+        if handle is not None:
+            handle.cancel()
+        self.push(room) # the last moves go out right away
+        conns = self.conns.pop(room.gid, {})
+        self.last_push.pop(room.gid, None)
+        end = room.end_message()
+        for conn in conns.values():
+            self.send(conn, end)
+            conn.writer.close()
+        self.games_done += 1
+
+
+class RaceView:
+    """
+    What a client knows: own opened cells, opponents' progress, the result.
+    """
+
+    UNKNOWN = 255
+
+    def __init__(self):
+        self.h = self.w = self.mines = 0
+        self.my_pid = None
+        self.players = 0
+        self.start_cell = 0
+        self.cells = bytearray() # own board, UNKNOWN where not opened
+        self.opened = 0
+        self.status = {}
+        self.progress = {} # pid -> opened cells
+        self.seen = {} # pid -> opponents' boards as far as they opened them
+        self.winner = None
+        self.over = False
+        self.last_opened = [] # cells of the last MSG_OPENED
+        self.last_seen = [] # (pid, cell) of the last MSG_PROGRESS
+
+    def apply(self, payload):
+        kind = payload[0]
+        if kind == MSG_START:
+            (_, self.h, self.w, self.mines, self.my_pid,
+             self.players, self.start_cell) = START.unpack_from(payload)
+            self.cells = bytearray([self.UNKNOWN]) * (self.h * self.w)
+            self.status = {pid: PLAYING for pid in range(self.players)}
+            self.progress = {pid: 0 for pid in range(self.players) if pid != self.my_pid}
+            self.seen = {pid: bytearray([self.UNKNOWN]) * (self.h * self.w) for pid in self.progress}
+        elif kind == MSG_OPENED:
+            _, status, n = OPENED.unpack_from(payload)
+            self.status[self.my_pid] = status
+            self.last_opened = []
+            for cell, value in struct.iter_unpack("<HB", payload[OPENED.size:OPENED.size + n * CELL.size]):
+                self.cells[cell] = value
+                self.last_opened.append(cell)
+                if value != MINE_CODE:
+                    self.opened += 1
+        elif kind == MSG_PROGRESS:
+            _, blocks = PROGRESS.unpack_from(payload)
+            pos = PROGRESS.size
+            self.last_seen = []
+            for _ in range(blocks):
+                pid, status, total, n = BLOCK.unpack_from(payload, pos)
+                pos += BLOCK.size
+                self.status[pid] = status
+                self.progress[pid] = total
+                seen = self.seen[pid]
+                for cell, value in struct.iter_unpack("<HB", payload[pos:pos + n * CELL.size]):
+                    seen[cell] = value
+                    self.last_seen.append((pid, cell))
+                pos += n * CELL.size
+        elif kind == MSG_END:
+            _, winner = END.unpack(payload)
+            self.winner = None if winner == NOBODY else winner
+            self.over = True
+
+    @property
+    def safe_cells(self):
+        return self.h * self.w - self.mines
+
+
+class RaceClient:
+    """
+    Network client without a window. receive() is called for every message;
+    the window client overrides it to hand messages over to the Tk thread.
+    """
+
+    def __init__(self):
+        self.view = RaceView()
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host=HOST, port=PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def run(self):
+        try:
+            while True:
+                self.receive(await read_message(self.reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def receive(self, msg):
+        self.view.apply(msg)
+
+    def send_open(self, cell):
+        self.writer.write(with_length(OPEN.pack(MSG_OPEN, cell)))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class RaceBot(RaceClient):
+    """
+    Plays by the two simple rules (all unknown neighbours are mines / all of
+    them are safe) and guesses when stuck. Thinks a little before every click,
+    like a very fast human.
+    """
+
+    def __init__(self, seed=None, think_ms=(20, 60)):
+        super().__init__()
+        self.rng = random.Random(seed)
+        self.think_ms = think_ms
+        self.mines_known = set()
+
+    async def play(self, host=HOST, port=PORT):
+        await self.connect(host, port)
+        try:
+            while True:
+                msg = await read_message(self.reader)
+                self.view.apply(msg)
+                if msg[0] == MSG_OPENED and not self.view.over and self.view.status[self.view.my_pid] == PLAYING:
+                    await asyncio.sleep(self.rng.uniform(*self.think_ms) / 1000)
+                    self.send_open(self.choose())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.close()
+        return self.view
+
+    def choose(self):
+        v = self.view
+        h, w, cells, known = v.h, v.w, v.cells, self.mines_known
+        unknown_left = []
+        for cell, value in enumerate(cells):
+            if value == RaceView.UNKNOWN:
+                if cell not in known:
+                    unknown_left.append(cell)
+                continue
+            if value == 0 or value == MINE_CODE:
+                continue
+            r, c = divmod(cell, w)
+            hidden, flagged = [], 0
+            for nr, nc in neighbors(r, c, h, w):
+                n = nr * w + nc
+                if n in known:
+                    flagged += 1
+                elif cells[n] == RaceView.UNKNOWN:
+                    hidden.append(n)
+            if not hidden:
+                continue
+            if value == flagged:
+                return hidden[0]
+            if value - flagged == len(hidden):
+                known.update(hidden)
+        return self.rng.choice(unknown_left) if unknown_left else 0
+
+
+async def run_with_bots(players=PLAYERS, bots=PLAYERS - 1, seconds=None, **server_args):
+    server = RaceServer(players=players, **server_args)
+    await server.start()
+    print(f"Сапёр-гонка: {server.host}:{server.port}, игроков в партии: {players}, ботов: {bots}")
+
+    async def bot_loop(i):
+        # a bot joins the next race as soon as its race is over
+        n = 0
+        while True:
+            await RaceBot(seed=i * 1000 + n).play(server.host, server.port)
+            n += 1
+
+    tasks = [asyncio.create_task(bot_loop(i)) for i in range(bots)]
+    try:
+        if seconds is None:
+            await asyncio.Event().wait()
+        else:
+            await asyncio.sleep(seconds)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_with_bots(int(sys.argv[1]) if len(sys.argv) > 1 else PLAYERS,
+                              int(sys.argv[2]) if len(sys.argv) > 2 else PLAYERS - 1))
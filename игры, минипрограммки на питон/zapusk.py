@@ -0,0 +1,132 @@
+import os
+import sys
+import time
+import tkinter as tk
+
+
+# -----------------------------
+# Launcher: Minesweeper, Snake, Calculator in one Tk root
+# A game module is imported only when its button is pressed (file names
+# like saper2.0.py are loaded by path), and every game opens as a Toplevel
+# of the launcher's root, so Tk starts once per session.
+# Run: python zapusk.py
+# Cold start report: python zapusk.py --startup
+# -----------------------------
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TARGET_MS = 150
+
+# title, file, how to open the game in a window of root -> that window
+GAMES = [
+    ("Сапёр", "saper2.0.py", lambda m, root: m.MinesweeperApp(root).root),
+    ("Змейка", "zmeyka8.py", lambda m, root: m.SnakeGame(tk.Toplevel(root)).root),
+    ("Калькулятор", "kalkulyator.py", lambda m, root: m.CalculatorGUI(root).root),
+]
+
+_modules = {}
+
+
+def load_game_module(filename):
+    # "saper2.0" is not a valid module name, so load by path under a safe one
+    module = _modules.get(filename)
+    if module is None:
+        import importlib.util
+        name = os.path.splitext(filename)[0].replace(".", "_")
+        spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        _modules[filename] = module
+    return module
+
+
+class Launcher:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Игры")
+        self.root.resizable(False, False)
+        self.game_window = None
+
+        tk.Label(root, text="Во что играем?", font=("Arial", 16, "bold"), pady=10).pack(padx=30)
+        for i, (title, _filename, _opener) in enumerate(GAMES):
+            tk.Button(root, text=title, font=("Arial", 14), width=16,
+                      command=lambda i=i: self.open_game(i)).pack(padx=30, pady=4)
+        self.status = tk.Label(root, text="", fg="gray", pady=8)
+        self.status.pack()
+
+    def open_game(self, i):
+        if self.game_window is not None:
+            self.game_window.lift()
+            return
+        title, filename, opener = GAMES[i]
+        self.status.config(text=f"Загрузка: {title}…")
+        self.root.update_idletasks()
+        t0 = time.perf_counter()
+        module = load_game_module(filename)
+        self.game_window = opener(module, self.root)
+        self.status.config(text=f"{title}: {(time.perf_counter() - t0) * 1000:.0f} мс")
+        self.game_window.bind("<Destroy>", self.on_game_closed, add="+")
+        self.root.withdraw()
+
+    def on_game_closed(self, e):
+        if e.widget is not self.game_window:
+            return # a child widget of the game
+        self.game_window = None
+        # game loops (snake frames, calculator preview) must not fire on
+        # destroyed widgets; the launcher itself keeps no timers
+        for after_id in self.root.tk.splitlist(self.root.tk.call("after", "info")):
+            self.root.after_cancel(after_id)
+        self.root.deiconify()
+
+
+def startup_report():
+    """
+    Starts the launcher in a fresh interpreter with -X importtime, waits for
+    its window to be drawn and prints the time to that point plus the
+    heaviest top-level imports.
+    """
+    import subprocess
+    t0 = time.monotonic()
+    proc = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__), "--ready"],
+                          capture_output=True, text=True)
+    ready = [line for line in proc.stdout.splitlines() if line.startswith("READY ")]
+    if not ready:
+        print("Лаунчер не запустился:")
+        print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode)
+        return
+    total_ms = (float(ready[0].split()[1]) - t0) * 1000
+
+    # "import time: self [us] | cumulative | imported package"; top level = no indent
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            imports.append((int(cumulative), name.strip()))
+    imports.sort(reverse=True)
+    import_ms = sum(us for us, _ in imports) / 1000
+
+    print(f"до окна лаунчера {total_ms:6.0f} мс (цель < {TARGET_MS} мс: {'да' if total_ms < TARGET_MS else 'нет'})")
+    print(f"из них импорты   {import_ms:6.1f} мс, самые тяжёлые:")
+    for us, name in imports[:8]:
+        print(f"  {us / 1000:8.1f} мс  {name}")
+
+
+def main():
+    if "--startup" in sys.argv:
+        startup_report()
+        return
+    root = tk.Tk()
+    Launcher(root)
+    if "--ready" in sys.argv:
+        # measuring run: the window is drawn, report and quit
+        root.update()
+        print(f"READY {time.monotonic()}", flush=True)
+        root.destroy()
+        return
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
 import tkinter as tk
-import random
+from collections import deque
+from itertools import islice
+
+from zmeika_engine import SnakeEngine, DIED
+from zmeika_scores import ScoreStore, RunClock, format_run
 
 
 class SnakeGame:
-    def __init__(self, cell=20, w=30, h=20, speed_ms=110):
+    def __init__(self, cell=20, w=30, h=20, speed_ms=110, seed=None):
         self.cell = cell
         self.grid_w = w
         self.grid_h = h
         self.speed_ms = speed_ms
+        self.engine = SnakeEngine(w, h, walls=True, seed=seed)
 
         self.root = tk.Tk()
         self.root.title("Змейка (tkinter)")
@@ -30,6 +35,11 @@ class SnakeGame:
         self.paused = False
         self.after_id = None
 
+        # records: the run goes to the shared snake scores file (written in the background)
+        self.scores = ScoreStore()
+        self.run_clock = RunClock()
+        self.run_text = ""
+
         self.restart()
 
     def restart(self):
@@ -37,19 +47,14 @@ class SnakeGame:
             self.root.after_cancel(self.after_id)
             self.after_id = None
 
-        self.canvas.delete("all")
-        self.score = 0
         self.game_over = False
         self.paused = False
 
-        midx = self.grid_w // 2
-        midy = self.grid_h // 2
-
-        self.snake = [(midx, midy), (midx-1, midy), (midx-2, midy)]
-        self.dir = (1, 0)
-        self.pending_dir = self.dir
+        self.engine.reset()
+        self.dir = self.engine.dir
+        self.run_clock.start()
 
-        self.spawn_food()
+        self.build_scene()
         self.draw()
         self.tick()
 
@@ -57,23 +62,17 @@ class SnakeGame:
         if self.game_over:
             return
         self.paused = not self.paused
+        if self.paused:
+            self.run_clock.pause()
+        else:
+            self.run_clock.resume()
         self.draw()
 
     def set_dir(self, dx, dy):
         if self.game_over:
             return
-        # prevent reversing into itself
-        cur_dx, cur_dy = self.dir
-        if (dx, dy) == (-cur_dx, -cur_dy):
-            return
-        self.pending_dir = (dx, dy)
-
-    def spawn_food(self):
-        free = set((x, y) for x in range(self.grid_w) for y in range(self.grid_h)) - set(self.snake)
-        self.food = random.choice(list(free)) if free else None
-
-    def inside(self, x, y):
-        return 0 <= x < self.grid_w and 0 <= y < self.grid_h
+        # queued in the engine, one turn per tick; reversal is checked there
+        self.engine.queue_dir((dx, dy))
 
     def tick(self):
         if self.game_over:
@@ -84,67 +83,92 @@ class SnakeGame:
             self.after_id = self.root.after(self.speed_ms, self.tick)
             return
 
-        self.dir = self.pending_dir
-        head_x, head_y = self.snake[0]
-        dx, dy = self.dir
-        nx, ny = head_x + dx, head_y + dy
+        result = self.engine.step()
+        self.dir = self.engine.dir
 
         # collisions
-        if not self.inside(nx, ny) or (nx, ny) in self.snake:
+        if result == DIED:
             self.game_over = True
+            self.record_run()
             self.draw()
             return
 
-        self.snake.insert(0, (nx, ny))
-
-        if self.food and (nx, ny) == self.food:
-            self.score += 1
-            self.spawn_food()
-        else:
-            self.snake.pop()
-
         self.draw()
         self.after_id = self.root.after(self.speed_ms, self.tick)
 
-    def draw_cell(self, x, y, kind):
+    def record_run(self):
+        self.run_clock.pause()
+        run = (len(self.engine.snake), self.run_clock.seconds, self.engine.ticks)
+        self.scores.record(f"{self.speed_ms} мс", True, "Classic", *run)
+        self.run_text = format_run(*run)
+
+    def cell_box(self, x, y):
         x1 = x * self.cell
         y1 = y * self.cell
-        x2 = x1 + self.cell
-        y2 = y1 + self.cell
+        return x1, y1, x1 + self.cell, y1 + self.cell
+
+    def build_scene(self):
+        """
+        Create every canvas item once per game; draw() only moves them.
+        """
+        self.canvas.delete("all")
+
+        # grid (optional, light) — static, drawn once
+        # Comment out if you want cleaner look
+        for x in range(self.grid_w + 1):
+            self.canvas.create_line(x*self.cell, 0, x*self.cell, self.grid_h*self.cell)
+        for y in range(self.grid_h + 1):
+            self.canvas.create_line(0, y*self.cell, self.grid_w*self.cell, y*self.cell)
 
         # no custom colors requested, keep defaults simple
-        if kind == "snake":
-            self.canvas.create_rectangle(x1, y1, x2, y2)
-        elif kind == "head":
-            self.canvas.create_rectangle(x1, y1, x2, y2, width=3)
-        elif kind == "food":
-            self.canvas.create_oval(x1+3, y1+3, x2-3, y2-3)
+        snake = self.engine.snake
+        self.body_items = deque(
+            self.canvas.create_rectangle(*self.cell_box(x, y)) for x, y in islice(snake, 1, None)
+        )
+        self.head_item = self.canvas.create_rectangle(*self.cell_box(*snake[0]), width=3)
+        self.head_drawn = snake[0]
+
+        self.food_item = self.canvas.create_oval(0, 0, 0, 0, state="hidden")
+        self.food_drawn = None
+
+        self.hud_item = self.canvas.create_text(8, 8, anchor="nw", text="")
+        self.hud_text = None
 
     def draw(self):
-        self.canvas.delete("all")
+        # snake: the old head cell turns into body — reuse the tail
+        # rectangle for it, or add one when the snake has grown
+        snake = self.engine.snake
+        if snake[0] != self.head_drawn:
+            box = self.cell_box(*snake[1])
+            if len(self.body_items) < len(snake) - 1:
+                item = self.canvas.create_rectangle(*box)
+            else:
+                item = self.body_items.pop()
+                self.canvas.coords(item, *box)
+            self.body_items.appendleft(item)
+            self.canvas.coords(self.head_item, *self.cell_box(*snake[0]))
+            self.head_drawn = snake[0]
 
         # food
-        if self.food:
-            self.draw_cell(self.food[0], self.food[1], "food")
-
-        # snake
-        for i, (x, y) in enumerate(self.snake):
-            self.draw_cell(x, y, "head" if i == 0 else "snake")
+        food = self.engine.food
+        if food != self.food_drawn:
+            self.food_drawn = food
+            if food:
+                x1, y1, x2, y2 = self.cell_box(*food)
+                self.canvas.coords(self.food_item, x1+3, y1+3, x2-3, y2-3)
+                self.canvas.itemconfig(self.food_item, state="normal")
+            else:
+                self.canvas.itemconfig(self.food_item, state="hidden")
 
         # HUD
-        text = f"Score: {self.score}"
+        text = f"Score: {self.engine.score}"
         if self.paused:
             text += " | PAUSE"
         if self.game_over:
-            text += " | GAME OVER (нажми R)"
-        self.canvas.create_text(8, 8, anchor="nw", text=text)
-
-        # grid (optional, light)
-        # Comment out if you want cleaner look
-        for x in range(self.grid_w + 1):
-            self.canvas.create_line(x*self.cell, 0, x*self.cell, self.grid_h*self.cell)
-        for y in range(self.grid_h + 1):
-            self.canvas.create_line(0, y*self.cell, self.grid_w*self.cell, y*self.cell)
+            text += f" | GAME OVER: {self.run_text} (нажми R)"
+        if text != self.hud_text:
+            self.hud_text = text
+            self.canvas.itemconfig(self.hud_item, text=text)
 
     def run(self):
         self.root.resizable(False, False)
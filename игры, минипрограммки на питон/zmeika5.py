@@ -1,5 +1,9 @@
 import tkinter as tk
-import random
+from collections import deque
+from itertools import islice
+
+from zmeika_engine import SnakeEngine, DIED
+from zmeika_scores import ScoreStore, RunClock, format_run
 
 # ---------------- НАСТРОЙКИ ----------------
 CELL = 25
@@ -16,6 +20,8 @@ SPEEDS = {
     "Хардкор": 50
 }
 
+THEME = "Classic" # цвета как у темы Classic в zmeyka8.py — таблица рекордов общая
+
 # -------------------------------------------
 
 class SnakeGame:
@@ -28,6 +34,7 @@ class SnakeGame:
 
         self.speed_name = "Нормально"
         self.wall_kill = True
+        self.engine = SnakeEngine(WIDTH, HEIGHT, walls=self.wall_kill)
 
         self.running = False
         self.after_id = None
@@ -36,6 +43,10 @@ class SnakeGame:
         self.paused = False
         self.game_over_flag = False
 
+        # ---- ДОБАВЛЕНО: рекорды (пишутся в фоне) ----
+        self.scores = ScoreStore()
+        self.run_clock = RunClock()
+
         self.root.bind("<Key>", self.key_press)
 
         self.menu()
@@ -87,21 +98,15 @@ class SnakeGame:
             self.root.after_cancel(self.after_id)
             self.after_id = None
 
-        self.dir = (1, 0)
+        self.engine.walls = self.wall_kill
+        self.engine.reset()
+        self.dir = self.engine.dir
+        self.run_clock.start()
 
-        cx, cy = WIDTH // 2, HEIGHT // 2
-        self.snake = [(cx, cy), (cx-1, cy), (cx-2, cy)]
-        self.spawn_food()
+        self.build_scene()
         self.draw()
         self.step()
 
-    def spawn_food(self):
-        while True:
-            pos = (random.randint(0, WIDTH-1), random.randint(0, HEIGHT-1))
-            if pos not in self.snake:
-                self.food = pos
-                break
-
     def step(self):
         if not self.running:
             return
@@ -111,51 +116,56 @@ class SnakeGame:
             self.after_id = self.root.after(SPEEDS[self.speed_name], self.step)
             return
 
-        hx, hy = self.snake[0]
-        dx, dy = self.dir
-        nx, ny = hx + dx, hy + dy
-
-        if self.wall_kill:
-            if nx < 0 or nx >= WIDTH or ny < 0 or ny >= HEIGHT:
-                self.game_over()
-                return
-        else:
-            nx %= WIDTH
-            ny %= HEIGHT
-
-        new_head = (nx, ny)
-
-        if new_head in self.snake:
+        if self.engine.step() == DIED:
             self.game_over()
             return
-
-        self.snake.insert(0, new_head)
-
-        if new_head == self.food:
-            self.spawn_food()
-        else:
-            self.snake.pop()
+        self.dir = self.engine.dir
 
         self.draw()
         self.after_id = self.root.after(SPEEDS[self.speed_name], self.step)
 
-    def draw(self):
-        self.canvas.delete("game")
+    # ---- ОТРИСОВКА: элементы создаются один раз, дальше только двигаются ----
+    def build_scene(self):
+        snake = self.engine.snake
+        self.food_item = self.canvas.create_rectangle(0, 0, 0, 0, fill="red", outline="#111",
+                                                      state="hidden", tags="game")
+        self.food_drawn = None
+        self.body_items = deque(self.make_cell(x, y, "#2ecc71") for x, y in islice(snake, 1, None))
+        self.head_item = self.make_cell(*snake[0], "#6aff8f")
+        self.head_drawn = snake[0]
 
+    def draw(self):
         # еда
-        fx, fy = self.food
-        self.draw_cell(fx, fy, "red")
-
-        # змейка
-        for i, (x, y) in enumerate(self.snake):
-            color = "#6aff8f" if i == 0 else "#2ecc71"
-            self.draw_cell(x, y, color)
+        food = self.engine.food
+        if food != self.food_drawn:
+            self.food_drawn = food
+            if food:
+                self.canvas.coords(self.food_item, *self.cell_box(*food))
+                self.canvas.itemconfig(self.food_item, state="normal")
+            else:
+                self.canvas.itemconfig(self.food_item, state="hidden")
+
+        # змейка: бывшая клетка головы становится телом — туда уезжает
+        # прямоугольник хвоста (или добавляется новый, если змея выросла)
+        snake = self.engine.snake
+        if snake[0] != self.head_drawn:
+            if len(self.body_items) < len(snake) - 1:
+                item = self.make_cell(*snake[1], "#2ecc71")
+            else:
+                item = self.body_items.pop()
+                self.canvas.coords(item, *self.cell_box(*snake[1]))
+            self.body_items.appendleft(item)
+            self.canvas.coords(self.head_item, *self.cell_box(*snake[0]))
+            self.head_drawn = snake[0]
 
-    def draw_cell(self, x, y, color):
+    def cell_box(self, x, y):
         px = x * CELL
         py = y * CELL + 80
-        self.canvas.create_rectangle(
-            px, py, px+CELL, py+CELL,
+        return px, py, px+CELL, py+CELL
+
+    def make_cell(self, x, y, color):
+        return self.canvas.create_rectangle(
+            *self.cell_box(x, y),
             fill=color, outline="#111", tags="game"
         )
 
@@ -170,10 +180,15 @@ class SnakeGame:
             self.root.after_cancel(self.after_id)
             self.after_id = None
 
+        # ---- ДОБАВЛЕНО: партия уходит в таблицу рекордов ----
+        self.run_clock.pause()
+        run = (len(self.engine.snake), self.run_clock.seconds, self.engine.ticks)
+        self.scores.record(self.speed_name, self.wall_kill, THEME, *run)
+
         self.canvas.delete("pause")
         self.canvas.create_text(
             WIN_W//2, WIN_H//2,
-            text="GAME OVER\nR — заново\nESC — меню",
+            text=f"GAME OVER\n{format_run(*run)}\nR — заново\nESC — меню",
             fill="white", font=("Arial", 22), justify="center"
         )
 
@@ -213,18 +228,21 @@ class SnakeGame:
                     fill="white", font=("Arial", 22),
                     justify="center", tags="pause"
                 )
+                self.run_clock.pause()
             else:
                 self.canvas.delete("pause")
+                self.run_clock.resume()
             return
 
-        if e.keysym in ("w", "Up") and self.dir != (0, 1):
-            self.dir = (0, -1)
-        elif e.keysym in ("s", "Down") and self.dir != (0, -1):
-            self.dir = (0, 1)
-        elif e.keysym in ("a", "Left") and self.dir != (1, 0):
-            self.dir = (-1, 0)
-        elif e.keysym in ("d", "Right") and self.dir != (-1, 0):
-            self.dir = (1, 0)
+        # повороты копятся в очереди движка: по одному на логический шаг
+        if e.keysym in ("w", "Up"):
+            self.engine.queue_dir((0, -1))
+        elif e.keysym in ("s", "Down"):
+            self.engine.queue_dir((0, 1))
+        elif e.keysym in ("a", "Left"):
+            self.engine.queue_dir((-1, 0))
+        elif e.keysym in ("d", "Right"):
+            self.engine.queue_dir((1, 0))
         elif e.keysym.lower() == "r":
             self.start()
         elif e.keysym == "Escape":
@@ -232,6 +250,7 @@ class SnakeGame:
 
 
 # ---------------- ЗАПУСК ----------------
-root = tk.Tk()
-game = SnakeGame(root)
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    root = tk.Tk()
+    game = SnakeGame(root)
+    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,318 @@
+from array import array
+
+from zmeika_engine import UP, DOWN, LEFT, RIGHT
+
+
+# ---------------- АВТОПИЛОТ ЗМЕЙКИ (без tkinter) ----------------
+# Стратегия получает движок и на каждый шаг отдаёт направление:
+#     pilot = make_strategy("safe", engine)
+#     engine.step(pilot.choose())
+# greedy   — кратчайший путь BFS до еды, если пути нет — погоня за хвостом;
+# safe     — то же, но путь берётся, только если после него хвост достижим;
+# hamilton — гамильтонов цикл по всему полю со срезами к еде.
+
+DIRS = (UP, RIGHT, DOWN, LEFT)
+SHORTCUT_LIMIT = 0.5 # доля поля, после которой гамильтонова змея больше не срезает
+SHORTCUT_MARGIN = 3 # запас клеток до хвоста при срезе (хвост стоит, пока змея растёт)
+
+
+class PathFinder:
+    """
+    BFS по полю движка. Метки, расстояния, родители и очередь выделены
+    один раз под размер поля; «очистка» между поисками — новый номер поколения.
+    """
+
+    def __init__(self, width, height, walls=True):
+        self.width = width
+        self.height = height
+        self.walls = walls
+        n = width * height
+        self.mark = array("I", bytes(4 * n))
+        self.dist = array("i", bytes(4 * n))
+        self.parent = array("i", bytes(4 * n))
+        self.queue = array("i", bytes(4 * n))
+        self.scratch = bytearray(n) # занятость для «воображаемой» змеи
+        self.gen = 0
+
+    def neighbors(self, idx):
+        w, h = self.width, self.height
+        y, x = divmod(idx, w)
+        out = []
+        for dx, dy in DIRS:
+            nx, ny = x + dx, y + dy
+            if self.walls:
+                if 0 <= nx < w and 0 <= ny < h:
+                    out.append((ny * w + nx, (dx, dy)))
+            else:
+                out.append(((ny % h) * w + nx % w, (dx, dy)))
+        return out
+
+    def bfs(self, start, blocked, goal=-1):
+        """
+        Поиск в ширину из start по клеткам, где blocked[c] == 0 (goal пускаем всегда).
+        Останавливается на goal. Возвращает число посещённых клеток.
+        """
+        self.gen += 1
+        if self.gen >= 0xFFFFFFFF:
+            self.mark = array("I", bytes(4 * len(self.mark)))
+            self.gen = 1
+        gen = self.gen
+        mark, dist, parent, queue = self.mark, self.dist, self.parent, self.queue
+        w, h, walls = self.width, self.height, self.walls
+
+        mark[start] = gen
+        dist[start] = 0
+        parent[start] = -1
+        queue[0] = start
+        qh, qt = 0, 1
+        while qh < qt:
+            cur = queue[qh]
+            qh += 1
+            if cur == goal:
+                break
+            y, x = divmod(cur, w)
+            d = dist[cur] + 1
+            for dx, dy in DIRS:
+                nx, ny = x + dx, y + dy
+                if walls:
+                    if nx < 0 or nx >= w or ny < 0 or ny >= h:
+                        continue
+                else:
+                    nx %= w
+                    ny %= h
+                n = ny * w + nx
+                if mark[n] == gen or (blocked[n] and n != goal):
+                    continue
+                mark[n] = gen
+                dist[n] = d
+                parent[n] = cur
+                queue[qt] = n
+                qt += 1
+        return qt
+
+    def reached(self, idx):
+        return self.mark[idx] == self.gen
+
+    def path(self, goal):
+        # клетки от первого шага до goal включительно (по последнему bfs)
+        out = []
+        while self.parent[goal] >= 0:
+            out.append(goal)
+            goal = self.parent[goal]
+        out.reverse()
+        return out
+
+    def direction(self, a, b):
+        w = self.width
+        ay, ax = divmod(a, w)
+        by, bx = divmod(b, w)
+        dx, dy = bx - ax, by - ay
+        # через край поля в режиме без стен
+        if dx > 1:
+            dx = -1
+        elif dx < -1:
+            dx = 1
+        if dy > 1:
+            dy = -1
+        elif dy < -1:
+            dy = 1
+        return dx, dy
+
+
+class Strategy:
+    name = ""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.finder = PathFinder(engine.width, engine.height, engine.walls)
+
+    def idx(self, cell):
+        return cell[1] * self.engine.width + cell[0]
+
+    def choose(self):
+        self.finder.walls = self.engine.walls
+        return self.decide()
+
+    def decide(self):
+        # стратегии переопределяют; сама по себе — просто держаться за хвостом
+        return self.chase_tail()
+
+    # ---- общий запасной ход: держаться за хвостом ----
+    def chase_tail(self):
+        """
+        Ход к соседу, от которого хвост достижим и дальше всего
+        (змея наматывается по свободному месту, а не запирает себя).
+        Еду при этом обходим: съеденная еда удлиняет змею на месте хвоста.
+        """
+        e, f = self.engine, self.finder
+        head = self.idx(e.snake[0])
+        tail = self.idx(e.snake[-1])
+        food = self.idx(e.food) if e.food else -1
+        penalty = e.width * e.height
+
+        f.bfs(tail, e.occ)
+        best, best_score = None, None
+        for n, d in f.neighbors(head):
+            if e.occ[n] and n != tail or not f.reached(n):
+                continue
+            score = f.dist[n] - (penalty if n == food else 0)
+            if best_score is None or score > best_score:
+                best, best_score = d, score
+        return best if best is not None else self.survive()
+
+    def survive(self):
+        # хвост не достать — ход в самую большую свободную область
+        e, f = self.engine, self.finder
+        head = self.idx(e.snake[0])
+        tail = self.idx(e.snake[-1])
+        best, best_area = e.dir, -1
+        for n, d in f.neighbors(head):
+            if e.occ[n] and n != tail:
+                continue
+            area = f.bfs(n, e.occ)
+            if area > best_area:
+                best, best_area = d, area
+        return best
+
+
+class Greedy(Strategy):
+    """
+    Кратчайший путь до еды. Путь запоминается и проходится без пересчёта:
+    клетки впереди свободны, а тело идёт только следом за головой.
+    """
+    name = "greedy"
+    check_safe = False
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.plan = []
+        self.plan_food = None
+
+    def decide(self):
+        e, f = self.engine, self.finder
+        head = self.idx(e.snake[0])
+
+        if self.plan and self.plan_food == e.food and not e.occ[self.plan[-1]]:
+            return f.direction(head, self.plan.pop())
+
+        self.plan = []
+        if e.food:
+            food = self.idx(e.food)
+            f.bfs(head, e.occ, goal=food)
+            if f.reached(food):
+                path = f.path(food)
+                if not self.check_safe or self.safe_after(path):
+                    path.reverse()
+                    self.plan = path
+                    self.plan_food = e.food
+                    return f.direction(head, self.plan.pop())
+        return self.chase_tail()
+
+    def safe_after(self, path):
+        """
+        Пройти путь «в уме» и проверить, что от новой головы виден новый хвост.
+        """
+        e, f = self.engine, self.finder
+        n = len(e.snake) + 1 # еда в конце пути
+        body = path[::-1][:n]
+        if len(body) < n:
+            body.extend(self.idx(c) for c in list(e.snake)[:n - len(body)])
+        scratch = f.scratch
+        for c in body:
+            scratch[c] = 1
+        f.bfs(body[0], scratch, goal=body[-1])
+        ok = f.reached(body[-1])
+        for c in body:
+            scratch[c] = 0
+        return ok
+
+
+class SafeGreedy(Greedy):
+    name = "safe"
+    check_safe = True
+
+
+class Hamilton(Strategy):
+    """
+    Змея идёт по гамильтонову циклу через все клетки поля — так она не
+    погибает никогда. Пока она короткая, разрешены срезы вперёд по циклу,
+    если срез не перепрыгивает еду и не догоняет хвост.
+    """
+    name = "hamilton"
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.cycle = self.build_cycle(engine.width, engine.height)
+        self.order = array("i", bytes(4 * len(self.cycle)))
+        for i, c in enumerate(self.cycle):
+            self.order[c] = i
+        self.ordered = False
+
+    @staticmethod
+    def build_cycle(w, h):
+        """
+        Змейка по строкам 0..h-1 в столбцах 1..w-1, возврат по столбцу 0.
+        Нужна чётная высота (или ширина — тогда то же самое по столбцам).
+        """
+        if h % 2 == 0 and w >= 2:
+            cells = [(x, 0) for x in range(w)]
+            for y in range(1, h):
+                xs = range(w - 1, 0, -1) if y % 2 else range(1, w)
+                cells.extend((x, y) for x in xs)
+            cells.extend((0, y) for y in range(h - 1, 0, -1))
+        elif w % 2 == 0 and h >= 2:
+            cells = [(y, x) for x, y in Hamilton.build_cycle(h, w)]
+        else:
+            raise ValueError("Гамильтонов цикл: нужна чётная ширина или высота поля")
+        return array("i", (y * w + x for x, y in cells))
+
+    def in_cycle_order(self):
+        # тело лежит на цикле по порядку: от хвоста вперёд до головы
+        size = len(self.cycle)
+        order = self.order
+        base = order[self.idx(self.engine.snake[-1])]
+        prev = size
+        for cell in self.engine.snake:
+            ahead = (order[self.idx(cell)] - base) % size
+            if ahead >= prev:
+                return False
+            prev = ahead
+        return True
+
+    def decide(self):
+        e, f = self.engine, self.finder
+        size = len(self.cycle)
+        order = self.order
+        head = self.idx(e.snake[0])
+        follow = self.cycle[(order[head] + 1) % size]
+
+        if not self.ordered:
+            # включили посреди игры: сначала выйти на цикл, без срезов
+            self.ordered = self.in_cycle_order()
+            if not self.ordered:
+                if e.occ[follow] and follow != self.idx(e.snake[-1]):
+                    return self.chase_tail()
+                return f.direction(head, follow)
+
+        if not e.food or len(e.snake) > size * SHORTCUT_LIMIT:
+            return f.direction(head, follow)
+
+        oh = order[head]
+        d_food = (order[self.idx(e.food)] - oh) % size
+        d_tail = (order[self.idx(e.snake[-1])] - oh) % size
+
+        best, best_d = follow, 1
+        for n, d in f.neighbors(head):
+            if e.occ[n]:
+                continue
+            ahead = (order[n] - oh) % size
+            if best_d < ahead <= d_food and ahead < d_tail - SHORTCUT_MARGIN:
+                best, best_d = n, ahead
+        return f.direction(head, best)
+
+
+STRATEGIES = {cls.name: cls for cls in (Greedy, SafeGreedy, Hamilton)}
+
+
+def make_strategy(name, engine):
+    return STRATEGIES[name](engine)
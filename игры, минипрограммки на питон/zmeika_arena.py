@@ -0,0 +1,324 @@
+import random
+import struct
+from collections import deque
+
+from zmeika_engine import UP, DOWN, LEFT, RIGHT, FreeCells, queue_turn
+
+
+# ---------------- АРЕНА: ЗМЕЙКА НА 2-8 ИГРОКОВ (без tkinter и сети) ----------------
+# Правила те же, что в zmeika_engine, но змей несколько и ходят они одновременно:
+# сначала уходят хвосты, потом головы; две головы в одной клетке — гибнут обе.
+# Погибшая змея исчезает и через RESPAWN_TICKS появляется снова, длиной 1.
+#
+# Каждый тик даёт список событий — это и есть сетевой кадр (zmeika_server).
+
+DIRS = (UP, RIGHT, DOWN, LEFT) # код направления в протоколе — индекс здесь
+
+MAX_PLAYERS = 8
+RESPAWN_TICKS = 20
+
+# события тика: (вид, игрок, клетка)
+HEAD = 1 # голова шагнула в клетку
+TAIL = 2 # хвост ушёл
+DIE = 3 # змея погибла, тело убрано целиком
+SPAWN = 4 # змея появилась в клетке (длина 1)
+FOOD_ADD = 5
+FOOD_DEL = 6 # еду съел игрок pid
+LEAVE = 7 # игрок вышел, тело убрано
+
+EVENT = struct.Struct("<BBH")
+
+# ---- сообщения (у каждого в потоке префикс длины <H) ----
+MSG_FRAME = 1 # сервер: <BIIH тик, последний принятый ввод, число событий + события
+MSG_SNAPSHOT = 2 # сервер: полное состояние при входе
+MSG_INPUT = 3 # клиент: <BIB номер ввода, код направления
+
+FRAME_HEAD = struct.Struct("<BIIH")
+SNAPSHOT_HEAD = struct.Struct("<BIHHBBHB") # тик, ширина, высота, стены, мой id, период тика мс, змей
+SNAPSHOT_SNAKE = struct.Struct("<BHH") # id, очки, длина; дальше клетки <H
+INPUT = struct.Struct("<BIB")
+LENGTH = struct.Struct("<H")
+
+
+class ArenaSnake:
+    __slots__ = ("pid", "body", "dir", "inputs", "alive", "respawn_at", "score")
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.body = deque() # клетки y * width + x, голова слева
+        self.dir = RIGHT
+        self.inputs = deque()
+        self.alive = False
+        self.respawn_at = 0
+        self.score = 0
+
+
+class Arena:
+    def __init__(self, width=40, height=30, walls=True, seed=None, foods=None):
+        if width * height > 0xFFFF:
+            raise ValueError("Арена: клетка должна помещаться в 16 бит")
+        self.width = width
+        self.height = height
+        self.walls = walls
+        self.rng = random.Random(seed)
+        self.foods_wanted = foods
+        self.occ = bytearray(width * height)
+        self.free = FreeCells(width * height) # ни тела, ни еды
+        self.food = set()
+        self.snakes = {}
+        self.tick = 0
+        self.events = []
+
+    # ---- игроки ----
+    def add_player(self):
+        pid = next((i for i in range(MAX_PLAYERS) if i not in self.snakes), None)
+        if pid is None:
+            return None
+        self.snakes[pid] = ArenaSnake(pid)
+        self._spawn(self.snakes[pid])
+        self._refill_food()
+        return pid
+
+    def remove_player(self, pid):
+        snake = self.snakes.pop(pid, None)
+        if snake is not None:
+            self._clear_body(snake)
+            self.events.append((LEAVE, pid, 0))
+
+    def queue_dir(self, pid, direction):
+        snake = self.snakes.get(pid)
+        return snake is not None and queue_turn(snake.inputs, snake.dir, direction)
+
+    # ---- клетки ----
+    def _take(self, cell):
+        self.occ[cell] += 1
+        self.free.take(cell)
+
+    def _give(self, cell):
+        self.occ[cell] -= 1
+        if not self.occ[cell] and cell not in self.food:
+            self.free.give(cell)
+
+    def _clear_body(self, snake):
+        for cell in snake.body:
+            self._give(cell)
+        snake.body.clear()
+        snake.alive = False
+
+    def _spawn(self, snake):
+        if not self.free:
+            snake.respawn_at = self.tick + 1
+            return
+        cell = self.free.sample(self.rng)
+        snake.body.append(cell)
+        self._take(cell)
+        # носом к дальней стене — чтобы не умереть в первый же тик
+        snake.dir = RIGHT if cell % self.width < self.width // 2 else LEFT
+        snake.inputs.clear()
+        snake.alive = True
+        self.events.append((SPAWN, snake.pid, cell))
+
+    def _refill_food(self):
+        wanted = self.foods_wanted or max(1, len(self.snakes))
+        while len(self.food) < wanted and self.free:
+            cell = self.free.sample(self.rng)
+            self.free.take(cell)
+            self.food.add(cell)
+            self.events.append((FOOD_ADD, 0, cell))
+
+    def _target(self, snake):
+        w, h = self.width, self.height
+        y, x = divmod(snake.body[0], w)
+        nx, ny = x + snake.dir[0], y + snake.dir[1]
+        if self.walls:
+            if nx < 0 or nx >= w or ny < 0 or ny >= h:
+                return None
+        else:
+            nx %= w
+            ny %= h
+        return ny * w + nx
+
+    # ---- шаг ----
+    def step(self):
+        """
+        Один тик для всех змей. Возвращает события тика и начинает новый список.
+        """
+        self.tick += 1
+        moves = {}
+        waiting = [] # мёртвые, которым пора вернуться
+        for snake in self.snakes.values():
+            if not snake.alive:
+                if self.tick >= snake.respawn_at:
+                    waiting.append(snake)
+                continue
+            if snake.inputs:
+                d = snake.inputs.popleft()
+                if d != (-snake.dir[0], -snake.dir[1]) or len(snake.body) == 1:
+                    snake.dir = d
+            moves[snake.pid] = self._target(snake)
+
+        # лобовая встреча: змеи меняются клетками голов. У змеи длины 1 голова —
+        # это и хвост, уход хвостов ниже освободил бы обе клетки; гибнут обе
+        heads_at = {self.snakes[pid].body[0]: pid for pid in moves}
+        swapped = set()
+        for pid, cell in moves.items():
+            other = heads_at.get(cell)
+            if other is not None and other != pid and moves[other] == self.snakes[pid].body[0]:
+                swapped.add(pid)
+
+        # хвосты уходят раньше голов: в освободившуюся клетку можно шагнуть
+        for pid, cell in moves.items():
+            if cell is not None and cell not in self.food:
+                snake = self.snakes[pid]
+                self._give(snake.body.pop())
+                self.events.append((TAIL, pid, 0))
+
+        heads = {}
+        for cell in moves.values():
+            if cell is not None:
+                heads[cell] = heads.get(cell, 0) + 1
+
+        dead = []
+        for pid, cell in moves.items():
+            snake = self.snakes[pid]
+            if cell is None or pid in swapped or self.occ[cell] or heads[cell] > 1:
+                dead.append(snake)
+                continue
+            snake.body.appendleft(cell)
+            self._take(cell)
+            self.events.append((HEAD, pid, cell))
+            if cell in self.food:
+                self.food.discard(cell)
+                snake.score += 1
+                self.events.append((FOOD_DEL, pid, cell))
+
+        for snake in dead:
+            self._clear_body(snake)
+            snake.respawn_at = self.tick + RESPAWN_TICKS
+            self.events.append((DIE, snake.pid, 0))
+
+        # возрождение — после ходов: новая змея не встанет в клетку,
+        # куда в этом же тике шагнула чужая голова
+        for snake in waiting:
+            self._spawn(snake)
+
+        self._refill_food()
+        events, self.events = self.events, []
+        return events
+
+    # ---- протокол ----
+    def snapshot(self, your_pid, tick_ms):
+        parts = [SNAPSHOT_HEAD.pack(MSG_SNAPSHOT, self.tick, self.width, self.height, int(self.walls),
+                                    your_pid, tick_ms, len(self.snakes))]
+        for snake in self.snakes.values():
+            parts.append(SNAPSHOT_SNAKE.pack(snake.pid, snake.score, len(snake.body)))
+            parts.append(struct.pack(f"<{len(snake.body)}H", *snake.body))
+        parts.append(LENGTH.pack(len(self.food)))
+        parts.append(struct.pack(f"<{len(self.food)}H", *self.food))
+        return b"".join(parts)
+
+
+def pack_events(events):
+    return b"".join(EVENT.pack(*e) for e in events)
+
+
+def frame_message(tick, ack, n_events, packed):
+    return FRAME_HEAD.pack(MSG_FRAME, tick, ack, n_events) + packed
+
+
+def with_length(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+
+class ArenaView:
+    """
+    Зеркало арены на клиенте: снимок + применение кадров-дельт.
+    prev_tail/grew нужны для интерполяции, как last_tail в движке.
+    """
+
+    def __init__(self):
+        self.width = self.height = 0
+        self.walls = True
+        self.my_pid = None
+        self.tick_ms = 100
+        self.tick = 0
+        self.ack = 0
+        self.bodies = {} # pid -> deque клеток, голова слева
+        self.scores = {}
+        self.food = set()
+        self.prev_tail = {} # pid -> клетка, ушедшая с хвоста в последнем кадре
+        self.moved = set() # кто шагнул в последнем кадре
+
+    def apply(self, payload):
+        kind = payload[0]
+        if kind == MSG_SNAPSHOT:
+            self._apply_snapshot(payload)
+        elif kind == MSG_FRAME:
+            self._apply_frame(payload)
+
+    def _apply_snapshot(self, payload):
+        (_, self.tick, self.width, self.height, walls,
+         self.my_pid, self.tick_ms, n) = SNAPSHOT_HEAD.unpack_from(payload)
+        self.walls = bool(walls)
+        pos = SNAPSHOT_HEAD.size
+        self.bodies.clear()
+        self.scores.clear()
+        for _ in range(n):
+            pid, score, length = SNAPSHOT_SNAKE.unpack_from(payload, pos)
+            pos += SNAPSHOT_SNAKE.size
+            self.bodies[pid] = deque(struct.unpack_from(f"<{length}H", payload, pos))
+            self.scores[pid] = score
+            pos += 2 * length
+        (n_food,) = LENGTH.unpack_from(payload, pos)
+        pos += LENGTH.size
+        self.food = set(struct.unpack_from(f"<{n_food}H", payload, pos))
+        self.prev_tail.clear()
+        self.moved.clear()
+
+    def _apply_frame(self, payload):
+        _, self.tick, self.ack, n = FRAME_HEAD.unpack_from(payload)
+        self.prev_tail.clear()
+        self.moved.clear()
+        bodies = self.bodies
+        for kind, pid, cell in struct.iter_unpack("<BBH", payload[FRAME_HEAD.size:]):
+            if kind == HEAD:
+                bodies[pid].appendleft(cell)
+                self.moved.add(pid)
+            elif kind == TAIL:
+                self.prev_tail[pid] = bodies[pid].pop()
+            elif kind == FOOD_ADD:
+                self.food.add(cell)
+            elif kind == FOOD_DEL:
+                self.food.discard(cell)
+                self.scores[pid] = self.scores.get(pid, 0) + 1
+            elif kind == SPAWN:
+                bodies[pid] = deque((cell,))
+                self.scores.setdefault(pid, 0)
+            elif kind == DIE:
+                if pid in bodies:
+                    bodies[pid].clear()
+                self.prev_tail.pop(pid, None)
+            elif kind == LEAVE:
+                bodies.pop(pid, None)
+                self.scores.pop(pid, None)
+                self.prev_tail.pop(pid, None)
+
+    def occupied(self):
+        cells = set()
+        for body in self.bodies.values():
+            cells.update(body)
+        return cells
+
+    def head_dir(self, pid):
+        # направление по двум первым клеткам (с учётом прохода сквозь стены)
+        body = self.bodies.get(pid)
+        if not body or len(body) < 2:
+            return None
+        hy, hx = divmod(body[0], self.width)
+        ny, nx = divmod(body[1], self.width)
+        dx, dy = hx - nx, hy - ny
+        if abs(dx) > 1:
+            dx = -1 if dx > 0 else 1
+        if abs(dy) > 1:
+            dy = -1 if dy > 0 else 1
+        return dx, dy
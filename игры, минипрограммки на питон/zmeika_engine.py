@@ -0,0 +1,226 @@
+import random
+from array import array
+from collections import deque
+
+from zmeika_level import PORTAL, MOVER, SOLID, MOVER_EVERY
+
+
+# ---------------- ДВИЖОК ЗМЕЙКИ (без tkinter) ----------------
+# Общие правила для zmeika.py, zmeika5.py и zmeyka8.py.
+# Детерминированный: при одинаковом seed и одинаковых ходах игра та же.
+
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+
+# результат step()
+MOVED = "moved"
+ATE = "ate"
+DIED = "died"
+
+# сколько поворотов можно нажать наперёд (по одному на логический шаг)
+INPUT_QUEUE = 3
+
+
+def queue_turn(inputs, current, direction):
+    """
+    Общая очередь поворотов (и для одной змеи, и для арены zmeika_arena):
+    разворот и повтор проверяются против последнего поворота в очереди.
+    """
+    last = inputs[-1] if inputs else current
+    if direction == last or direction == (-last[0], -last[1]):
+        return False
+    if len(inputs) >= INPUT_QUEUE:
+        return False
+    inputs.append(direction)
+    return True
+
+
+class FreeCells:
+    """
+    Множество свободных клеток: массив + позиция каждой клетки в нём.
+    Занять/освободить клетку — swap-remove / append, случайная клетка — O(1).
+    """
+
+    def __init__(self, size):
+        self.cells = array("i", range(size))
+        self.where = array("i", range(size)) # -1 — клетка занята
+
+    def __len__(self):
+        return len(self.cells)
+
+    def take(self, idx):
+        i = self.where[idx]
+        if i < 0:
+            return
+        last = self.cells.pop()
+        if last != idx:
+            self.cells[i] = last
+            self.where[last] = i
+        self.where[idx] = -1
+
+    def give(self, idx):
+        if self.where[idx] >= 0:
+            return
+        self.where[idx] = len(self.cells)
+        self.cells.append(idx)
+
+    def sample(self, rng):
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class SnakeEngine:
+    def __init__(self, width=20, height=16, walls=True, seed=None, start_len=3, level=None):
+        self.width = width
+        self.height = height
+        self.walls = walls # True — смерть от стен, False — проход насквозь
+        self.start_len = start_len
+        self.level = level # zmeika_level.Level того же размера или None
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+
+        cx, cy = self.width // 2, self.height // 2
+        # тело: голова слева; occ — занятость клеток (y * width + x), всё за O(1)
+        self.snake = deque((cx - i, cy) for i in range(self.start_len))
+        self.occ = bytearray(self.width * self.height)
+        self.free = FreeCells(self.width * self.height)
+        for x, y in self.snake:
+            self.occ[y * self.width + x] = 1
+            self.free.take(y * self.width + x)
+        self.last_tail = None # клетка, которую хвост освободил на последнем шаге
+        self.dir = RIGHT
+        self.inputs = deque() # нажатые повороты, ещё не применённые
+        self.score = 0
+        self.ticks = 0
+        self.alive = True
+
+        # уровень: своя копия маски (блоки в ней двигаются), на стенах,
+        # порталах и блоках еда не появляется
+        self.mask = None
+        self.movers = []
+        self.teleported = False # последний шаг прошёл через портал
+        if self.level is not None:
+            self.mask = bytearray(self.level.mask)
+            self.movers = [list(m) for m in self.level.movers]
+            for i in self.level.blocked():
+                if self.occ[i]:
+                    raise ValueError("Уровень закрывает стартовые клетки змейки")
+                self.free.take(i)
+        self.spawn_food()
+
+    def spawn_food(self):
+        if not self.free:
+            self.food = None
+            return
+        idx = self.free.sample(self.rng)
+        self.food = (idx % self.width, idx // self.width)
+
+    def occupied(self, x, y):
+        return self.occ[y * self.width + x] == 1
+
+    def queue_dir(self, direction):
+        """
+        Поворот с клавиатуры: встаёт в очередь и применяется на одном из
+        следующих шагов. Разворот проверяется против последнего поворота в
+        очереди, поэтому два быстрых нажатия за тик не сворачивают змею в себя.
+        """
+        return queue_turn(self.inputs, self.dir, direction)
+
+    def step(self, direction=None):
+        """
+        Один логический шаг. direction — новое направление (разворот в себя игнорируется);
+        без него берётся следующий поворот из очереди queue_dir().
+        Возвращает MOVED, ATE или DIED.
+        """
+        if not self.alive:
+            return DIED
+
+        if direction is None and self.inputs:
+            direction = self.inputs.popleft()
+
+        if direction is not None and direction != (-self.dir[0], -self.dir[1]):
+            self.dir = direction
+
+        self.ticks += 1
+        mask = self.mask
+        if mask is not None and self.ticks % MOVER_EVERY == 0:
+            self.move_movers()
+
+        hx, hy = self.snake[0]
+        dx, dy = self.dir
+        nx, ny = hx + dx, hy + dy
+
+        if self.walls:
+            if nx < 0 or nx >= self.width or ny < 0 or ny >= self.height:
+                self.alive = False
+                return DIED
+        else:
+            nx %= self.width
+            ny %= self.height
+
+        w = self.width
+        if mask is not None:
+            # уровень: одна клетка маски на шаг, портал — ещё одна
+            bits = mask[ny * w + nx]
+            self.teleported = bool(bits & PORTAL)
+            if self.teleported:
+                i = self.level.portal_to[ny * w + nx]
+                nx, ny = i % w, i // w
+                bits = mask[i]
+            if bits & SOLID:
+                self.alive = False
+                return DIED
+
+        new_head = (nx, ny)
+
+        # хвост уходит с клетки, если змея не растёт
+        will_grow = (new_head == self.food)
+        if self.occ[ny * w + nx] and (will_grow or new_head != self.snake[-1]):
+            self.alive = False
+            return DIED
+
+        if will_grow:
+            self.last_tail = None
+        else:
+            tx, ty = self.last_tail = self.snake.pop()
+            self.occ[ty * w + tx] = 0
+            if mask is None or not mask[ty * w + tx]:
+                self.free.give(ty * w + tx)
+
+        self.snake.appendleft(new_head)
+        self.occ[ny * w + nx] = 1
+        self.free.take(ny * w + nx)
+
+        if will_grow:
+            self.score += 1
+            self.spawn_food()
+            return ATE
+        return MOVED
+
+    def move_movers(self):
+        """
+        Блоки уровня — на клетку вперёд. Занятая клетка (край, стена, портал,
+        другой блок, змея, еда) разворачивает блок; если и сзади занято — стоит.
+        """
+        w, h, mask, occ = self.width, self.height, self.mask, self.occ
+        food = self.food[1] * w + self.food[0] if self.food else -1
+        for m in self.movers:
+            x, y, dx, dy = m
+            for sx, sy in ((dx, dy), (-dx, -dy)):
+                tx, ty = x + sx, y + sy
+                if not (0 <= tx < w and 0 <= ty < h):
+                    continue
+                t = ty * w + tx
+                if mask[t] or occ[t] or t == food:
+                    continue
+                mask[y * w + x] &= ~MOVER
+                self.free.give(y * w + x)
+                mask[t] |= MOVER
+                self.free.take(t)
+                m[:] = tx, ty, sx, sy
+                break
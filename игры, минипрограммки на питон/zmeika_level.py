@@ -0,0 +1,119 @@
+import os
+from array import array
+
+
+# ---------------- УРОВНИ ЗМЕЙКИ (без tkinter) ----------------
+# Текстовый файл, одна строка — один ряд клеток:
+#   .      пусто
+#   #      стена
+#   1..9   портал: две клетки с одной цифрой — пара, вход в одну — выход из другой
+#   > < v ^  движущийся блок (начальное направление), отскакивает от препятствий
+# Строки, начинающиеся с ";", — комментарии; "name = ..." — название уровня.
+#
+# Файл разбирается один раз в маску клеток (bytearray, биты ниже), поэтому
+# проверка столкновения в движке — одно чтение маски, как бы ни был сложен уровень.
+
+WALL = 1
+PORTAL = 2
+MOVER = 4
+SOLID = WALL | MOVER
+
+MOVER_DIRS = {">": (1, 0), "<": (-1, 0), "v": (0, 1), "^": (0, -1)}
+MOVER_EVERY = 2 # блоки ходят раз в столько тиков
+
+
+class Level:
+    """
+    Разобранный уровень: статическая маска (стены и порталы), пары порталов
+    и начальные блоки. Состояние партии (где сейчас блоки) живёт в движке.
+    """
+
+    def __init__(self, name, width, height, mask, portal_to, movers):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.mask = mask # bytearray: WALL | PORTAL | MOVER на старте
+        self.portal_to = portal_to # array: клетка портала -> клетка пары, иначе -1
+        self.movers = movers # [(x, y, dx, dy)]
+
+    def blocked(self):
+        """
+        Клетки, где не может появиться еда: стены, порталы, блоки на старте.
+        """
+        return [i for i, bits in enumerate(self.mask) if bits]
+
+
+def parse_level(text, name="Без названия"):
+    rows = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("name") and "=" in line:
+            name = line.split("=", 1)[1].strip()
+            continue
+        rows.append(line)
+    if not rows:
+        raise ValueError("Пустой уровень")
+
+    width, height = len(rows[0]), len(rows)
+    mask = bytearray(width * height)
+    portal_to = array("i", [-1]) * (width * height)
+    portals = {}
+    movers = []
+    for y, row in enumerate(rows):
+        if len(row) != width:
+            raise ValueError(f"Строка {y + 1}: {len(row)} клеток вместо {width}")
+        for x, ch in enumerate(row):
+            i = y * width + x
+            if ch == "#":
+                mask[i] = WALL
+            elif ch in "123456789":
+                mask[i] = PORTAL
+                portals.setdefault(ch, []).append(i)
+            elif ch in MOVER_DIRS:
+                mask[i] = MOVER
+                movers.append((x, y) + MOVER_DIRS[ch])
+            elif ch != ".":
+                raise ValueError(f"Строка {y + 1}: непонятный символ {ch!r}")
+
+    for ch, cells in portals.items():
+        if len(cells) != 2:
+            raise ValueError(f"Портал {ch}: {len(cells)} клеток, нужна пара")
+        a, b = cells
+        portal_to[a], portal_to[b] = b, a
+    return Level(name, width, height, mask, portal_to, movers)
+
+
+def load_level(path):
+    with open(path, encoding="utf-8") as fh:
+        return parse_level(fh.read(), os.path.splitext(os.path.basename(path))[0])
+
+
+def wall_rects(level):
+    """
+    Стены как немного прямоугольников вместо элемента на клетку: подряд идущие
+    стены ряда сливаются в отрезок, одинаковые отрезки соседних рядов — в один
+    прямоугольник. Возвращает [(x0, y0, x1, y1)] в клетках, x1 и y1 не включая.
+    """
+    w, h, mask = level.width, level.height, level.mask
+    growing = {} # (x0, x1) -> ряд, с которого растёт прямоугольник
+    rects = []
+    for y in range(h + 1):
+        runs = set()
+        if y < h:
+            x = 0
+            while x < w:
+                if mask[y * w + x] & WALL:
+                    x0 = x
+                    while x < w and mask[y * w + x] & WALL:
+                        x += 1
+                    runs.add((x0, x))
+                else:
+                    x += 1
+        for run in list(growing):
+            if run not in runs:
+                rects.append((run[0], growing.pop(run), run[1], y))
+        for run in runs:
+            growing.setdefault(run, y)
+    return rects
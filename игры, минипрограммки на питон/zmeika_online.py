@@ -0,0 +1,253 @@
+import tkinter as tk
+import asyncio
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+from zmeika_arena import MSG_FRAME
+from zmeika_engine import queue_turn
+from zmeika_server import ArenaClient, HOST, PORT
+
+
+# ---------------- ЗМЕЙКА ПО СЕТИ: ОКНО ИГРОКА ----------------
+# Сеть живёт в своём потоке (asyncio), окно забирает сообщения из очереди
+# раз в кадр. Чужие змеи рисуются с интерполяцией между двумя последними
+# кадрами сервера (как draw_interpolated в zmeyka8), своя — с предсказанием:
+# нажатый поворот виден сразу, не дожидаясь ответа сервера.
+# Запуск: python zmeika_server.py 3, потом python zmeika_online.py [хост] [порт]
+
+CELL = 18
+HUD_H = 30
+FRAME_MS = 16
+
+PLAYER_COLORS = ["#2ecc71", "#3498db", "#e67e22", "#9b59b6", "#f1c40f", "#1abc9c", "#e84393", "#ecf0f1"]
+
+KEY_DIRS = {
+    "w": (0, -1), "Up": (0, -1),
+    "s": (0, 1), "Down": (0, 1),
+    "a": (-1, 0), "Left": (-1, 0),
+    "d": (1, 0), "Right": (1, 0),
+}
+
+
+class QueueClient(ArenaClient):
+    # сообщения не разбираются в сетевом потоке — только передаются окну
+    def __init__(self, inbox):
+        super().__init__()
+        self.inbox = inbox
+
+    def receive(self, msg):
+        self.inbox.put(msg)
+
+
+class OnlineSnake:
+    def __init__(self, root, host=HOST, port=PORT):
+        self.root = root
+        self.root.title("Змейка по сети")
+        self.canvas = tk.Canvas(root, width=400, height=200, bg="#111", highlightthickness=0)
+        self.canvas.pack()
+        self.status_item = self.canvas.create_text(200, 100, text="Подключение…", fill="#ecf0f1",
+                                                    font=("Arial", 14))
+
+        self.inbox = queue.Queue()
+        self.client = QueueClient(self.inbox)
+        self.view = self.client.view
+        self.loop = None
+        self.host, self.port = host, port
+
+        self.scene_ready = False
+        self.frame_time = time.perf_counter()
+        self.pending = deque() # (seq, направление) — отправлено, сервер ещё не подтвердил
+        self.next_seq = 0
+
+        self.lines = {} # pid -> линия тела
+        self.heads = {} # pid -> кружок головы
+        self.food_items = []
+        self.hud_text = None
+
+        threading.Thread(target=self.net_main, daemon=True).start()
+        self.root.bind("<Key>", self.key_press)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.poll()
+
+    # ---- сеть (свой поток) ----
+    def net_main(self):
+        asyncio.run(self.net_session())
+
+    async def net_session(self):
+        self.loop = asyncio.get_running_loop()
+        try:
+            await self.client.connect(self.host, self.port)
+        except OSError as e:
+            self.inbox.put(f"Нет соединения с {self.host}:{self.port} ({e.strerror or e})")
+            return
+        await self.client.run()
+        self.inbox.put("Сервер закрыл соединение")
+
+    def close(self):
+        # сервер закрыл соединение или его не было — asyncio.run уже закрыл
+        # цикл, а окно всё равно должно закрыться
+        if self.loop is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.client.close)
+            except RuntimeError:
+                pass # закрылся в промежутке
+        self.root.destroy()
+
+    # ---- ввод с предсказанием ----
+    def key_press(self, e):
+        d = KEY_DIRS.get(e.keysym)
+        if d is None or self.loop is None or self.loop.is_closed() or not self.scene_ready:
+            return
+        inputs = deque(p[1] for p in self.pending)
+        # у змеи длины 1 направления не видно — годится любой поворот
+        current = self.view.head_dir(self.view.my_pid) or (0, 0)
+        if not queue_turn(inputs, current, d):
+            return
+        self.next_seq += 1
+        self.pending.append((self.next_seq, d))
+        self.loop.call_soon_threadsafe(self.client.send_input, self.next_seq, d)
+
+    # ---- кадры ----
+    def poll(self):
+        got_frame = False
+        while True:
+            try:
+                msg = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(msg, str):
+                self.show_status(msg)
+                continue
+            self.view.apply(msg)
+            got_frame |= msg[0] == MSG_FRAME
+            if not self.scene_ready:
+                self.build_scene()
+
+        if got_frame:
+            self.frame_time = time.perf_counter()
+            # сервер принял ввод — дальше верим его кадрам
+            while self.pending and self.pending[0][0] <= self.view.ack:
+                self.pending.popleft()
+
+        if self.scene_ready:
+            alpha = (time.perf_counter() - self.frame_time) * 1000 / self.view.tick_ms
+            self.draw(min(1.0, max(0.0, alpha)))
+        self.root.after(FRAME_MS, self.poll)
+
+    def show_status(self, text):
+        self.canvas.itemconfig(self.status_item, text=text, state="normal")
+        self.canvas.tag_raise(self.status_item)
+
+    def build_scene(self):
+        v = self.view
+        w, h = v.width * CELL, v.height * CELL + HUD_H
+        self.canvas.config(width=w, height=h)
+        self.canvas.coords(self.status_item, w / 2, h / 2)
+        self.canvas.itemconfig(self.status_item, state="hidden")
+        self.canvas.create_rectangle(0, HUD_H, w, h, outline="#444")
+        self.hud_item = self.canvas.create_text(8, HUD_H / 2, anchor="w", text="", fill="#ecf0f1",
+                                                font=("Arial", 11))
+        self.scene_ready = True
+
+    def center(self, x, y):
+        return (x + 0.5) * CELL, (y + 0.5) * CELL + HUD_H
+
+    def cell_xy(self, cell):
+        y, x = divmod(cell, self.view.width)
+        return x, y
+
+    def lerp_cell(self, a, b, t):
+        # от клетки a к клетке b; через край поля (без стен) — без плавности
+        ax, ay = self.cell_xy(a)
+        bx, by = self.cell_xy(b)
+        if abs(bx - ax) > 1 or abs(by - ay) > 1:
+            return self.center(bx, by)
+        return self.center(ax + (bx - ax) * t, ay + (by - ay) * t)
+
+    def snake_points(self, pid, body, alpha):
+        v = self.view
+        if pid == v.my_pid:
+            # своя змея — на шаг вперёд: голова уже едет туда, куда нажали
+            d = self.pending[0][1] if self.pending else v.head_dir(pid)
+            hx, hy = self.cell_xy(body[0])
+            if d is not None:
+                nx, ny = hx + d[0], hy + d[1]
+                head = self.center(hx + d[0] * alpha, hy + d[1] * alpha)
+                if not v.walls and not (0 <= nx < v.width and 0 <= ny < v.height):
+                    head = self.center(hx, hy)
+            else:
+                head = self.center(hx, hy)
+            pts = [head]
+            for i in range(1, len(body)):
+                pts.append(self.lerp_cell(body[i], body[i - 1], alpha))
+            return pts
+
+        # чужие — на шаг позади: от прошлого кадра к последнему
+        if pid not in v.moved:
+            return [self.center(*self.cell_xy(c)) for c in body]
+        pts = []
+        n = len(body)
+        tail = v.prev_tail.get(pid, body[-1])
+        for i in range(n):
+            prev = body[i + 1] if i + 1 < n else tail
+            pts.append(self.lerp_cell(prev, body[i], alpha))
+        return pts
+
+    def draw(self, alpha):
+        v, canvas = self.view, self.canvas
+        body_w = CELL - 6
+
+        for pid in list(self.lines):
+            if pid not in v.bodies:
+                canvas.delete(self.lines.pop(pid))
+                canvas.delete(self.heads.pop(pid))
+
+        for pid, body in v.bodies.items():
+            color = PLAYER_COLORS[pid % len(PLAYER_COLORS)]
+            if pid not in self.lines:
+                self.lines[pid] = canvas.create_line(0, 0, 0, 0, fill=color, width=body_w,
+                                                     capstyle=tk.ROUND, joinstyle=tk.ROUND)
+                self.heads[pid] = canvas.create_oval(0, 0, 0, 0, fill=color,
+                                                     outline="white" if pid == v.my_pid else "")
+            if not body:
+                canvas.itemconfig(self.lines[pid], state="hidden")
+                canvas.itemconfig(self.heads[pid], state="hidden")
+                continue
+            pts = self.snake_points(pid, body, alpha)
+            flat = [c for p in pts for c in p]
+            if len(flat) < 4:
+                flat = flat * 2
+            canvas.coords(self.lines[pid], flat)
+            hx, hy = pts[0]
+            r = CELL * 0.45
+            canvas.coords(self.heads[pid], hx - r, hy - r, hx + r, hy + r)
+            canvas.itemconfig(self.lines[pid], state="normal")
+            canvas.itemconfig(self.heads[pid], state="normal")
+
+        foods = sorted(v.food)
+        while len(self.food_items) < len(foods):
+            self.food_items.append(canvas.create_oval(0, 0, 0, 0, fill="#e74c3c", outline=""))
+        r = CELL * 0.3
+        for item, cell in zip(self.food_items, foods):
+            cx, cy = self.center(*self.cell_xy(cell))
+            canvas.coords(item, cx - r, cy - r, cx + r, cy + r)
+            canvas.itemconfig(item, state="normal")
+        for item in self.food_items[len(foods):]:
+            canvas.itemconfig(item, state="hidden")
+
+        scores = "  ".join(f"{'*' if pid == v.my_pid else ''}P{pid + 1}: {s}" for pid, s in sorted(v.scores.items()))
+        hud = f"Тик {v.tick} | {scores}"
+        if hud != self.hud_text:
+            self.hud_text = hud
+            canvas.itemconfig(self.hud_item, text=hud)
+
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    game = OnlineSnake(root,
+                       sys.argv[1] if len(sys.argv) > 1 else HOST,
+                       int(sys.argv[2]) if len(sys.argv) > 2 else PORT)
+    root.mainloop()
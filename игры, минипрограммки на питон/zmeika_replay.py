@@ -0,0 +1,141 @@
+import struct
+
+from zmeika_engine import SnakeEngine, UP, DOWN, LEFT, RIGHT
+
+
+# ---------------- ПОВТОРЫ ЗМЕЙКИ (без tkinter) ----------------
+# Игра детерминирована: seed движка + ходы = вся партия. Поэтому в файл
+# пишутся только параметры поля, seed и повороты (тик, направление).
+#
+# Формат файла:
+#   заголовок  <4sHHBBQI: "ZRP1", ширина, высота, стены, start_len, seed, последний тик
+#   события    varint((тик - тик предыдущего события) << 2 | код направления)
+
+MAGIC = b"ZRP1"
+HEADER = struct.Struct("<4sHHBBQI")
+
+DIR_CODES = {UP: 0, RIGHT: 1, DOWN: 2, LEFT: 3}
+CODE_DIRS = {code: d for d, code in DIR_CODES.items()}
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos):
+    n = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+class Replay:
+    """
+    Запись одной партии: параметры движка, seed и список (тик, направление).
+    Событие с тиком t — направление, с которым движок сделал шаг номер t.
+    """
+
+    def __init__(self, width, height, walls, seed, start_len=3):
+        self.width = width
+        self.height = height
+        self.walls = walls
+        self.seed = seed
+        self.start_len = start_len
+        self.events = []
+        self.end_tick = 0
+        self.last_dir = RIGHT # направление движка после reset()
+
+    @classmethod
+    def for_engine(cls, engine, seed):
+        return cls(engine.width, engine.height, engine.walls, seed, engine.start_len)
+
+    def log(self, tick, direction):
+        # вызывается после каждого шага; пишем только смену направления
+        if direction != self.last_dir:
+            self.events.append((tick, direction))
+            self.last_dir = direction
+        self.end_tick = tick
+
+    # ---- файл ----
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(MAGIC, self.width, self.height, int(self.walls),
+                                    self.start_len, self.seed, self.end_tick))
+        prev = 0
+        for tick, direction in self.events:
+            _write_varint(out, (tick - prev) << 2 | DIR_CODES[direction])
+            prev = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, width, height, walls, start_len, seed, end_tick = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Это не файл повтора змейки")
+        replay = cls(width, height, bool(walls), seed, start_len)
+        replay.end_tick = end_tick
+        pos = HEADER.size
+        tick = 0
+        while pos < len(data):
+            n, pos = _read_varint(data, pos)
+            tick += n >> 2
+            replay.events.append((tick, CODE_DIRS[n & 3]))
+        if replay.events:
+            replay.last_dir = replay.events[-1][1]
+        return replay
+
+    def save(self, path):
+        with open(path, "wb") as fh:
+            fh.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as fh:
+            return cls.from_bytes(fh.read())
+
+
+class ReplayPlayer:
+    """
+    Проигрывает повтор на своём движке. seek() пересчитывает партию без
+    отрисовки (сотни тысяч тиков в секунду), назад — заново от seed.
+    """
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.engine = SnakeEngine(replay.width, replay.height, walls=replay.walls,
+                                  seed=replay.seed, start_len=replay.start_len)
+        self.cursor = 0 # следующее событие
+
+    @property
+    def tick(self):
+        return self.engine.ticks
+
+    @property
+    def finished(self):
+        return not self.engine.alive or self.engine.ticks >= self.replay.end_tick
+
+    def step(self):
+        events = self.replay.events
+        direction = None
+        if self.cursor < len(events) and events[self.cursor][0] == self.engine.ticks + 1:
+            direction = events[self.cursor][1]
+            self.cursor += 1
+        return self.engine.step(direction)
+
+    def rewind(self):
+        self.engine.reset(seed=self.replay.seed)
+        self.cursor = 0
+
+    def seek(self, tick):
+        tick = max(0, min(tick, self.replay.end_tick))
+        if tick < self.engine.ticks:
+            self.rewind()
+        engine = self.engine
+        while engine.ticks < tick and engine.alive:
+            self.step()
@@ -0,0 +1,136 @@
+import atexit
+import os
+import threading
+import time
+from bisect import insort
+
+
+# ---------------- РЕКОРДЫ ЗМЕЙКИ (без tkinter) ----------------
+# Общий файл для zmeika.py, zmeika5.py и zmeyka8.py, дописывается в конец:
+#   время <TAB> скорость <TAB> стены <TAB> тема <TAB> длина <TAB> секунды <TAB> тики
+# Таблица рекордов ключуется (скорость, стены, тема).
+#
+# Игра не ждёт диск: record() только кладёт строку в буфер, пишет фоновый
+# поток — одним дописыванием на несколько партий. Файл читается один раз,
+# при первом запросе таблицы, дальше рекорды живут в памяти.
+
+SCORES_PATH = os.path.join(os.path.expanduser("~"), ".zmeika_scores.tsv")
+TOP_N = 10
+FLUSH_DELAY = 2.0 # сек: партии, закончившиеся подряд, уходят в файл одной записью
+
+
+class RunClock:
+    """
+    Время партии без пауз.
+    """
+
+    def __init__(self):
+        self.start()
+
+    def start(self):
+        self.spent = 0.0
+        self.since = time.monotonic()
+
+    def pause(self):
+        if self.since is not None:
+            self.spent += time.monotonic() - self.since
+            self.since = None
+
+    def resume(self):
+        if self.since is None:
+            self.since = time.monotonic()
+
+    @property
+    def seconds(self):
+        if self.since is None:
+            return self.spent
+        return self.spent + time.monotonic() - self.since
+
+
+def format_run(length, seconds, ticks):
+    return f"длина {length} • {int(seconds) // 60}:{int(seconds) % 60:02d} • {ticks} тиков"
+
+
+def _rank(run):
+    # run = (время, длина, секунды, тики): длиннее — выше, при равной — быстрее по тикам
+    when, length, seconds, ticks = run
+    return -length, ticks, seconds, when
+
+
+class ScoreStore:
+    def __init__(self, path=SCORES_PATH):
+        self.path = path
+        self.lock = threading.Lock() # буфер
+        self.write_lock = threading.Lock() # файл
+        self.wake = threading.Event()
+        self.pending = [] # строки, ещё не дописанные в файл
+        self.thread = None
+        self.tables = None # (скорость, стены, тема) -> TOP_N лучших, после первого top()
+
+    # ---- запись ----
+    def record(self, speed, walls, theme, length, seconds, ticks):
+        when = time.time()
+        speed = str(speed).replace("\t", " ")
+        theme = str(theme).replace("\t", " ")
+        line = f"{when:.0f}\t{speed}\t{int(bool(walls))}\t{theme}\t{length}\t{seconds:.1f}\t{ticks}\n"
+        with self.lock:
+            self.pending.append(line)
+        if self.tables is not None:
+            self._insert((speed, bool(walls), theme), (when, length, seconds, ticks))
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._writer, daemon=True)
+            self.thread.start()
+            atexit.register(self.flush) # поток-демон при выходе не ждут
+        self.wake.set()
+
+    def _writer(self):
+        while True:
+            self.wake.wait()
+            time.sleep(FLUSH_DELAY)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                lines, self.pending = self.pending, []
+            if not lines:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    fh.write("".join(lines))
+            except OSError:
+                with self.lock:
+                    self.pending[:0] = lines # попробуем со следующей партией
+
+    # ---- чтение ----
+    def _insert(self, key, run):
+        table = self.tables.setdefault(key, [])
+        insort(table, run, key=_rank)
+        del table[TOP_N:]
+
+    def _load(self):
+        self.flush() # буфер — в файл, тогда файл полон
+        self.tables = {}
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                for line in fh:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 7:
+                        continue
+                    try:
+                        run = (float(parts[0]), int(parts[4]), float(parts[5]), int(parts[6]))
+                    except ValueError:
+                        continue
+                    self._insert((parts[1], parts[2] == "1", parts[3]), run)
+        except FileNotFoundError:
+            pass
+
+    def top(self, speed, walls, theme):
+        """
+        До TOP_N лучших партий: [(время, длина, секунды, тики)], лучшая первой.
+        """
+        if self.tables is None:
+            self._load()
+        return list(self.tables.get((str(speed), bool(walls), str(theme)), ()))
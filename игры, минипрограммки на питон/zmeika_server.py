@@ -0,0 +1,244 @@
+import asyncio
+import random
+import struct
+import sys
+import time
+from collections import deque
+
+from zmeika_arena import (
+    Arena, ArenaView, DIRS, INPUT, LENGTH, MSG_INPUT,
+    frame_message, pack_events, with_length,
+)
+
+
+# ---------------- СЕРВЕР АРЕНЫ (asyncio, без tkinter) ----------------
+# Сервер — единственный, кто считает игру: раз в TICK_MS делает Arena.step()
+# и рассылает всем одинаковые события тика (4 байта на событие) плюс
+# номер последнего принятого ввода этого клиента — для предсказания.
+# Запуск: python zmeika_server.py [число ботов]
+# Клиент с окном — zmeika_online.py, нагрузочный тест — bench_zmeika_net.py.
+
+HOST = "127.0.0.1"
+PORT = 8765
+TICK_MS = 100
+MAX_BUFFER = 64 * 1024 # клиент, который столько не вычитал, отключается
+
+
+async def read_message(reader):
+    head = await reader.readexactly(LENGTH.size)
+    (n,) = LENGTH.unpack(head)
+    return await reader.readexactly(n)
+
+
+class Connection:
+    __slots__ = ("pid", "writer", "ack", "bytes_out")
+
+    def __init__(self, pid, writer):
+        self.pid = pid
+        self.writer = writer
+        self.ack = 0 # номер последнего ввода, поставленного в очередь
+        self.bytes_out = 0
+
+
+class SnakeServer:
+    def __init__(self, host=HOST, port=PORT, width=40, height=30, walls=True, tick_ms=TICK_MS, seed=None):
+        self.host = host
+        self.port = port
+        self.tick_ms = tick_ms
+        self.arena = Arena(width, height, walls=walls, seed=seed)
+        self.clients = {} # pid -> Connection
+        self.server = None
+        self.ticker = None
+        self.handlers = set()
+
+        # статистика для нагрузочного теста
+        self.lateness = deque(maxlen=10000) # опоздание тика, мс
+        self.tick_cost = deque(maxlen=10000) # время шага + рассылки, мс
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1] # если port=0
+        self.ticker = asyncio.create_task(self.run_ticks())
+
+    async def stop(self):
+        self.ticker.cancel()
+        self.server.close()
+        for conn in list(self.clients.values()):
+            conn.writer.close()
+        # обработчики сами дочитают EOF и выйдут
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    # ---- клиенты ----
+    async def handle_client(self, reader, writer):
+        pid = self.arena.add_player()
+        if pid is None:
+            writer.close() # мест нет
+            return
+        conn = Connection(pid, writer)
+        self.clients[pid] = conn
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        self.send(conn, self.arena.snapshot(pid, self.tick_ms))
+        try:
+            while True:
+                msg = await read_message(reader)
+                if not msg:
+                    continue
+                if msg[0] == MSG_INPUT:
+                    _, seq, code = INPUT.unpack(msg)
+                    # подтверждаем только поставленный в очередь поворот:
+                    # отброшенный клиент не должен считать сделанным
+                    if code < len(DIRS) and self.arena.queue_dir(pid, DIRS[code]):
+                        conn.ack = seq
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass
+        finally:
+            self.drop(conn)
+            self.handlers.discard(task)
+
+    def send(self, conn, payload):
+        data = with_length(payload)
+        conn.writer.write(data)
+        conn.bytes_out += len(data)
+
+    def drop(self, conn):
+        if self.clients.pop(conn.pid, None) is not None:
+            self.arena.remove_player(conn.pid)
+            conn.writer.close()
+
+    # ---- тики ----
+    async def run_ticks(self):
+        loop = asyncio.get_running_loop()
+        period = self.tick_ms / 1000
+        deadline = loop.time()
+        while True:
+            deadline += period
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            late = loop.time() - deadline
+            self.lateness.append(late * 1000)
+            if late > period:
+                deadline = loop.time() # не догонять пачкой тиков после долгой паузы
+
+            t0 = time.perf_counter()
+            self.broadcast(self.arena.step())
+            self.tick_cost.append((time.perf_counter() - t0) * 1000)
+
+    def broadcast(self, events):
+        packed = pack_events(events) # одинаково для всех — упаковываем один раз
+        tick = self.arena.tick
+        for conn in list(self.clients.values()):
+            if conn.writer.transport.get_write_buffer_size() > MAX_BUFFER:
+                self.drop(conn)
+                continue
+            self.send(conn, frame_message(tick, conn.ack, len(events), packed))
+
+
+class ArenaClient:
+    """
+    Сетевой клиент без окна: держит ArenaView в актуальном состоянии,
+    отправляет повороты. on_message() вызывается после каждого сообщения;
+    receive() можно переопределить целиком (окно разбирает кадры у себя).
+    """
+
+    def __init__(self):
+        self.view = ArenaView()
+        self.reader = None
+        self.writer = None
+        self.seq = 0
+        self.bytes_in = 0
+        self.frames = 0
+
+    async def connect(self, host=HOST, port=PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def run(self):
+        try:
+            while True:
+                msg = await read_message(self.reader)
+                self.bytes_in += LENGTH.size + len(msg)
+                self.frames += 1
+                self.receive(msg)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def receive(self, msg):
+        self.view.apply(msg)
+        self.on_message()
+
+    def on_message(self):
+        pass
+
+    def send_dir(self, direction):
+        self.seq += 1
+        self.send_input(self.seq, direction)
+        return self.seq
+
+    def send_input(self, seq, direction):
+        self.writer.write(with_length(INPUT.pack(MSG_INPUT, seq, DIRS.index(direction))))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class BotClient(ArenaClient):
+    """
+    Простой бот: к ближайшей еде, не въезжая в стены и тела.
+    """
+
+    def __init__(self, seed=None):
+        super().__init__()
+        self.rng = random.Random(seed)
+
+    def on_message(self):
+        v = self.view
+        body = v.bodies.get(v.my_pid)
+        if not body:
+            return
+        w, h = v.width, v.height
+        hy, hx = divmod(body[0], w)
+        busy = v.occupied()
+        cur = v.head_dir(v.my_pid)
+
+        best, best_score = None, None
+        for d in DIRS:
+            if cur is not None and d == (-cur[0], -cur[1]):
+                continue
+            nx, ny = hx + d[0], hy + d[1]
+            if v.walls and not (0 <= nx < w and 0 <= ny < h):
+                continue
+            nx %= w
+            ny %= h
+            if ny * w + nx in busy:
+                continue
+            dist = min((abs(f % w - nx) + abs(f // w - ny) for f in v.food), default=0)
+            score = dist + self.rng.random() * 0.5
+            if best_score is None or score < best_score:
+                best, best_score = d, score
+        if best is not None and best != cur:
+            self.send_dir(best)
+
+
+async def run_with_bots(bots=3, seconds=None, **server_args):
+    server = SnakeServer(**server_args)
+    await server.start()
+    print(f"Сервер змейки: {server.host}:{server.port}, ботов: {bots}")
+    clients = []
+    for i in range(bots):
+        bot = BotClient(seed=i)
+        await bot.connect(server.host, server.port)
+        clients.append(asyncio.create_task(bot.run()))
+    try:
+        if seconds is None:
+            await asyncio.Event().wait()
+        else:
+            await asyncio.sleep(seconds)
+    finally:
+        await server.stop()
+        for task in clients:
+            task.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_with_bots(int(sys.argv[1]) if len(sys.argv) > 1 else 3))
@@ -0,0 +1,138 @@
+import numpy as np
+
+
+# ---------------- ВЕКТОРНАЯ СРЕДА ЗМЕЙКИ (для обучения) ----------------
+# N независимых игр по правилам zmeika_engine, всё состояние — массивы NumPy:
+#     env = VecSnakeEnv(256, seed=0)
+#     obs = env.reset()
+#     obs, reward, done, info = env.step(actions)
+# Шаг, смерть, еда и перезапуск законченных игр — без цикла Python по средам.
+
+# действия: 0 вверх, 1 вправо, 2 вниз, 3 влево (разворот в себя игнорируется)
+DIRS = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)], dtype=np.int64)
+
+# каналы наблюдения
+BODY, HEAD, FOOD = 0, 1, 2
+
+
+class VecSnakeEnv:
+    def __init__(self, num_envs, width=20, height=16, walls=True, start_len=3, max_idle=None, seed=None):
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.walls = walls
+        self.start_len = start_len
+        self.cells = width * height
+        # без еды дольше max_idle шагов — игра обрывается (done, награда 0)
+        self.max_idle = 2 * self.cells if max_idle is None else max_idle
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        self.rows = np.arange(n)
+        # тело — кольцевой буфер клеток (y * width + x), голова в body[i, head_ptr[i]]
+        self.body = np.zeros((n, self.cells), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.occ = np.zeros((n, self.cells), dtype=bool)
+        self.food = np.zeros(n, dtype=np.int64)
+        self.dir = np.zeros(n, dtype=np.int64)
+        self.idle = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool) # флаги последнего шага
+
+        # стартовое тело одинаково для всех: голова в центре, хвост слева
+        cx, cy = width // 2, height // 2
+        self.start_body = np.array([cy * width + cx - i for i in range(start_len - 1, -1, -1)], dtype=np.int32)
+
+    # ---- сброс ----
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_rows(self.rows)
+        self.done[:] = False
+        return self.observation()
+
+    def _reset_rows(self, rows):
+        k = self.start_len
+        self.occ[rows] = False
+        self.body[rows, :k] = self.start_body
+        self.occ[rows[:, None], self.start_body[None, :]] = True
+        self.head_ptr[rows] = k - 1
+        self.length[rows] = k
+        self.dir[rows] = 1
+        self.idle[rows] = 0
+        self._spawn_food(rows)
+
+    def _spawn_food(self, rows):
+        # случайная свободная клетка в каждой строке: argmax по случайным ключам
+        if rows.size == 0:
+            return
+        keys = self.rng.random((rows.size, self.cells))
+        keys[self.occ[rows]] = -1.0
+        self.food[rows] = keys.argmax(axis=1)
+
+    # ---- шаг ----
+    def step(self, actions):
+        """
+        actions — массив из num_envs чисел 0..3.
+        Возвращает (obs, reward, done, info); законченные игры сразу
+        перезапускаются, их итог — в info["final_length"] (-1 у остальных).
+        """
+        rows = self.rows
+        actions = np.asarray(actions, dtype=np.int64)
+        turn = actions != (self.dir + 2) % 4
+        self.dir = np.where(turn, actions, self.dir)
+
+        head = self.body[rows, self.head_ptr]
+        hx = head % self.width + DIRS[self.dir, 0]
+        hy = head // self.width + DIRS[self.dir, 1]
+        if self.walls:
+            out = (hx < 0) | (hx >= self.width) | (hy < 0) | (hy >= self.height)
+            hx = np.clip(hx, 0, self.width - 1)
+            hy = np.clip(hy, 0, self.height - 1)
+        else:
+            out = np.zeros(self.num_envs, dtype=bool)
+            hx %= self.width
+            hy %= self.height
+        new = hy * self.width + hx
+
+        ate = ~out & (new == self.food)
+        tail = self.body[rows, (self.head_ptr - self.length + 1) % self.cells]
+        # в клетку хвоста можно, если змея не растёт — хвост как раз уходит
+        hit = self.occ[rows, new] & ~((new == tail) & ~ate)
+        dead = out | hit
+        alive = ~dead
+
+        moved = alive & ~ate
+        self.occ[rows[moved], tail[moved]] = False
+        live = rows[alive]
+        self.head_ptr[live] = (self.head_ptr[live] + 1) % self.cells
+        self.body[live, self.head_ptr[live]] = new[alive]
+        self.occ[live, new[alive]] = True
+        self.length += ate
+
+        won = ate & (self.length == self.cells)
+        self._spawn_food(rows[ate & ~won])
+
+        self.idle = np.where(ate, 0, self.idle + 1)
+        stalled = alive & ~won & (self.idle >= self.max_idle)
+
+        reward = ate.astype(np.float32) - dead.astype(np.float32)
+        done = dead | won | stalled
+        final_length = np.where(done, self.length, -1)
+
+        self.done[:] = done
+        finished = rows[done]
+        if finished.size:
+            self._reset_rows(finished)
+        return self.observation(), reward, done, {"final_length": final_length}
+
+    # ---- наблюдение ----
+    def observation(self):
+        """
+        (num_envs, 3, height, width) uint8: тело, голова, еда.
+        """
+        obs = np.zeros((self.num_envs, 3, self.cells), dtype=np.uint8)
+        obs[:, BODY] = self.occ
+        obs[self.rows, HEAD, self.body[self.rows, self.head_ptr]] = 1
+        obs[self.rows, FOOD, self.food] = 1
+        return obs.reshape(self.num_envs, 3, self.height, self.width)
@@ -1,6 +1,22 @@
 import tkinter as tk
+import math
+import os
 import random
+import struct
 import time
+from collections import deque
+from itertools import chain, islice
+
+from zmeika_engine import SnakeEngine, DIED
+from zmeika_ai import make_strategy
+from zmeika_replay import Replay, ReplayPlayer
+from zmeika_scores import ScoreStore, RunClock, format_run, TOP_N
+from zmeika_level import load_level, wall_rects
+
+try:
+    import numpy as np # векторная интерполяция тела; без numpy — обычный путь
+except ImportError:
+    np = None
 
 # ---------------- НАСТРОЙКИ ----------------
 CELL = 25
@@ -17,7 +33,26 @@ SPEEDS = {
     "Хардкор": 50
 }
 
-FRAME_MS = 16 # ~60 FPS
+# большой мир: камера следует за головой, рисуется только окно WIDTH x HEIGHT
+BIG_WORLD = 1000
+BUCKET = 16 # сторона корзины пространственного индекса тела, в клетках
+VIEW_CX = WIN_W / 2
+VIEW_CY = 80 + (WIN_H - 80) / 2
+
+# автопилот (I в игре): по кругу выкл -> стратегии zmeika_ai
+PILOTS = [None, "greedy", "safe", "hamilton"]
+
+# повтор последней партии (V в меню) и перемотка в нём
+REPLAY_PATH = os.path.join(os.path.expanduser("~"), ".zmeyka8_replay.zrp")
+SEEK_KEYS = {"Right": 100, "Left": -100, "Next": 1000, "Prior": -1000}
+
+# уровни (L в меню): файлы urovni/*.txt размером WIDTH x HEIGHT, см. zmeika_level.py
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "urovni")
+PORTAL_COLORS = ["#60a5fa", "#f472b6", "#facc15", "#a3e635", "#c084fc", "#fb923c", "#22d3ee", "#f87171", "#e5e7eb"]
+MOVER_COLOR = "#f59e0b"
+
+FRAME_MS = 1000 / 60 # 60 FPS; дедлайны кадров считаются в float
+MAX_CATCHUP = 6 # сколько логических шагов можно догнать за один кадр
 
 THEMES = [
     {
@@ -60,6 +95,91 @@ THEMES = [
 # -------------------------------------------
 
 
+class BodyArray:
+    """
+    Тело змеи в кольцевом буфере NumPy (голова — в head).
+    Шаг — одна запись в буфер, без копирования тела.
+    """
+
+    def __init__(self, capacity, snake):
+        self.buf = np.zeros((capacity, 2))
+        self.cap = capacity
+        self.n = len(snake)
+        self.head = 0
+        self.buf[:self.n] = list(snake)
+        self.mod = np.array([WIDTH, HEIGHT], dtype=float)
+
+    def push_head(self, pos, grew):
+        self.head = (self.head - 1) % self.cap
+        self.buf[self.head] = pos
+        if grew:
+            self.n += 1
+
+    def positions(self):
+        idx = (self.head + np.arange(self.n)) % self.cap
+        return self.buf[idx]
+
+
+class BodyIndex:
+    """
+    Пространственный индекс тела для большого мира: корзины BUCKET x BUCKET
+    клеток -> множества серийных номеров сегментов. Сегмент i (от головы)
+    имеет номер head_serial - i, поэтому шаг змеи — одна вставка и одно
+    удаление, а выборка по окну камеры — O(видимых), а не O(длины).
+    """
+
+    def __init__(self, w, h, snake):
+        self.w = w
+        self.h = h
+        self.nbx = (w + BUCKET - 1) // BUCKET
+        self.nby = (h + BUCKET - 1) // BUCKET
+        self.buckets = {}
+        self.pos = {} # серийный номер -> (x, y)
+        self.tail_serial = 0
+        self.head_serial = -1
+        for cell in reversed(snake):
+            self.head_serial += 1
+            self._add(self.head_serial, cell)
+
+    def _add(self, serial, cell):
+        self.pos[serial] = cell
+        key = (cell[1] // BUCKET) * self.nbx + cell[0] // BUCKET
+        self.buckets.setdefault(key, set()).add(serial)
+
+    def _remove(self, serial):
+        x, y = self.pos.pop(serial)
+        self.buckets[(y // BUCKET) * self.nbx + x // BUCKET].discard(serial)
+
+    def push_head(self, cell, grew):
+        self.head_serial += 1
+        self._add(self.head_serial, cell)
+        if not grew:
+            self._remove(self.tail_serial)
+            self.tail_serial += 1
+
+    def at(self, i):
+        return self.pos[self.head_serial - i]
+
+    def _ranges(self, lo, hi, n, wrap):
+        # диапазон корзин [lo, hi] -> список индексов (с заворотом или обрезкой)
+        if wrap:
+            if hi - lo + 1 >= n:
+                return range(n)
+            return [b % n for b in range(lo, hi + 1)]
+        return range(max(lo, 0), min(hi, n - 1) + 1)
+
+    def query(self, x0, y0, x1, y1, wrap):
+        """
+        Номера сегментов (0 — голова) в корзинах, задевающих клетки [x0..x1] x [y0..y1].
+        """
+        found = []
+        for by in self._ranges(y0 // BUCKET, y1 // BUCKET, self.nby, wrap):
+            for bx in self._ranges(x0 // BUCKET, x1 // BUCKET, self.nbx, wrap):
+                found.extend(self.buckets.get(by * self.nbx + bx, ()))
+        head = self.head_serial
+        return sorted(head - s for s in found)
+
+
 class SnakeGame:
     def __init__(self, root):
         self.root = root
@@ -70,6 +190,9 @@ class SnakeGame:
 
         self.speed_name = "Нормально"
         self.wall_kill = True
+        self.big_world = False
+        self.world_w, self.world_h = WIDTH, HEIGHT
+        self.engine = SnakeEngine(WIDTH, HEIGHT, walls=self.wall_kill)
 
         self.running = False
         self.after_id = None
@@ -79,8 +202,37 @@ class SnakeGame:
 
         # плавность
         self.last_frame_time = time.perf_counter()
+        self.next_frame = self.last_frame_time # абсолютный дедлайн следующего кадра
         self.accum_ms = 0.0
-        self.prev_snake = []
+        self.has_prev = False # был ли шаг, от которого интерполировать
+
+        # автопилот
+        self.pilot_name = None
+        self.pilot = None
+
+        # запись текущей партии / проигрыватель повтора
+        self.recording = None
+        self.replay_player = None
+        self.menu_settings = None # (стены, большой мир) игрока, пока идёт повтор
+
+        # рекорды: файл читается только при первом открытии таблицы (T в меню)
+        self.scores = ScoreStore()
+        self.run_clock = RunClock()
+        self.run_scored = False # идёт ли партия в таблицу
+        self.scores_shown = False
+
+        # уровни: список файлов — при первом L, каждый файл разбирается один раз
+        self.level_files = None
+        self.level_idx = -1 # -1 — без уровня
+        self.levels = {} # путь -> Level
+        self.level = None
+        self.level_error = None
+
+        # статистика кадров (F3)
+        self.debug = False
+        self.frame_times = deque(maxlen=300)
+        self.dropped_steps = 0
+        self.frame_no = 0
 
         # темы
         self.theme_idx = 0
@@ -89,7 +241,6 @@ class SnakeGame:
         self.root.bind("<Key>", self.key_press)
 
         self.menu()
-        self.animation_loop()
 
     # ---------------- ТЕМА ----------------
     def apply_theme(self):
@@ -106,10 +257,12 @@ class SnakeGame:
 
         self.paused = False
         self.game_over_flag = False
+        self.scores_shown = False
 
-        if self.after_id is not None:
-            self.root.after_cancel(self.after_id)
-            self.after_id = None
+        # в меню цикл кадров спит
+        self.stop_loop()
+        self.save_recording()
+        self.restore_menu_settings()
 
         t = self.T()
 
@@ -123,24 +276,114 @@ class SnakeGame:
                                 fill=t["ui"], font=("Arial", 14))
 
         wall_text = "СМЕРТЬ ОТ СТЕН" if self.wall_kill else "ПРОХОД СКВОЗЬ СТЕНЫ"
-        self.canvas.create_text(WIN_W // 2, 120,
+        self.canvas.create_text(WIN_W // 2, 115,
                                 text=f"Стены: {wall_text} ← →",
                                 fill=t["ui"], font=("Arial", 14))
 
-        self.canvas.create_text(WIN_W // 2, 150,
+        self.canvas.create_text(WIN_W // 2, 140,
                                 text=f"Локация: {t['name']} A D",
                                 fill=t["ui"], font=("Arial", 14))
 
+        world_text = f"БОЛЬШОЙ {BIG_WORLD}x{BIG_WORLD}" if self.big_world else "ОБЫЧНЫЙ"
+        self.canvas.create_text(WIN_W // 2, 165,
+                                text=f"Мир: {world_text} M",
+                                fill=t["ui"], font=("Arial", 14))
+
+        level_text = self.level.name if self.level is not None else "нет"
+        if self.level_error:
+            level_text = self.level_error
         self.canvas.create_text(WIN_W // 2, 190,
+                                text=f"Уровень: {level_text} L",
+                                fill=t["ui"], font=("Arial", 14))
+
+        self.canvas.create_text(WIN_W // 2, 225,
                                 text="Enter — начать игру",
                                 fill=t["text"], font=("Arial", 14))
 
-        self.canvas.create_text(WIN_W // 2, 220,
+        self.canvas.create_text(WIN_W // 2, 250,
                                 text="ESC — выход",
                                 fill="gray", font=("Arial", 12))
 
+        self.canvas.create_text(WIN_W // 2, 275,
+                                text="F3 — статистика кадров",
+                                fill="gray", font=("Arial", 12))
+
+        self.canvas.create_text(WIN_W // 2, 297,
+                                text="I — автопилот (в игре, обычный мир без уровня)",
+                                fill="gray", font=("Arial", 12))
+
+        self.canvas.create_text(WIN_W // 2, 319,
+                                text="V — повтор последней игры (← → PgUp PgDn — перемотка)",
+                                fill="gray", font=("Arial", 12))
+
+        self.canvas.create_text(WIN_W // 2, 341,
+                                text="T — рекорды",
+                                fill="gray", font=("Arial", 12))
+
+    def next_level(self):
+        """
+        L в меню: следующий файл уровня по кругу, после последнего — без уровня.
+        """
+        if self.level_files is None:
+            try:
+                names = sorted(n for n in os.listdir(LEVELS_DIR) if n.endswith(".txt"))
+            except OSError:
+                names = []
+            self.level_files = [os.path.join(LEVELS_DIR, n) for n in names]
+        self.level_error = None
+        self.level_idx += 1
+        if self.level_idx >= len(self.level_files):
+            self.level_idx = -1
+            self.level = None
+            return
+
+        path = self.level_files[self.level_idx]
+        level = self.levels.get(path)
+        if level is None:
+            try:
+                level = load_level(path)
+                if (level.width, level.height) != (WIDTH, HEIGHT):
+                    raise ValueError(f"размер {level.width}x{level.height}, нужен {WIDTH}x{HEIGHT}")
+                SnakeEngine(WIDTH, HEIGHT, level=level) # старт змейки не в стене
+            except (OSError, ValueError) as e:
+                self.level = None
+                self.level_error = f"{os.path.basename(path)} — {e}"
+                return
+            self.levels[path] = level
+        self.level = level
+        self.big_world = False # уровень — только на обычном поле
+
+    def show_scores(self):
+        """
+        Топ-10 для выбранных скорости, стен и локации.
+        """
+        self.canvas.delete("all")
+        self.scores_shown = True
+        t = self.T()
+        wall_text = "смерть от стен" if self.wall_kill else "сквозь стены"
+
+        self.canvas.create_text(WIN_W // 2, 40, text="РЕКОРДЫ",
+                                fill=t["text"], font=("Arial", 28, "bold"))
+        self.canvas.create_text(WIN_W // 2, 85,
+                                text=f"{self.speed_name} • {wall_text} • {t['name']}",
+                                fill=t["ui"], font=("Arial", 14))
+
+        runs = self.scores.top(self.speed_name, self.wall_kill, t["name"])
+        if not runs:
+            self.canvas.create_text(WIN_W // 2, 200, text="Пока пусто — сыграй!",
+                                    fill=t["ui"], font=("Arial", 14))
+        for place, (when, length, seconds, ticks) in enumerate(runs[:TOP_N], 1):
+            day = time.strftime("%d.%m.%Y", time.localtime(when))
+            self.canvas.create_text(60, 100 + place * 28, anchor="w",
+                                    text=f"{place:2d}. {format_run(length, seconds, ticks)}   {day}",
+                                    fill=t["text"] if place == 1 else t["ui"], font=("Consolas", 13))
+
+        self.canvas.create_text(WIN_W // 2, WIN_H - 30,
+                                text="ESC — меню",
+                                fill="gray", font=("Arial", 12))
+
     # ---------------- ИГРА ----------------
-    def start(self):
+    def start(self, replay=None):
         self.canvas.delete("all")
         self.running = True
 
@@ -148,68 +391,163 @@ class SnakeGame:
         self.game_over_flag = False
         self.canvas.delete("pause")
 
-        self.dir = (1, 0)
-
-        cx, cy = WIDTH // 2, HEIGHT // 2
-        self.snake = [(cx, cy), (cx - 1, cy), (cx - 2, cy)]
-        self.prev_snake = self.snake.copy()
-
-        self.spawn_food()
+        if replay is not None:
+            # повтор: поле и стены — как в записи, ходы — из записи;
+            # настройки игрока вернутся в меню
+            if self.menu_settings is None:
+                self.menu_settings = (self.wall_kill, self.big_world)
+            self.replay_player = ReplayPlayer(replay)
+            self.recording = None
+            self.engine = self.replay_player.engine
+            self.world_w, self.world_h = replay.width, replay.height
+            self.big_world = (replay.width, replay.height) != (WIDTH, HEIGHT)
+            self.wall_kill = replay.walls
+        else:
+            self.restore_menu_settings()
+            world = (BIG_WORLD, BIG_WORLD) if self.big_world else (WIDTH, HEIGHT)
+            if self.replay_player is not None or world != (self.world_w, self.world_h):
+                self.world_w, self.world_h = world
+                self.engine = SnakeEngine(self.world_w, self.world_h, walls=self.wall_kill)
+            self.replay_player = None
+            self.engine.walls = self.wall_kill
+            self.engine.level = self.level
+            seed = random.randrange(2 ** 32)
+            self.engine.reset(seed=seed)
+            # повтор не знает уровней: партии на уровне не записываются
+            self.recording = Replay.for_engine(self.engine, seed) if self.level is None else None
+        self.reset_view_state()
+        # большой мир и уровни — другое поле, их длины с обычным не сравниваем
+        self.run_scored = replay is None and not self.big_world and self.level is None
+        self.run_clock.start()
+        self.make_pilot()
 
-        self.last_frame_time = time.perf_counter()
         self.accum_ms = 0.0
+        self.frame_times.clear()
+        self.dropped_steps = 0
 
+        self.build_scene()
         self.draw_interpolated(0.0)
+        self.start_loop()
 
-    def spawn_food(self):
-        while True:
-            pos = (random.randint(0, WIDTH - 1), random.randint(0, HEIGHT - 1))
-            if pos not in self.snake:
-                self.food = pos
-                break
+    def build_scene(self):
+        """
+        Постоянные элементы кадра: создаются один раз за игру,
+        дальше только двигаются через coords/itemconfig.
+        """
+        t = self.T()
+        if self.engine.level is not None:
+            self.build_level_scene()
+        if self.big_world:
+            # сетка и граница мира — постоянные линии, сдвигаются вместе с камерой
+            self.grid_v = [self.canvas.create_line(0, 0, 0, 0, fill=t["ui"], dash=(1, 3), tags="game")
+                           for _ in range(WIDTH + 2)]
+            self.grid_h = [self.canvas.create_line(0, 0, 0, 0, fill=t["ui"], dash=(1, 3), tags="game")
+                           for _ in range(HEIGHT + 2)]
+            self.border_item = self.canvas.create_rectangle(0, 0, 0, 0, outline=t["food"], width=3,
+                                                            state="normal" if self.wall_kill else "hidden",
+                                                            tags="game")
+        self.food_item = self.canvas.create_oval(0, 0, 0, 0, fill=t["food"], outline="",
+                                                 state="hidden", tags="game")
+        self.food_drawn = None
+        self.body_items = [] # линии тела (больше одной — когда змея разорвана краем)
+        self.body_shown = 0
+        self.head_item = self.canvas.create_oval(0, 0, 0, 0, fill=t["head"], outline="", tags="game")
+        self.eye_items = [
+            self.canvas.create_oval(0, 0, 0, 0, fill=t["bg"], outline="", tags="game")
+            for _ in range(2)
+        ]
+        if self.big_world:
+            # подложка под HUD: тело, уходящее за верх окна, не залезает на текст
+            self.canvas.create_rectangle(0, 0, WIN_W, 80, fill=t["bg"], outline="", tags="game")
+        self.hud_item = self.canvas.create_text(10, 15, anchor="w", text="",
+                                                fill=t["ui"], font=("Arial", 12), tags="game")
+        self.hud_text = None
+        self.debug_item = self.canvas.create_text(10, 40, anchor="w", text="",
+                                                  fill=t["ui"], font=("Consolas", 10), tags="game")
+        self.debug_text = None
+
+    def build_level_scene(self):
+        """
+        Стены — слитые прямоугольники (wall_rects), а не элемент на клетку;
+        порталы — кольца, блоки — по прямоугольнику, их двигает draw_movers.
+        """
+        t = self.T()
+        level = self.engine.level
+        for x0, y0, x1, y1 in wall_rects(level):
+            self.canvas.create_rectangle(x0 * CELL, y0 * CELL + 80, x1 * CELL, y1 * CELL + 80,
+                                         fill=t["ui"], outline="", tags="game")
+        colors = {}
+        for i, j in enumerate(level.portal_to):
+            if j < 0:
+                continue
+            color = colors.setdefault(min(i, j), PORTAL_COLORS[len(colors) % len(PORTAL_COLORS)])
+            x1, y1, x2, y2 = self.cell_box(i % WIDTH, i // WIDTH)
+            self.canvas.create_oval(x1 + 3, y1 + 3, x2 - 3, y2 - 3, outline=color, width=3, tags="game")
+        self.mover_items = [
+            self.canvas.create_rectangle(0, 0, 0, 0, fill=MOVER_COLOR, outline="", tags="game")
+            for _ in self.engine.movers
+        ]
+        self.movers_drawn = [None] * len(self.mover_items)
+
+    def cell_box(self, x, y):
+        px = x * CELL
+        py = y * CELL + 80
+        return px, py, px + CELL, py + CELL
+
+    def draw_movers(self):
+        # блоки ходят по клеткам: coords — только у тех, кто сдвинулся
+        for k, (x, y, _dx, _dy) in enumerate(self.engine.movers):
+            if self.movers_drawn[k] != (x, y):
+                self.movers_drawn[k] = (x, y)
+                x1, y1, x2, y2 = self.cell_box(x, y)
+                self.canvas.coords(self.mover_items[k], x1 + 2, y1 + 2, x2 - 2, y2 - 2)
+
+    def reset_view_state(self):
+        # всё, что отрисовка выводит из движка: после старта и после перемотки
+        self.dir = self.engine.dir
+        self.has_prev = False
+        if self.big_world:
+            self.body_index = BodyIndex(self.world_w, self.world_h, self.engine.snake)
+        elif np is not None:
+            self.body_arr = BodyArray(WIDTH * HEIGHT, self.engine.snake)
+
+    def make_pilot(self):
+        # в большом мире поиск пути по миллиону клеток на каждый шаг слишком дорог,
+        # а стен и порталов уровня стратегии zmeika_ai не знают
+        if (self.pilot_name is None or self.big_world or self.replay_player is not None
+                or self.engine.level is not None):
+            self.pilot = None
+        else:
+            self.pilot = make_strategy(self.pilot_name, self.engine)
+            self.run_scored = False # партия с автопилотом — не рекорд игрока
+        self.engine.inputs.clear()
 
     # ---- ЛОГИЧЕСКИЙ ШАГ (по клеткам) ----
     def logic_step(self):
         if not self.running or self.paused:
             return
 
-        self.prev_snake = self.snake.copy()
-
-        hx, hy = self.snake[0]
-        dx, dy = self.dir
-        nx, ny = hx + dx, hy + dy
-
-        if self.wall_kill:
-            if nx < 0 or nx >= WIDTH or ny < 0 or ny >= HEIGHT:
-                self.game_over()
-                return
+        if self.replay_player is not None:
+            # запись кончилась (смерть или выход из партии в меню)
+            result = DIED if self.replay_player.finished else self.replay_player.step()
         else:
-            nx %= WIDTH
-            ny %= HEIGHT
+            # автопилот ходит сам, иначе — следующий поворот из очереди
+            pilot_dir = self.pilot.choose() if self.pilot is not None else None
+            result = self.engine.step(pilot_dir)
+            if self.recording is not None:
+                self.recording.log(self.engine.ticks, self.engine.dir)
 
-        new_head = (nx, ny)
-
-        tail = self.snake[-1]
-        will_grow = (new_head == self.food)
-        body_to_check = self.snake if will_grow else self.snake[:-1]
-        if new_head in body_to_check:
+        if result == DIED:
             self.game_over()
             return
-
-        self.snake.insert(0, new_head)
-
-        if will_grow:
-            self.spawn_food()
-        else:
-            self.snake.pop()
-
-        # выравниваем длины prev/curr
-        if len(self.prev_snake) < len(self.snake):
-            last = self.prev_snake[-1]
-            while len(self.prev_snake) < len(self.snake):
-                self.prev_snake.append(last)
-        elif len(self.prev_snake) > len(self.snake):
-            self.prev_snake = self.prev_snake[:len(self.snake)]
+        self.dir = self.engine.dir
+        # через портал голова прыгает: этот шаг рисуем без интерполяции
+        self.has_prev = not self.engine.teleported
+        grew = self.engine.last_tail is None
+        if self.big_world:
+            self.body_index.push_head(self.engine.snake[0], grew)
+        elif np is not None:
+            self.body_arr.push_head(self.engine.snake[0], grew)
 
     # ---------------- ПЛАВНАЯ ОТРИСОВКА ----------------
     def cell_to_center(self, x, y):
@@ -235,11 +573,17 @@ class SnakeGame:
         Возвращает список точек (cx,cy) для сегментов змеи.
         В режиме "сквозь стены" используем unwrap, чтобы НЕ рисовалась линия через всю карту.
         """
-        if not self.prev_snake or len(self.prev_snake) != len(self.snake):
-            self.prev_snake = self.snake.copy()
+        snake = self.engine.snake
+        if self.has_prev:
+            # до шага сегмент i стоял там, где сейчас сегмент i+1,
+            # последний — на клетке, которую освободил хвост (при росте — на месте)
+            tail = self.engine.last_tail or snake[-1]
+            prev = chain(islice(snake, 1, None), (tail,))
+        else:
+            prev = snake
 
         pts = []
-        for (pxc, pyc), (cxc, cyc) in zip(self.prev_snake, self.snake):
+        for (pxc, pyc), (cxc, cyc) in zip(prev, snake):
             ax, bx = pxc, cxc
             ay, by = pyc, cyc
 
@@ -252,30 +596,18 @@ class SnakeGame:
             pts.append((x, y))
         return pts
 
-    def draw_interpolated(self, alpha):
-        self.canvas.delete("game")
-        t = self.T()
-
-        # еда (круглая)
-        fx, fy = self.food
-        cx, cy = self.cell_to_center(fx, fy)
-        r_food = CELL * 0.33
-        self.canvas.create_oval(cx - r_food, cy - r_food, cx + r_food, cy + r_food,
-                                fill=t["food"], outline="", tags="game")
-
-        if not self.snake:
-            return
-
+    def body_segments(self, alpha):
+        """
+        Куски тела в пикселях (плоские списки для coords) и центр головы.
+        """
         # соберём smooth точки (в клетках, возможно unwrap)
         spts = self.build_smooth_points(alpha)
 
         # переведём в пиксели
         ppts = [self.cell_to_center(x, y) for x, y in spts]
 
-        # ---- ТЕЛО: рисуем несколькими кусками, если есть "перепрыгивание" через край ----
+        # ---- рисуем несколькими кусками, если есть "перепрыгивание" через край ----
         # это окончательно убирает баг длинной змейки через всю карту
-        body_w = max(6, CELL - 8)
-
         def dist(a, b):
             return ((a[0]-b[0])**2 + (a[1]-b[1])**2) ** 0.5
 
@@ -291,12 +623,184 @@ class SnakeGame:
         if len(cur) >= 2:
             segments.append(cur)
 
+        flats = []
         for seg in segments:
             flat = []
             for x, y in seg:
                 flat.extend([x, y])
-            self.canvas.create_line(
-                *flat,
+            flats.append(flat)
+        return flats, ppts[0]
+
+    def body_segments_np(self, alpha):
+        """
+        То же, что body_segments, но целыми массивами: unwrap, lerp,
+        перевод в пиксели и поиск разрывов без цикла по сегментам.
+        """
+        cur = self.body_arr.positions()
+        if self.has_prev:
+            tail = self.engine.last_tail or self.engine.snake[-1]
+            prev = np.empty_like(cur)
+            prev[:-1] = cur[1:]
+            prev[-1] = tail
+        else:
+            prev = cur
+
+        if not self.wall_kill:
+            d = cur - prev
+            cur = cur - (d > 1) * self.body_arr.mod + (d < -1) * self.body_arr.mod
+
+        pts = prev + (cur - prev) * alpha
+        pix = np.empty_like(pts)
+        pix[:, 0] = (pts[:, 0] % WIDTH + 0.5) * CELL
+        pix[:, 1] = (pts[:, 1] % HEIGHT + 0.5) * CELL + 80
+
+        # разрыв (wrap): соседние точки дальше 1.25 клетки
+        step = np.diff(pix, axis=0)
+        gaps = np.flatnonzero((step ** 2).sum(axis=1) > (CELL * 1.25) ** 2) + 1
+        bounds = np.concatenate(([0], gaps, [len(pix)]))
+        flat = pix.ravel().tolist()
+
+        segments = []
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if b - a >= 2:
+                segments.append(flat[2 * a:2 * b])
+        return segments, (flat[0], flat[1])
+
+    # ---------------- КАМЕРА (большой мир) ----------------
+    def update_camera(self, alpha):
+        snake = self.engine.snake
+        hx, hy = snake[0]
+        px, py = snake[1] if self.has_prev and len(snake) > 1 else (hx, hy)
+        if not self.wall_kill:
+            px, hx = self.unwrap_pair(px, hx, self.world_w)
+            py, hy = self.unwrap_pair(py, hy, self.world_h)
+        cx = px + (hx - px) * alpha
+        cy = py + (hy - py) * alpha
+        if self.wall_kill:
+            # у края мира камера упирается, голова уходит из центра
+            cx = min(max(cx, WIDTH / 2 - 0.5), self.world_w - WIDTH / 2 - 0.5)
+            cy = min(max(cy, HEIGHT / 2 - 0.5), self.world_h - HEIGHT / 2 - 0.5)
+        else:
+            cx %= self.world_w
+            cy %= self.world_h
+        self.cam_x, self.cam_y = cx, cy
+
+    def world_to_screen(self, x, y):
+        dx = x - self.cam_x
+        dy = y - self.cam_y
+        if not self.wall_kill:
+            # кратчайшее смещение по тору — змея непрерывна через край мира
+            w, h = self.world_w, self.world_h
+            dx = (dx + w / 2) % w - w / 2
+            dy = (dy + h / 2) % h - h / 2
+        return dx * CELL + VIEW_CX, dy * CELL + VIEW_CY
+
+    def visible_cells(self):
+        x0 = math.floor(self.cam_x - WIDTH / 2) - 1
+        y0 = math.floor(self.cam_y - HEIGHT / 2) - 1
+        return x0, y0, x0 + WIDTH + 2, y0 + HEIGHT + 2
+
+    def draw_view_grid(self):
+        x0, y0, _, _ = self.visible_cells()
+        for k, line in enumerate(self.grid_v):
+            sx = (x0 + k - 0.5 - self.cam_x) * CELL + VIEW_CX
+            self.canvas.coords(line, sx, 80, sx, WIN_H)
+        for k, line in enumerate(self.grid_h):
+            sy = (y0 + k - 0.5 - self.cam_y) * CELL + VIEW_CY
+            self.canvas.coords(line, 0, sy, WIN_W, sy)
+        if self.wall_kill:
+            bx0, by0 = self.world_to_screen(-0.5, -0.5)
+            bx1, by1 = self.world_to_screen(self.world_w - 0.5, self.world_h - 0.5)
+            self.canvas.coords(self.border_item, bx0, by0, bx1, by1)
+
+    def draw_view_food(self, food):
+        visible = False
+        if food:
+            cx, cy = self.world_to_screen(*food)
+            visible = -CELL < cx < WIN_W + CELL and 80 - CELL < cy < WIN_H + CELL
+        if visible:
+            r_food = CELL * 0.33
+            self.canvas.coords(self.food_item, cx - r_food, cy - r_food, cx + r_food, cy + r_food)
+        if visible != (self.food_drawn is not None):
+            self.canvas.itemconfig(self.food_item, state="normal" if visible else "hidden")
+        self.food_drawn = food if visible else None
+
+    def body_segments_view(self, alpha):
+        """
+        Только сегменты в окне камеры: выборка из BodyIndex, затем
+        интерполяция и разбиение на непрерывные куски по номерам.
+        """
+        bi = self.body_index
+        snake = self.engine.snake
+        n = len(snake)
+        tail = self.engine.last_tail or snake[-1]
+        x0, y0, x1, y1 = self.visible_cells()
+
+        def point(i):
+            x, y = bi.at(i)
+            if not self.has_prev:
+                return self.world_to_screen(x, y)
+            px, py = bi.at(i + 1) if i + 1 < n else tail
+            if not self.wall_kill:
+                px, x = self.unwrap_pair(px, x, self.world_w)
+                py, y = self.unwrap_pair(py, y, self.world_h)
+            return self.world_to_screen(px + (x - px) * alpha, py + (y - py) * alpha)
+
+        segments = []
+        cur = []
+        last_i = None
+        max_d2 = (CELL * 1.25) ** 2
+        for i in bi.query(x0, y0, x1, y1, wrap=not self.wall_kill):
+            sx, sy = point(i)
+            if cur and (i != last_i + 1 or (sx - cur[-2]) ** 2 + (sy - cur[-1]) ** 2 > max_d2):
+                if len(cur) >= 4:
+                    segments.append(cur)
+                cur = []
+            cur.extend((sx, sy))
+            last_i = i
+        if len(cur) >= 4:
+            segments.append(cur)
+        return segments, point(0)
+
+    def draw_interpolated(self, alpha):
+        t = self.T()
+        canvas = self.canvas
+
+        if self.big_world:
+            self.update_camera(alpha)
+            self.draw_view_grid()
+        elif self.engine.level is not None:
+            self.draw_movers()
+
+        # еда (круглая) — двигаем, только если она переместилась
+        food = self.engine.food
+        if self.big_world:
+            self.draw_view_food(food)
+        elif food != self.food_drawn:
+            self.food_drawn = food
+            if food:
+                cx, cy = self.cell_to_center(*food)
+                r_food = CELL * 0.33
+                canvas.coords(self.food_item, cx - r_food, cy - r_food, cx + r_food, cy + r_food)
+                canvas.itemconfig(self.food_item, state="normal")
+            else:
+                canvas.itemconfig(self.food_item, state="hidden")
+
+        if not self.engine.snake:
+            return
+
+        if self.big_world:
+            segments, (hx, hy) = self.body_segments_view(alpha)
+        elif np is not None:
+            segments, (hx, hy) = self.body_segments_np(alpha)
+        else:
+            segments, (hx, hy) = self.body_segments(alpha)
+
+        # ---- ТЕЛО ----
+        body_w = max(6, CELL - 8)
+        while len(self.body_items) < len(segments):
+            line = canvas.create_line(
+                0, 0, 0, 0,
                 fill=t["body"],
                 width=body_w,
                 capstyle=tk.ROUND,
@@ -305,12 +809,20 @@ class SnakeGame:
                 splinesteps=12,
                 tags="game"
             )
+            canvas.tag_lower(line, self.head_item)
+            self.body_items.append(line)
+
+        for line, flat in zip(self.body_items, segments):
+            canvas.coords(line, flat)
+        for line in self.body_items[len(segments):self.body_shown]:
+            canvas.itemconfig(line, state="hidden")
+        for line in self.body_items[self.body_shown:len(segments)]:
+            canvas.itemconfig(line, state="normal")
+        self.body_shown = len(segments)
 
         # ---- ГОЛОВА ----
-        hx, hy = ppts[0]
         r_head = CELL * 0.42
-        self.canvas.create_oval(hx - r_head, hy - r_head, hx + r_head, hy + r_head,
-                                fill=t["head"], outline="", tags="game")
+        canvas.coords(self.head_item, hx - r_head, hy - r_head, hx + r_head, hy + r_head)
 
         # глазки
         dx, dy = self.dir
@@ -321,59 +833,189 @@ class SnakeGame:
         ey1 = hy + dy * eye_shift + py * eye_shift
         ex2 = hx + dx * eye_shift - px * eye_shift
         ey2 = hy + dy * eye_shift - py * eye_shift
-        self.canvas.create_oval(ex1 - eye_r, ey1 - eye_r, ex1 + eye_r, ey1 + eye_r,
-                                fill=t["bg"], outline="", tags="game")
-        self.canvas.create_oval(ex2 - eye_r, ey2 - eye_r, ex2 + eye_r, ey2 + eye_r,
-                                fill=t["bg"], outline="", tags="game")
+        canvas.coords(self.eye_items[0], ex1 - eye_r, ey1 - eye_r, ex1 + eye_r, ey1 + eye_r)
+        canvas.coords(self.eye_items[1], ex2 - eye_r, ey2 - eye_r, ex2 + eye_r, ey2 + eye_r)
+
+        # UI сверху — только когда текст поменялся
+        hud = f"Локация: {t['name']} | Скорость: {self.speed_name} | Длина: {len(self.engine.snake)}"
+        if self.engine.level is not None:
+            hud += f" | Уровень: {self.engine.level.name}"
+        if self.pilot is not None:
+            hud += f" | Автопилот: {self.pilot_name}"
+        if self.replay_player is not None:
+            hud += f" | Повтор: {self.engine.ticks}/{self.replay_player.replay.end_tick}"
+        if hud != self.hud_text:
+            self.hud_text = hud
+            canvas.itemconfig(self.hud_item, text=hud)
+
+    # ---------------- ПЛАНИРОВЩИК КАДРОВ ----------------
+    def loop_active(self):
+        return self.running and not self.paused and not self.game_over_flag
+
+    def start_loop(self):
+        if self.after_id is not None:
+            return
+        now = time.perf_counter()
+        self.last_frame_time = now # пауза/меню не попадают в dt
+        self.next_frame = now
+        self.after_id = self.root.after(0, self.animation_loop)
 
-        # UI сверху
-        self.canvas.create_text(10, 15, anchor="w",
-                                text=f"Локация: {t['name']} | Скорость: {self.speed_name} | Длина: {len(self.snake)}",
-                                fill=t["ui"], font=("Arial", 12), tags="game")
+    def stop_loop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
 
     def animation_loop(self):
+        self.after_id = None
+        if not self.loop_active():
+            return # пауза, меню, game over — ни одного пробуждения
+
         now = time.perf_counter()
         dt_ms = (now - self.last_frame_time) * 1000.0
         self.last_frame_time = now
+        self.frame_times.append(dt_ms)
 
         tick_ms = SPEEDS[self.speed_name]
 
-        if self.running and not self.game_over_flag:
-            if not self.paused:
-                self.accum_ms += dt_ms
+        self.accum_ms += dt_ms
+        steps = 0
+        while self.accum_ms >= tick_ms and steps < MAX_CATCHUP and self.loop_active():
+            self.logic_step()
+            self.accum_ms -= tick_ms
+            steps += 1
+        if self.accum_ms >= tick_ms:
+            # слишком отстали: лишние шаги не догоняем, а считаем
+            dropped = int(self.accum_ms // tick_ms)
+            self.dropped_steps += dropped
+            self.accum_ms -= dropped * tick_ms
+
+        if not self.loop_active():
+            return
 
-                max_catchup = 6
-                steps = 0
-                while self.accum_ms >= tick_ms and steps < max_catchup:
-                    self.logic_step()
-                    self.accum_ms -= tick_ms
-                    steps += 1
+        alpha = 0.0 if tick_ms <= 0 else (self.accum_ms / tick_ms)
+        alpha = max(0.0, min(1.0, alpha))
+        self.draw_interpolated(alpha)
+        self.update_debug_hud()
 
-                alpha = 0.0 if tick_ms <= 0 else (self.accum_ms / tick_ms)
-                alpha = max(0.0, min(1.0, alpha))
-                self.draw_interpolated(alpha)
-            else:
-                self.draw_interpolated(0.0)
+        # следующий кадр — по абсолютному дедлайну, чтобы работа кадра не копила дрейф
+        frame_s = FRAME_MS / 1000.0
+        self.next_frame += frame_s
+        now = time.perf_counter()
+        if self.next_frame < now:
+            # пропустили кадр(ы) целиком — встаём на ближайший будущий дедлайн
+            self.next_frame += ((now - self.next_frame) // frame_s + 1) * frame_s
+        delay = max(0, round((self.next_frame - now) * 1000))
+        self.after_id = self.root.after(delay, self.animation_loop)
 
-        self.root.after(FRAME_MS, self.animation_loop)
+    def frame_stats(self):
+        """
+        (p50, p99) интервала между кадрами в мс.
+        """
+        if not self.frame_times:
+            return 0.0, 0.0
+        ft = sorted(self.frame_times)
+        return ft[len(ft) // 2], ft[min(len(ft) - 1, int(len(ft) * 0.99))]
+
+    def update_debug_hud(self):
+        self.frame_no += 1
+        if self.debug and self.frame_no % 30 == 0:
+            p50, p99 = self.frame_stats()
+            text = f"кадр p50 {p50:.1f} мс | p99 {p99:.1f} мс | пропущено шагов: {self.dropped_steps}"
+        elif self.debug:
+            return
+        else:
+            text = ""
+        if text != self.debug_text:
+            self.debug_text = text
+            self.canvas.itemconfig(self.debug_item, text=text)
 
     def game_over(self):
         self.running = False
         self.paused = False
         self.game_over_flag = True
+        self.stop_loop()
+
+        self.save_recording()
 
         t = self.T()
+        self.run_clock.pause()
+        run = (len(self.engine.snake), self.run_clock.seconds, self.engine.ticks)
+        if self.run_scored:
+            self.scores.record(self.speed_name, self.wall_kill, t["name"], *run)
+            self.run_scored = False
+        text = f"GAME OVER\n{format_run(*run)}\nR — заново\nESC — меню"
+        if self.replay_player is not None:
+            text = "КОНЕЦ ПОВТОРА\n← — перемотка назад\nR — сначала\nESC — меню"
         self.canvas.delete("pause")
         self.canvas.create_text(
             WIN_W // 2, WIN_H // 2,
-            text="GAME OVER\nR — заново\nESC — меню",
+            text=text,
             fill=t["text"], font=("Arial", 22), justify="center", tags="pause"
         )
 
+    # ---------------- ПОВТОР ----------------
+    def save_recording(self):
+        # конец партии (смерть или выход в меню) — запись уходит в файл
+        if self.recording is None or not self.engine.ticks:
+            return
+        try:
+            self.recording.save(REPLAY_PATH)
+        except OSError:
+            pass # без повтора, но игра не падает
+        self.recording = None
+
+    def restore_menu_settings(self):
+        if self.menu_settings is not None:
+            self.wall_kill, self.big_world = self.menu_settings
+            self.menu_settings = None
+
+    def open_replay(self):
+        try:
+            replay = Replay.load(REPLAY_PATH)
+        except (OSError, ValueError, struct.error):
+            return
+        self.start(replay=replay)
+
+    def seek_replay(self, tick):
+        """
+        Перемотка: движок пересчитывает партию без отрисовки до нужного тика,
+        дальше кадры рисуются как обычно.
+        """
+        self.replay_player.seek(tick)
+        self.reset_view_state()
+        self.accum_ms = 0.0
+        if self.game_over_flag and self.engine.alive:
+            self.game_over_flag = False
+            self.running = True
+            self.canvas.delete("pause")
+        self.draw_interpolated(0.0)
+        if self.loop_active():
+            self.start_loop()
+
     # ---------------- КЛАВИШИ ----------------
     def key_press(self, e):
+        if e.keysym == "F3":
+            self.debug = not self.debug
+            return
+
+        # --- повтор: только перемотка, пауза и выход ---
+        if self.replay_player is not None and (self.running or self.game_over_flag):
+            if e.keysym in SEEK_KEYS:
+                self.seek_replay(self.engine.ticks + SEEK_KEYS[e.keysym])
+            elif e.keysym.lower() == "r":
+                self.seek_replay(0)
+            elif e.keysym == "Escape":
+                self.menu()
+            if e.keysym.lower() != "p" or not self.running:
+                return
+
         # --- когда не в игре ---
         if not self.running:
+            if self.scores_shown:
+                if e.keysym == "Escape" or e.keysym.lower() == "t":
+                    self.menu()
+                return
+
             if self.game_over_flag:
                 if e.keysym.lower() == "r" or e.keysym == "Return":
                     self.start()
@@ -398,6 +1040,28 @@ class SnakeGame:
                 self.wall_kill = not self.wall_kill
                 self.menu()
 
+            # в меню: повтор последней игры V
+            elif e.keysym.lower() == "v":
+                self.open_replay()
+
+            # в меню: таблица рекордов T
+            elif e.keysym.lower() == "t":
+                self.show_scores()
+
+            # в меню: большой мир M
+            elif e.keysym.lower() == "m":
+                self.big_world = not self.big_world
+                if self.big_world:
+                    self.level_idx = -1
+                    self.level = None
+                    self.level_error = None
+                self.menu()
+
+            # в меню: уровень L
+            elif e.keysym.lower() == "l":
+                self.next_level()
+                self.menu()
+
             # в меню: тема A/D
             elif e.keysym.lower() == "a":
                 self.theme_idx = (self.theme_idx - 1) % len(THEMES)
@@ -422,19 +1086,29 @@ class SnakeGame:
                     fill=t["text"], font=("Arial", 22),
                     justify="center", tags="pause"
                 )
+                self.stop_loop()
+                self.run_clock.pause()
             else:
                 self.canvas.delete("pause")
+                self.start_loop()
+                self.run_clock.resume()
+            return
+
+        if e.keysym.lower() == "i":
+            i = PILOTS.index(self.pilot_name)
+            self.pilot_name = PILOTS[(i + 1) % len(PILOTS)]
+            self.make_pilot()
             return
 
-        # поворот по клеткам (логика), движение плавное (рендер)
-        if e.keysym in ("w", "Up") and self.dir != (0, 1):
-            self.dir = (0, -1)
-        elif e.keysym in ("s", "Down") and self.dir != (0, -1):
-            self.dir = (0, 1)
-        elif e.keysym in ("a", "Left") and self.dir != (1, 0):
-            self.dir = (-1, 0)
-        elif e.keysym in ("d", "Right") and self.dir != (-1, 0):
-            self.dir = (1, 0)
+        # поворот по клеткам (логика) через очередь движка, движение плавное (рендер)
+        if e.keysym in ("w", "Up"):
+            self.engine.queue_dir((0, -1))
+        elif e.keysym in ("s", "Down"):
+            self.engine.queue_dir((0, 1))
+        elif e.keysym in ("a", "Left"):
+            self.engine.queue_dir((-1, 0))
+        elif e.keysym in ("d", "Right"):
+            self.engine.queue_dir((1, 0))
         elif e.keysym.lower() == "r":
             self.start()
         elif e.keysym == "Escape":
@@ -442,6 +1116,7 @@ class SnakeGame:
 
 
 # ---------------- ЗАПУСК ----------------
-root = tk.Tk()
-game = SnakeGame(root)
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    root = tk.Tk()
+    game = SnakeGame(root)
+    root.mainloop()
\ No newline at end of file